@@ -5,8 +5,44 @@ NAME
 DESCRIPTION
     This module provides the MemoryAnalyzer class for analyzing and tracking memory usage of Python objects.
     The MemoryAnalyzer class is implemented as a singleton.
+    It also provides the sizing strategies that measure_size can use, from a shallow sys.getsizeof
+    to a deep pympler asizeof traversal.
+    In structured mode, the analyzer writes timestamped, typed JSON Lines records instead of text,
+    which read_records and load_columns read back without parsing free text.
+
+FUNCTIONS
+    shallow_size(obj) -> int
+        Measures the size of an object without its referents.
+
+    fast_size(obj) -> int
+        Measures the size of flat objects directly and falls back to deep_size otherwise.
+
+    deep_size(obj) -> int
+        Measures the size of an object and all its referents.
+
+    _str_kind(s) -> int
+        Returns the largest code point the storage width of a string can hold.
+
+    _cache_key(obj) -> tuple
+        Returns the key under which the size of an object can be cached, if any.
+
+    _entries(rows) -> list
+        Converts the rows of a pympler summary or diff to structured entries.
+
+    read_records(path, kind=None) -> iterator
+        Reads the records of a structured log, optionally only those of one type.
+
+    load_columns(path, kind) -> dict
+        Loads the records of one type from a structured log as NumPy columns.
 
 CLASSES
+    JsonFormatter
+        A logging formatter that writes each record as one line of JSON.
+
+        Methods defined here:
+            format(self, record) -> str
+                Formats a record as a JSON object with its time, type and fields.
+
     MemoryAnalyzer
         A singleton class used to analyze and track memory usage of Python objects.
 
@@ -14,11 +50,38 @@ CLASSES
             get_instance() -> MemoryAnalyzer
                 Returns the singleton instance of the MemoryAnalyzer.
 
-            measure_size(self, obj)
-                Measures the size of a given object.
+            reset(**kwargs) -> MemoryAnalyzer
+                Closes the singleton instance, if any, and returns a new one.
+
+            measure_size(self, obj, strategy='deep')
+                Measures the size of a given object with a sizing strategy.
+
+            cache_info(self) -> dict
+                Returns the hit and miss statistics of the size cache.
+
+            _log(self, message)
+                Logs a message to the log file, through the queue in asynchronous mode.
+
+            _record(self, kind, **fields)
+                Logs a typed record to the structured log.
+
+            close(self)
+                Stops sampling, flushes the pending log records and stops the asynchronous logging thread.
+
+            start_sampling(self, manager, interval=1.0, capacity=3600, budget=0.05, summary_interval=60.0)
+                Starts a background thread that samples a manager's metrics into a ring buffer.
+
+            _sample_loop(self, manager, interval, budget, summary_interval)
+                Samples the manager until sampling is stopped, taking deep summaries within the budget.
+
+            stop_sampling(self)
+                Stops the sampling thread and waits for it to finish.
 
-            track(self)
-                Tracks memory usage and logs the differences.
+            sampling_stats(self) -> dict
+                Returns how many samples and summaries were taken and the overhead of sampling.
+
+            track(self, manager=None)
+                Tracks memory usage and logs the differences, of the whole heap or of a manager.
 
             analyze(self)
                 Analyzes all objects in memory and logs the total number.
@@ -28,7 +91,219 @@ CLASSES
 """
 
 from pympler import asizeof, tracker, muppy, summary
+from collections import OrderedDict, deque
+from logging.handlers import QueueHandler, QueueListener, MemoryHandler
+import json
 import logging
+import queue
+import numpy as np
+import sys
+import threading
+import time
+import weakref
+
+LOG_FORMAT = '%(asctime)s - %(message)s'
+
+# The manager metrics compared by simulator-scoped tracking
+TRACKED_METRICS = ('arenas', 'pools', 'blocks', 'reserved', 'used', 'requested')
+
+def shallow_size(obj):
+    """
+    Measures the size of an object without its referents.
+
+    Args:
+        obj (object): The object to measure.
+
+    Returns:
+        int: The size of the object in bytes, as reported by sys.getsizeof.
+    """
+    return sys.getsizeof(obj)
+
+def _flat_size(obj):
+    """
+    Measures the size of an object that has no referents, aligned like asizeof.
+
+    Args:
+        obj (object): The object to measure.
+
+    Returns:
+        int: The size of the object in bytes, rounded up to a multiple of 8.
+    """
+    return -(-sys.getsizeof(obj) // 8) * 8
+
+def _tuple_size(obj):
+    """
+    Measures the size of a tuple and its items.
+
+    Args:
+        obj (tuple): The tuple to measure.
+
+    Returns:
+        int: The size of the tuple and its items in bytes.
+    """
+    return _flat_size(obj) + sum(fast_size(item) for item in obj)
+
+_FAST_SIZERS = {
+    bytes: _flat_size,
+    bytearray: _flat_size,
+    str: _flat_size,
+    int: _flat_size,
+    tuple: _tuple_size,
+}
+
+def fast_size(obj):
+    """
+    Measures the size of flat objects directly and falls back to deep_size otherwise.
+    bytes, bytearray, str, int and tuple are dispatched on their exact type.
+
+    Args:
+        obj (object): The object to measure.
+
+    Returns:
+        int: The size of the object in bytes.
+    """
+    sizer = _FAST_SIZERS.get(type(obj))
+    if sizer is None:
+        return deep_size(obj)
+    return sizer(obj)
+
+def deep_size(obj):
+    """
+    Measures the size of an object and all its referents.
+
+    Args:
+        obj (object): The object to measure.
+
+    Returns:
+        int: The size of the object in bytes, as reported by pympler's asizeof.
+    """
+    return asizeof.asizeof(obj)
+
+SIZERS = {
+    'shallow': shallow_size,
+    'fast': fast_size,
+    'deep': deep_size,
+}
+
+# Hashable immutables whose size only depends on their value
+_VALUE_KEYED = frozenset((int, float, complex))
+# The largest code point of each storage width of a non-ASCII str: 1, 2 and 4 bytes per character
+_STR_KINDS = (0xFF, 0xFFFF, 0x10FFFF)
+
+def _str_kind(s):
+    """
+    Returns the largest code point the storage width of a string can hold.
+
+    Args:
+        s (str): The string.
+
+    Returns:
+        int: 0x7F for ASCII, 0xFF for Latin-1, 0xFFFF for 2-byte and 0x10FFFF for 4-byte strings.
+    """
+    if s.isascii():
+        return 0x7F
+    widest = ord(max(s))
+    return next(kind for kind in _STR_KINDS if widest <= kind)
+
+def _cache_key(obj):
+    """
+    Returns the key under which the size of an object can be cached, if any.
+    Keys of sequences only hold their shape, so the cache never keeps the objects alive.
+
+    Args:
+        obj (object): The object to be measured.
+
+    Returns:
+        tuple: (type, length) for bytes, (type, capacity) for a bytearray, whose buffer may be
+            larger than its content, (type, length, kind) for a str, (type, value) for numbers,
+            or None if the size of the object cannot be cached.
+    """
+    cls = type(obj)
+    if cls is bytes:
+        return (cls, len(obj))
+    if cls is bytearray:
+        return (cls, obj.__alloc__())
+    if cls is str:
+        return (cls, len(obj), _str_kind(obj))
+    if cls in _VALUE_KEYED:
+        return (cls, obj)
+    return None
+
+def _entries(rows):
+    """
+    Converts the rows of a pympler summary or diff to structured entries.
+
+    Args:
+        rows (list): The type, count and size of each row.
+
+    Returns:
+        list: A dict with the type name, count and size of each row.
+    """
+    return [{'type': str(row[0]), 'count': int(row[1]), 'size': int(row[2])} for row in rows]
+
+def read_records(path, kind=None):
+    """
+    Reads the records of a structured log, optionally only those of one type.
+
+    Args:
+        path (str): The path of the log.
+        kind (str): The type of the records to read. Default is None, which reads all of them.
+
+    Yields:
+        dict: The time, type and fields of each record.
+    """
+    with open(path) as log:
+        for line in log:
+            record = json.loads(line)
+            if kind is None or record['type'] == kind:
+                yield record
+
+def load_columns(path, kind):
+    """
+    Loads the records of one type from a structured log as NumPy columns.
+
+    Args:
+        path (str): The path of the log.
+        kind (str): The type of the records to load, such as 'size' or 'track'.
+
+    Returns:
+        dict: Maps each field of the records, including 'time', to an array of its values.
+            Numeric fields get numeric arrays, other fields object arrays.
+    """
+    records = list(read_records(path, kind))
+    keys = dict.fromkeys(key for record in records for key in record if key != 'type')
+    columns = {}
+    for key in keys:
+        values = [record.get(key) for record in records]
+        if all(isinstance(value, (int, float)) for value in values):
+            columns[key] = np.array(values)
+        else:
+            # Nested and missing fields are kept as Python objects, None where missing
+            columns[key] = np.empty(len(values), dtype=object)
+            columns[key][:] = values
+    return columns
+
+class JsonFormatter(logging.Formatter):
+    """
+    A logging formatter that writes each record as one line of JSON.
+    The message of the record is its type and its 'fields' attribute holds its fields.
+
+    Methods:
+        format(record) -> str:
+            Formats a record as a JSON object with its time, type and fields.
+    """
+
+    def format(self, record):
+        """
+        Formats a record as a JSON object with its time, type and fields.
+
+        Args:
+            record (LogRecord): The record to be formatted.
+
+        Returns:
+            str: The record as one line of JSON.
+        """
+        return json.dumps({'time': record.created, 'type': record.msg, **getattr(record, 'fields', {})})
 
 class MemoryAnalyzer:
     """
@@ -37,14 +312,40 @@ class MemoryAnalyzer:
     Attributes:
         _instance (MemoryAnalyzer): The singleton instance of the MemoryAnalyzer.
         tracker (SummaryTracker): An instance of SummaryTracker to track memory usage.
+        measurements (int): The number of objects measured by measure_size.
+        cache_size (int): The maximum number of sizes kept in the size cache, 0 disables it.
+        cache_hits (int): The number of measurements answered by the size cache.
+        cache_misses (int): The number of cacheable measurements that had to be computed.
+        sample_rate (float): The fraction of size measurements that are logged.
+        closed (bool): Whether the analyzer was closed, after which records are dropped.
+        structured (bool): Whether the log file holds JSON Lines records instead of text.
+        samples (deque): The latest metrics sampled by the sampling thread, oldest first.
 
     Methods:
         get_instance() -> MemoryAnalyzer:
             Returns the singleton instance of the MemoryAnalyzer.
-        measure_size(obj):
-            Measures the size of a given object.
-        track():
-            Tracks memory usage and logs the differences.
+        reset(**kwargs) -> MemoryAnalyzer:
+            Closes the singleton instance, if any, and returns a new one.
+        measure_size(obj, strategy='deep'):
+            Measures the size of a given object with a sizing strategy.
+        cache_info() -> dict:
+            Returns the hit and miss statistics of the size cache.
+        _log(message):
+            Logs a message to the log file, through the queue in asynchronous mode.
+        _record(kind, **fields):
+            Logs a typed record to the structured log.
+        close():
+            Stops sampling, flushes the pending log records and stops the asynchronous logging thread.
+        start_sampling(manager, interval=1.0, capacity=3600, budget=0.05, summary_interval=60.0):
+            Starts a background thread that samples a manager's metrics into a ring buffer.
+        _sample_loop(manager, interval, budget, summary_interval):
+            Samples the manager until sampling is stopped, taking deep summaries within the budget.
+        stop_sampling():
+            Stops the sampling thread and waits for it to finish.
+        sampling_stats() -> dict:
+            Returns how many samples and summaries were taken and the overhead of sampling.
+        track(manager=None):
+            Tracks memory usage and logs the differences, of the whole heap or of a manager.
         analyze():
             Analyzes all objects in memory and logs the total number.
         summarize():
@@ -52,62 +353,370 @@ class MemoryAnalyzer:
     """
     _instance = None
 
-    def __init__(self, log_file='memory_log.txt'):
+    def __init__(self, log_file='memory_log.txt', cache_size=4096, async_logging=False,
+                 sample_rate=1.0, batch_size=1000, structured=False):
         """
-        Initializes the MemoryAnalyzer with a log file.
+        Initializes the MemoryAnalyzer with a log file and an empty size cache.
+
+        In asynchronous mode, records are put on a queue and a QueueListener thread writes them
+        to the log file in batches of batch_size records, so logging never blocks on disk.
+        In structured mode, every record is a line of JSON with its time, its type ('size', 'track',
+        'objects' or 'summary') and typed fields, and no text message is built.
 
         Args:
             log_file (str): The name of the log file. Default is 'memory_log.txt'.
+            cache_size (int): The maximum number of sizes kept in the LRU size cache.
+                Default is 4096, 0 disables the cache.
+            async_logging (bool): Whether to log through a queue and a background thread.
+                Default is False.
+            sample_rate (float): The fraction of size measurements that are logged, between 0 and 1,
+                spread evenly over the measurements. Default is 1.0, 0 disables logging of sizes.
+            batch_size (int): The number of records written at once in asynchronous mode.
+                Default is 1000.
+            structured (bool): Whether to write JSON Lines records instead of text. Default is False.
 
         Raises:
             Exception: If an instance of MemoryAnalyzer already exists.
+            ValueError: If sample_rate is not between 0 and 1.
         """
         if MemoryAnalyzer._instance is not None:
             raise Exception("This class is a singleton!")
+        elif not 0 <= sample_rate <= 1:
+            raise ValueError("Sample rate must be between 0 and 1")
         else:
             self.tracker = tracker.SummaryTracker()
-            logging.basicConfig(
-                filename=log_file, level=logging.INFO, format='%(asctime)s - %(message)s'
-            )
+            self.measurements = 0
+            self.cache_size = cache_size
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self._cache = OrderedDict()
+            self._lock = threading.Lock()
+            self.sample_rate = sample_rate
+            # None logs in synchronous text mode through the root logger
+            self._logger = None
+            self.closed = False
+            self._listener = None
+            # The last metrics tracked for each manager
+            self._tracked = weakref.WeakKeyDictionary()
+            self.samples = deque()
+            self._sampler = None
+            self._stop_sampling = threading.Event()
+            self._sampling_time = 0.0
+            self._sampling_start = 0.0
+            self._sampling_end = None
+            self._summaries_taken = 0
+            self._summaries_skipped = 0
+            self.structured = structured
+            if async_logging or structured:
+                file_handler = logging.FileHandler(log_file)
+                file_handler.setFormatter(JsonFormatter() if structured else logging.Formatter(LOG_FORMAT))
+                # A standalone logger, so records never reach the root logger's handlers
+                self._logger = logging.Logger(__name__, logging.INFO)
+                if async_logging:
+                    batch_handler = MemoryHandler(batch_size, flushLevel=logging.CRITICAL, target=file_handler)
+                    log_queue = queue.SimpleQueue()
+                    self._logger.addHandler(QueueHandler(log_queue))
+                    self._listener = QueueListener(log_queue, batch_handler)
+                    self._listener.start()
+                else:
+                    self._logger.addHandler(file_handler)
+            else:
+                logging.basicConfig(filename=log_file, level=logging.INFO, format=LOG_FORMAT)
             MemoryAnalyzer._instance = self
 
     @staticmethod
-    def get_instance(log_file='memory_log.txt'):
+    def get_instance(log_file='memory_log.txt', cache_size=4096, async_logging=False,
+                     sample_rate=1.0, batch_size=1000, structured=False):
         """
         Returns the singleton instance of the MemoryAnalyzer.
 
         Args:
             log_file (str): The name of the log file. Default is 'memory_log.txt'.
+            cache_size (int): The maximum number of sizes kept in the LRU size cache.
+                Default is 4096, 0 disables the cache.
+            async_logging (bool): Whether to log through a queue and a background thread.
+                Default is False.
+            sample_rate (float): The fraction of size measurements that are logged, between 0 and 1,
+                spread evenly over the measurements. Default is 1.0, 0 disables logging of sizes.
+            batch_size (int): The number of records written at once in asynchronous mode.
+                Default is 1000.
+            structured (bool): Whether to write JSON Lines records instead of text. Default is False.
 
         Returns:
             MemoryAnalyzer: The singleton instance of the MemoryAnalyzer.
         """
         if MemoryAnalyzer._instance is None:
-            MemoryAnalyzer(log_file)
+            MemoryAnalyzer(log_file, cache_size, async_logging, sample_rate, batch_size, structured)
         return MemoryAnalyzer._instance
 
-    def measure_size(self, obj):
+    @staticmethod
+    def reset(**kwargs):
+        """
+        Closes the singleton instance, if any, and returns a new one.
+        Dropping the instance without closing it would leave its threads running and its log file open.
+
+        Args:
+            **kwargs: The arguments of get_instance.
+
+        Returns:
+            MemoryAnalyzer: The new singleton instance of the MemoryAnalyzer.
+        """
+        if MemoryAnalyzer._instance is not None:
+            MemoryAnalyzer._instance.close()
+            MemoryAnalyzer._instance = None
+        return MemoryAnalyzer.get_instance(**kwargs)
+
+    def measure_size(self, obj, strategy='deep'):
         """
-        Measures the size of a given object.
+        Measures the size of a given object with a sizing strategy.
+        Sizes of bytes-like objects, strings and numbers are kept in an LRU cache keyed by their shape,
+        so measuring the same shape again costs a dict lookup.
 
         Args:
             obj (object): The object to measure.
+            strategy (str | callable): The name of a strategy in SIZERS ('shallow', 'fast' or
+                'deep'), or a function returning the size of an object. Default is 'deep'.
 
         Returns:
             int: The size of the object in bytes.
+
+        Raises:
+            ValueError: If the strategy is not a known name or a callable.
         """
-        size = asizeof.asizeof(obj)
-        logging.info(f"Size of object: {size} bytes\n")
+        if not callable(strategy):
+            if strategy not in SIZERS:
+                raise ValueError(f"Unknown sizing strategy: {strategy}")
+            strategy = SIZERS[strategy]
+        key = _cache_key(obj) if self.cache_size else None
+        size = None
+        # The lock keeps the counters and the cache consistent when allocating from several threads
+        with self._lock:
+            self.measurements += 1
+            count = self.measurements
+            if key is not None:
+                key = (strategy, key)
+                size = self._cache.get(key)
+                if size is not None:
+                    self.cache_hits += 1
+                    self._cache.move_to_end(key)
+
+        if size is None:
+            # Measure outside the lock, so threads do not wait on each other's traversals
+            size = strategy(obj)
+            if key is not None:
+                with self._lock:
+                    self.cache_misses += 1
+                    self._cache[key] = size
+                    if len(self._cache) > self.cache_size:
+                        # Evict the least recently used size
+                        self._cache.popitem(last=False)
+        # Log a measurement each time count * sample_rate reaches a new integer, so exactly that
+        # fraction is logged, however the rate divides 1
+        if int(count * self.sample_rate) != int((count - 1) * self.sample_rate):
+            if self.structured:
+                self._record('size', size=size)
+            else:
+                self._log(f"Size of object: {size} bytes\n")
         return size
 
-    def track(self):
+    def cache_info(self):
+        """
+        Returns the hit and miss statistics of the size cache.
+
+        Returns:
+            dict: The hits, misses, current size and maximum size of the cache.
+        """
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'size': len(self._cache),
+            'maxsize': self.cache_size,
+        }
+
+    def _log(self, message):
+        """
+        Logs a message to the log file, through the queue in asynchronous mode.
+        Messages are dropped once the analyzer is closed.
+
+        Args:
+            message (str): The message to be logged.
+        """
+        if self.closed:
+            return
+        elif self._logger is None:
+            logging.info(message)
+        else:
+            self._logger.info(message)
+
+    def _record(self, kind, **fields):
+        """
+        Logs a typed record to the structured log.
+        Records are dropped once the analyzer is closed.
+
+        Args:
+            kind (str): The type of the record.
+            **fields: The fields of the record, which must be serializable as JSON.
+        """
+        if self.closed:
+            return
+        elif self._logger is None:
+            logging.info(json.dumps({'type': kind, **fields}))
+        else:
+            self._logger.info(kind, extra={'fields': fields})
+
+    def close(self):
+        """
+        Stops sampling, flushes the pending log records and stops the asynchronous logging thread.
+        Closes the log file unless it is shared with the root logger in synchronous text mode.
+        Records logged after closing are dropped, whatever the mode.
+        """
+        self.closed = True
+        self.stop_sampling()
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+        if self._logger is not None:
+            for handler in self._logger.handlers:
+                handler.close()
+
+    def start_sampling(self, manager, interval=1.0, capacity=3600, budget=0.05, summary_interval=60.0):
+        """
+        Starts a background thread that samples a manager's metrics into a ring buffer.
+
+        Every interval seconds, the manager's TRACKED_METRICS are read from its counters and
+        appended to samples with a timestamp, the oldest samples being dropped beyond capacity.
+        Every summary_interval seconds, a deep summary of the heap is taken with summarize, unless
+        the time spent sampling plus the cost of the previous summary would exceed the budget share
+        of the time elapsed since sampling started. The cost of a summary is only known once one
+        has been taken, so the first one is only skipped if sampling alone is over budget.
+
+        Args:
+            manager (MemoryManager): The manager to sample.
+            interval (float): The number of seconds between samples. Default is 1.0.
+            capacity (int): The number of samples kept. Default is 3600.
+            budget (float): The share of time the sampling thread may spend working, between 0 and 1.
+                Default is 0.05.
+            summary_interval (float): The number of seconds between deep summaries. Default is 60.0,
+                None never takes them.
+
+        Raises:
+            RuntimeError: If sampling is already running.
+            ValueError: If budget is not between 0 and 1.
+        """
+        if self._sampler is not None:
+            raise RuntimeError("Sampling is already running")
+        if not 0 <= budget <= 1:
+            raise ValueError("Budget must be between 0 and 1")
+        self.samples = deque(maxlen=capacity)
+        self._sampling_time = 0.0
+        self._sampling_start = time.perf_counter()
+        self._sampling_end = None
+        self._summaries_taken = 0
+        self._summaries_skipped = 0
+        self._stop_sampling.clear()
+        self._sampler = threading.Thread(
+            target=self._sample_loop, args=(manager, interval, budget, summary_interval),
+            name='memory-sampler', daemon=True)
+        self._sampler.start()
+
+    def _sample_loop(self, manager, interval, budget, summary_interval):
+        """
+        Samples the manager until sampling is stopped, taking deep summaries within the budget.
+
+        Args:
+            manager (MemoryManager): The manager to sample.
+            interval (float): The number of seconds between samples.
+            budget (float): The share of time the sampling thread may spend working.
+            summary_interval (float): The number of seconds between deep summaries, or None.
+        """
+        next_summary = None if summary_interval is None else self._sampling_start + summary_interval
+        summary_cost = 0.0
+        while not self._stop_sampling.wait(interval):
+            began = time.perf_counter()
+            metrics = manager.metrics()
+            sample = {'time': time.time()}
+            sample.update((key, metrics[key]) for key in TRACKED_METRICS)
+            self.samples.append(sample)
+            now = time.perf_counter()
+            self._sampling_time += now - began
+
+            if next_summary is not None and now >= next_summary:
+                next_summary = now + summary_interval
+                if self._sampling_time + summary_cost > budget * (now - self._sampling_start):
+                    self._summaries_skipped += 1
+                else:
+                    self.summarize()
+                    summary_cost = time.perf_counter() - now
+                    self._sampling_time += summary_cost
+                    self._summaries_taken += 1
+
+    def stop_sampling(self):
+        """
+        Stops the sampling thread and waits for it to finish. Does nothing if sampling is not running.
+        The samples stay available until sampling is started again.
+        """
+        if self._sampler is not None:
+            self._stop_sampling.set()
+            self._sampler.join()
+            self._sampler = None
+            self._sampling_end = time.perf_counter()
+
+    def sampling_stats(self):
+        """
+        Returns how many samples and summaries were taken and the overhead of sampling.
+
+        Returns:
+            dict: The number of samples kept, the numbers of summaries taken and skipped, the seconds
+                spent sampling and their share of the time sampling ran.
+        """
+        if not self._sampling_start:
+            elapsed = 0.0
+        else:
+            elapsed = (self._sampling_end or time.perf_counter()) - self._sampling_start
+        return {
+            'samples': len(self.samples),
+            'summaries_taken': self._summaries_taken,
+            'summaries_skipped': self._summaries_skipped,
+            'busy': self._sampling_time,
+            'overhead': self._sampling_time / elapsed if elapsed else 0.0,
+        }
+
+    def track(self, manager=None):
         """
         Tracks memory usage and logs the differences.
+
+        Without a manager, the whole interpreter heap is scanned and compared with the previous scan.
+        With a manager, only its arenas, pools, blocks and bytes are compared with the previous call
+        for the same manager. They are read from the manager's counters, so no object is walked.
+
+        Args:
+            manager (MemoryManager): The manager to track. Default is None, which tracks the heap.
+
+        Returns:
+            dict: With a manager, the change of each of TRACKED_METRICS since the previous call,
+                the first call being compared with an empty manager. None otherwise.
         """
+        if manager is not None:
+            metrics = manager.metrics()
+            previous = self._tracked.get(manager, {})
+            current = {key: metrics[key] for key in TRACKED_METRICS}
+            self._tracked[manager] = current
+            deltas = {key: value - previous.get(key, 0) for key, value in current.items()}
+            if self.structured:
+                self._record('track', **current, **{f"{key}_delta": value for key, value in deltas.items()})
+            else:
+                self._log("Track: " + ", ".join(f"{key} {current[key]} ({deltas[key]:+d})" for key in TRACKED_METRICS))
+            return deltas
+
         diff = self.tracker.diff()
-        logging.info("Track:")
+        if self.structured:
+            self._record('track', entries=_entries(diff))
+            return None
+        self._log("Track:")
         for entry in diff:
-            logging.info(f"Type: {entry[0]}, Count: {entry[1]}, Size: {entry[2]} bytes")
+            self._log(f"Type: {entry[0]}, Count: {entry[1]}, Size: {entry[2]} bytes")
 
     def analyze(self):
         """
@@ -117,7 +726,10 @@ class MemoryAnalyzer:
             list: A list of all objects in memory.
         """
         all_objects = muppy.get_objects()
-        logging.info(f"Total number of objects: {len(all_objects)}\n")
+        if self.structured:
+            self._record('objects', count=len(all_objects))
+        else:
+            self._log(f"Total number of objects: {len(all_objects)}\n")
         return all_objects
 
     def summarize(self):
@@ -129,8 +741,11 @@ class MemoryAnalyzer:
         """
         all_objects = self.analyze()
         sum_list = summary.summarize(all_objects)
-        logging.info("Summarize:")
+        if self.structured:
+            self._record('summary', entries=_entries(sum_list))
+            return sum_list
+        self._log("Summarize:")
         # summ
         for entry in sum_list:
-            logging.info(f"Type: {entry[0]}, Count: {entry[1]}, Size: {entry[2]} bytes")
+            self._log(f"Type: {entry[0]}, Count: {entry[1]}, Size: {entry[2]} bytes")
         return sum_list
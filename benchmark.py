@@ -0,0 +1,315 @@
+"""
+NAME
+    benchmark
+
+DESCRIPTION
+    This module benchmarks the hot paths of the memory manager and records baselines.
+    Each case times a batch of operations against a manager already holding a number of live
+    blocks drawn from a size distribution, and keeps the best time per operation over several
+    repeats, like timeit. The garbage collector is disabled while timing.
+    Results are saved as JSON, and comparing a run with a saved baseline flags every case that
+    got slower by more than a threshold.
+
+    Run it with: python benchmark.py --save baseline.json, and later with --compare baseline.json.
+
+FUNCTIONS
+    make_sizes(distribution, count, seed=0) -> list
+        Draws block sizes from a distribution.
+
+    prefill(live, distribution, seed=0) -> MemoryManager
+        Creates a manager holding live blocks drawn from a distribution.
+
+    bench_allocate(manager, sizes, repeat=5) -> tuple
+        Times allocating and then deallocating a batch of blocks.
+
+    bench_allocate_pool(manager, count, repeat=5) -> float
+        Times creating pools in a manager, which scans its arenas for room.
+
+    bench_block(count, repeat=5) -> float
+        Times the construction of blocks of a known size.
+
+    bench_measure_size(objs, strategy, repeat=5) -> float
+        Times measuring objects with a sizing strategy.
+
+    run(live_counts=LIVE_COUNTS, distributions=DISTRIBUTIONS, batch=1000, repeat=5) -> dict
+        Runs every benchmark case and returns the nanoseconds per operation of each.
+
+    compare(results, baseline, threshold=0.2) -> list
+        Finds the cases that got slower than their baseline by more than a threshold.
+
+    save(path, results)
+        Writes benchmark results as JSON.
+
+    load(path) -> dict
+        Reads benchmark results written by save.
+
+    main(argv=None)
+        Runs the benchmarks given on the command line and saves or compares the results.
+"""
+
+import argparse
+import gc
+import json
+import time
+import numpy as np
+from manager import MemoryManager
+from memory import Block
+from analyzer import MemoryAnalyzer, SIZERS
+from workload import uniform_sizes, zipf_sizes
+
+LIVE_COUNTS = (1000, 10000, 100000, 1000000)
+DISTRIBUTIONS = ('fixed', 'uniform', 'zipf')
+# The size of every block in the 'fixed' distribution
+FIXED_SIZE = 64
+
+def make_sizes(distribution, count, seed=0):
+    """
+    Draws block sizes from a distribution.
+
+    Args:
+        distribution (str): 'fixed', 'uniform' or 'zipf'.
+        count (int): The number of sizes.
+        seed (int): The seed of the random generator. Default is 0.
+
+    Returns:
+        list: The sizes, as Python ints.
+
+    Raises:
+        ValueError: If the distribution is unknown.
+    """
+    rng = np.random.default_rng(seed)
+    if distribution == 'fixed':
+        return [FIXED_SIZE] * count
+    if distribution == 'uniform':
+        return uniform_sizes(rng, count).tolist()
+    if distribution == 'zipf':
+        return zipf_sizes(rng, count).tolist()
+    raise ValueError(f"Unknown size distribution: {distribution}")
+
+def prefill(live, distribution, seed=0):
+    """
+    Creates a manager holding live blocks drawn from a distribution.
+    Each case gets its own fresh manager, and the default instance is left untouched.
+
+    Args:
+        live (int): The number of blocks to allocate.
+        distribution (str): The size distribution of the blocks.
+        seed (int): The seed of the random generator. Default is 0.
+
+    Returns:
+        MemoryManager: The manager holding the blocks.
+    """
+    manager = MemoryManager()
+    for ident, size in enumerate(make_sizes(distribution, live, seed)):
+        manager.allocate(ident, size)
+    return manager
+
+def _timed(func, *args):
+    """
+    Calls a function with the garbage collector disabled and returns the elapsed time.
+
+    Args:
+        func (callable): The function to be timed.
+        *args: The arguments of the function.
+
+    Returns:
+        tuple: The elapsed seconds and the result of the function.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = func(*args)
+        return time.perf_counter() - start, result
+    finally:
+        if enabled:
+            gc.enable()
+
+def bench_allocate(manager, sizes, repeat=5):
+    """
+    Times allocating and then deallocating a batch of blocks.
+    The manager is back to its initial blocks after each repeat.
+
+    Args:
+        manager (MemoryManager): The manager to allocate from.
+        sizes (list): The size of each block of the batch.
+        repeat (int): The number of times the batch is timed. Default is 5.
+
+    Returns:
+        tuple: The best seconds per allocation and per deallocation.
+    """
+    allocate = manager.allocate
+    deallocate = manager.deallocate
+    best_allocate = best_deallocate = float('inf')
+    for _ in range(repeat):
+        elapsed, blocks = _timed(lambda: [allocate(None, size) for size in sizes])
+        best_allocate = min(best_allocate, elapsed)
+        elapsed, _ = _timed(lambda: [deallocate(block) for block in blocks])
+        best_deallocate = min(best_deallocate, elapsed)
+    return best_allocate / len(sizes), best_deallocate / len(sizes)
+
+def bench_allocate_pool(manager, count, repeat=5):
+    """
+    Times creating pools in a manager, which scans its arenas for room.
+    The pools are released after each repeat.
+
+    Args:
+        manager (MemoryManager): The manager to create pools in.
+        count (int): The number of pools created per repeat.
+        repeat (int): The number of times the pools are created. Default is 5.
+
+    Returns:
+        float: The best seconds per pool.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        elapsed, pools = _timed(lambda: [manager._allocate_pool(FIXED_SIZE) for _ in range(count)])
+        best = min(best, elapsed)
+        for pool in pools:
+            # An empty pool is released through the deallocation of its only block
+            block = Block(None, FIXED_SIZE)
+            manager._place_block(pool, block)
+            manager.deallocate(block)
+    return best / count
+
+def bench_block(count, repeat=5):
+    """
+    Times the construction of blocks of a known size.
+
+    Args:
+        count (int): The number of blocks created per repeat.
+        repeat (int): The number of times the blocks are created. Default is 5.
+
+    Returns:
+        float: The best seconds per block.
+    """
+    best = min(_timed(lambda: [Block(None, FIXED_SIZE) for _ in range(count)])[0] for _ in range(repeat))
+    return best / count
+
+def bench_measure_size(objs, strategy, repeat=5):
+    """
+    Times measuring objects with a sizing strategy.
+    Sizes of cacheable objects are answered by the analyzer's cache after the first repeat.
+
+    Args:
+        objs (list): The objects to be measured.
+        strategy (str): The name of the sizing strategy.
+        repeat (int): The number of times the objects are measured. Default is 5.
+
+    Returns:
+        float: The best seconds per measurement.
+    """
+    measure_size = MemoryAnalyzer.get_instance().measure_size
+    best = min(_timed(lambda: [measure_size(obj, strategy) for obj in objs])[0] for _ in range(repeat))
+    return best / len(objs)
+
+def run(live_counts=LIVE_COUNTS, distributions=DISTRIBUTIONS, batch=1000, repeat=5):
+    """
+    Runs every benchmark case and returns the nanoseconds per operation of each.
+
+    Args:
+        live_counts (iterable): The numbers of live blocks the manager holds. Default is LIVE_COUNTS.
+        distributions (iterable): The size distributions of the blocks. Default is DISTRIBUTIONS.
+        batch (int): The number of operations timed per repeat. Default is 1000.
+        repeat (int): The number of repeats, the best of which is kept. Default is 5.
+
+    Returns:
+        dict: Maps each case name, such as 'allocate[uniform-1000]', to nanoseconds per operation.
+    """
+    results = {}
+    for distribution in distributions:
+        for live in live_counts:
+            case = f"{distribution}-{live}"
+            manager = prefill(live, distribution)
+            sizes = make_sizes(distribution, batch, seed=1)
+            allocate, deallocate = bench_allocate(manager, sizes, repeat)
+            results[f"allocate[{case}]"] = allocate * 1e9
+            results[f"deallocate[{case}]"] = deallocate * 1e9
+            results[f"_allocate_pool[{case}]"] = bench_allocate_pool(manager, max(batch // 100, 1), repeat) * 1e9
+
+    results["Block[known-size]"] = bench_block(batch, repeat) * 1e9
+    objs = [bytearray(size) for size in make_sizes('uniform', batch)]
+    objs += [list(range(size // 64)) for size in make_sizes('uniform', batch // 10)]
+    for strategy in SIZERS:
+        results[f"measure_size[{strategy}]"] = bench_measure_size(objs, strategy, repeat) * 1e9
+    return results
+
+def compare(results, baseline, threshold=0.2):
+    """
+    Finds the cases that got slower than their baseline by more than a threshold.
+    Cases missing from either side are ignored.
+
+    Args:
+        results (dict): The nanoseconds per operation of the current run.
+        baseline (dict): The nanoseconds per operation of the baseline.
+        threshold (float): The allowed relative slowdown. Default is 0.2, i.e. 20%.
+
+    Returns:
+        list: The name, baseline, result and ratio of each regressed case, worst first.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base and result > base * (1 + threshold):
+            regressions.append((name, base, result, result / base))
+    return sorted(regressions, key=lambda regression: regression[3], reverse=True)
+
+def save(path, results):
+    """
+    Writes benchmark results as JSON.
+
+    Args:
+        path (str): The path of the file.
+        results (dict): The nanoseconds per operation of each case.
+    """
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+def load(path):
+    """
+    Reads benchmark results written by save.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        dict: The nanoseconds per operation of each case.
+    """
+    with open(path) as file:
+        return json.load(file)
+
+def main(argv=None):
+    """
+    Runs the benchmarks given on the command line and saves or compares the results.
+    Exits with status 1 if a case regressed against the baseline.
+
+    Args:
+        argv (list): The command line arguments. Default is None, in which case sys.argv is used.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the memory manager's hot paths.")
+    parser.add_argument('--live', type=int, nargs='+', default=list(LIVE_COUNTS), help="numbers of live blocks")
+    parser.add_argument('--distributions', nargs='+', default=list(DISTRIBUTIONS), choices=DISTRIBUTIONS)
+    parser.add_argument('--batch', type=int, default=1000, help="operations timed per repeat")
+    parser.add_argument('--repeat', type=int, default=5, help="repeats, the best of which is kept")
+    parser.add_argument('--save', help="path to write the results to")
+    parser.add_argument('--compare', help="path of a baseline to compare the results with")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    # Logging every measurement would dominate the timings
+    MemoryAnalyzer.get_instance(sample_rate=0)
+    results = run(args.live, args.distributions, args.batch, args.repeat)
+    for name, result in results.items():
+        print(f"{name}: {result:.0f} ns/op")
+    if args.save:
+        save(args.save, results)
+
+    if args.compare:
+        regressions = compare(results, load(args.compare), args.threshold)
+        for name, base, result, ratio in regressions:
+            print(f"REGRESSION {name}: {base:.0f} -> {result:.0f} ns/op ({ratio:.2f}x)")
+        if regressions:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
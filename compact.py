@@ -0,0 +1,363 @@
+"""
+NAME
+    compact
+
+DESCRIPTION
+    This module provides an array-backed alternative to the MemoryManager.
+    Arenas, pools and blocks are integer IDs into typed arrays instead of Python objects, and each
+    pool tracks its slots in an occupancy bitmap. Simulating a block then costs a few bytes of
+    bookkeeping, so millions of blocks fit in bounded memory. Objects themselves are not kept,
+    only their sizes. Like the MemoryManager, each instance has its own geometry.
+
+CLASSES
+    CompactMemoryManager
+        An array-backed memory manager that identifies arenas, pools, and blocks by integer IDs.
+
+        Methods defined here:
+            __init__(self, sizer='deep', arena_size=None, pool_size=None, max_block_size=None, alignment=None)
+                Initializes the CompactMemoryManager with empty arrays, the sizing strategy and its geometry.
+
+            _allocate_arena(self) -> int
+                Allocates a new arena ID or reuses a free one.
+
+            _allocate_pool(self, size_class) -> int
+                Allocates a new pool ID or reuses a free one, and places it in an arena.
+
+            _take_slot(self, pool) -> int
+                Marks the lowest free slot of a pool as used in its bitmap.
+
+            allocate(self, obj) -> int
+                Measures an object and allocates a block for its size.
+
+            allocate_size(self, size) -> int
+                Allocates a block of the given size.
+
+            deallocate(self, handle) -> bool
+                Deallocates the block with the given handle.
+
+            block_offset(self, handle) -> int
+                Returns the byte offset of a block inside its pool.
+
+            stats(self) -> dict
+                Returns the number of arenas, pools and blocks in use and the bytes they hold.
+
+            bookkeeping_bytes(self) -> int
+                Returns the number of bytes used by the arrays that store the simulation.
+"""
+
+from array import array
+from memory import Arena, Pool, Block
+from analyzer import MemoryAnalyzer, SIZERS
+
+class CompactMemoryManager:
+    """
+    An array-backed memory manager that identifies arenas, pools, and blocks by integer IDs.
+
+    Attributes:
+        sizer (str | callable): The sizing strategy used to measure objects, see analyzer.SIZERS.
+        block_size (array): The measured size of each block.
+        block_pool (array): The pool of each block, or -1 for a free block ID.
+        block_slot (array): The slot of each block inside its pool.
+        pool_class (array): The size class served by each pool.
+        pool_arena (array): The arena of each pool, or -1 for a free pool ID.
+        pool_used (array): The number of used slots of each pool.
+        pool_bitmap (bytearray): One bit per slot of each pool, set when the slot is used.
+        arena_pools (array): The number of pools in each arena.
+        usedpools (dict): Maps each size class to the pool IDs that still have room.
+        usable_arenas (dict): The arena IDs that still have room for a pool, used as an ordered set.
+        arena_count (int): The number of arenas in use.
+        pool_count (int): The number of pools in use.
+        block_count (int): The number of blocks in use.
+        bytes (int): The sum of the sizes of the blocks in use.
+        arena_size (int): The maximum size of the manager's arenas.
+        pool_size (int): The maximum size of the manager's pools.
+        max_block_size (int): The largest size the manager allocates.
+        alignment (int): The granularity of the manager's size classes.
+
+    Methods:
+        _allocate_arena() -> int:
+            Allocates a new arena ID or reuses a free one.
+        _allocate_pool(size_class) -> int:
+            Allocates a new pool ID or reuses a free one, and places it in an arena.
+        _take_slot(pool) -> int:
+            Marks the lowest free slot of a pool as used in its bitmap.
+        allocate(obj) -> int:
+            Measures an object and allocates a block for its size.
+        allocate_size(size) -> int:
+            Allocates a block of the given size.
+        deallocate(handle) -> bool:
+            Deallocates the block with the given handle.
+        block_offset(handle) -> int:
+            Returns the byte offset of a block inside its pool.
+        stats() -> dict:
+            Returns the number of arenas, pools and blocks in use and the bytes they hold.
+        bookkeeping_bytes() -> int:
+            Returns the number of bytes used by the arrays that store the simulation.
+    """
+
+    def __init__(self, sizer='deep', arena_size=None, pool_size=None, max_block_size=None, alignment=None):
+        """
+        Initializes the CompactMemoryManager with empty arrays, the sizing strategy and its geometry.
+
+        Args:
+            sizer (str | callable): The name of a sizing strategy ('shallow', 'fast' or 'deep'),
+                or a function returning the size of an object. Default is 'deep'.
+            arena_size (int): The maximum size of an arena. Default is None, which uses Arena.MAXSIZE.
+            pool_size (int): The maximum size of a pool. Default is None, which uses Pool.MAXSIZE.
+            max_block_size (int): The largest size allocated. Default is None, which uses Block.MAXSIZE.
+            alignment (int): The granularity of the size classes. Default is None, which uses Pool.ALIGNMENT.
+
+        Raises:
+            ValueError: If the sizer is not a known name or a callable, if the geometry is
+                inconsistent, or if it needs counts too large for the unsigned short arrays.
+        """
+        arena_size = Arena.MAXSIZE if arena_size is None else arena_size
+        pool_size = Pool.MAXSIZE if pool_size is None else pool_size
+        max_block_size = Block.MAXSIZE if max_block_size is None else max_block_size
+        alignment = Pool.ALIGNMENT if alignment is None else alignment
+        if not callable(sizer) and sizer not in SIZERS:
+            raise ValueError(f"Unknown sizing strategy: {sizer}")
+        elif alignment <= 0 or alignment % 8 != 0:
+            raise ValueError("Alignment must be a positive multiple of 8")
+        elif not 0 < Pool.size_class(max_block_size, alignment) <= pool_size <= arena_size:
+            raise ValueError("A block must fit in a pool and a pool in an arena")
+        elif max(Pool.size_class(max_block_size, alignment), pool_size // alignment,
+                 arena_size // pool_size) > 0xFFFF:
+            raise ValueError("Sizes, slots and pools per arena must fit in an unsigned short")
+        self.sizer = sizer
+        self.arena_size = arena_size
+        self.pool_size = pool_size
+        self.max_block_size = max_block_size
+        self.alignment = alignment
+        # The smallest size class has the most slots, every pool's bitmap is sized for it
+        self._bitmap_size = -(-(pool_size // alignment) // 8)
+        self._arena_capacity = arena_size // pool_size
+
+        self.block_size = array('H')
+        self.block_pool = array('l')
+        self.block_slot = array('H')
+        self._free_block_ids = array('l')
+
+        self.pool_class = array('H')
+        self.pool_arena = array('l')
+        self.pool_used = array('H')
+        self.pool_bitmap = bytearray()
+        self._free_pool_ids = array('l')
+
+        self.arena_pools = array('H')
+        self._free_arena_ids = array('l')
+
+        self.usedpools = {}
+        self.usable_arenas = {}
+        self.arena_count = 0
+        self.pool_count = 0
+        self.block_count = 0
+        self.bytes = 0
+
+    def _allocate_arena(self):
+        """
+        Allocates a new arena ID or reuses a free one.
+
+        Returns:
+            int: The ID of the arena.
+        """
+        if self._free_arena_ids:
+            arena = self._free_arena_ids.pop()
+        else:
+            arena = len(self.arena_pools)
+            self.arena_pools.append(0)
+        self.usable_arenas[arena] = None
+        self.arena_count += 1
+        return arena
+
+    def _allocate_pool(self, size_class):
+        """
+        Allocates a new pool ID or reuses a free one, and places it in an arena.
+
+        Args:
+            size_class (int): The size class served by the pool.
+
+        Returns:
+            int: The ID of the pool.
+        """
+        arena = next(iter(self.usable_arenas)) if self.usable_arenas else self._allocate_arena()
+        if self._free_pool_ids:
+            # A released pool has all its slots free, so its bitmap is already clear
+            pool = self._free_pool_ids.pop()
+            self.pool_class[pool] = size_class
+            self.pool_arena[pool] = arena
+        else:
+            pool = len(self.pool_class)
+            self.pool_class.append(size_class)
+            self.pool_arena.append(arena)
+            self.pool_used.append(0)
+            self.pool_bitmap.extend(bytes(self._bitmap_size))
+
+        self.arena_pools[arena] += 1
+        if self.arena_pools[arena] == self._arena_capacity:
+            del self.usable_arenas[arena]
+        self.usedpools.setdefault(size_class, {})[pool] = None
+        self.pool_count += 1
+        return pool
+
+    def _take_slot(self, pool):
+        """
+        Marks the lowest free slot of a pool as used in its bitmap.
+
+        Args:
+            pool (int): The ID of a pool that has room.
+
+        Returns:
+            int: The index of the slot.
+        """
+        bitmap = self.pool_bitmap
+        start = pool * self._bitmap_size
+        for offset in range(start, start + self._bitmap_size):
+            byte = bitmap[offset]
+            if byte != 0xFF:
+                # ~byte & (byte + 1) isolates the lowest clear bit
+                bit = (~byte & (byte + 1)).bit_length() - 1
+                bitmap[offset] = byte | (1 << bit)
+                return (offset - start) * 8 + bit
+        raise ValueError("Pool is full")
+
+    def allocate(self, obj):
+        """
+        Measures an object and allocates a block for its size.
+        The object itself is not kept.
+
+        Args:
+            obj (object): The object to be allocated memory.
+
+        Returns:
+            int: The handle of the block, to be passed to deallocate.
+
+        Raises:
+            ValueError: If the size of the object is not between 1 and the maximum block size.
+        """
+        return self.allocate_size(MemoryAnalyzer.get_instance().measure_size(obj, self.sizer))
+
+    def allocate_size(self, size):
+        """
+        Allocates a block of the given size.
+
+        Args:
+            size (int): The size of the block in bytes.
+
+        Returns:
+            int: The handle of the block, to be passed to deallocate.
+
+        Raises:
+            ValueError: If the size is not between 1 and the maximum block size.
+        """
+        if size < 1:
+            raise ValueError("Size must be positive")
+        elif size > self.max_block_size:
+            raise ValueError("Size too large")
+        size_class = Pool.size_class(size, self.alignment)
+        pools = self.usedpools.get(size_class)
+        pool = next(iter(pools)) if pools else self._allocate_pool(size_class)
+
+        slot = self._take_slot(pool)
+        self.pool_used[pool] += 1
+        if self.pool_used[pool] == self.pool_size // size_class:
+            # A full pool has no room left for its size class
+            del self.usedpools[size_class][pool]
+
+        if self._free_block_ids:
+            handle = self._free_block_ids.pop()
+            self.block_size[handle] = size
+            self.block_pool[handle] = pool
+            self.block_slot[handle] = slot
+        else:
+            handle = len(self.block_size)
+            self.block_size.append(size)
+            self.block_pool.append(pool)
+            self.block_slot.append(slot)
+        self.block_count += 1
+        self.bytes += size
+        return handle
+
+    def deallocate(self, handle):
+        """
+        Deallocates the block with the given handle.
+        Pools and arenas that become empty are released and their IDs reused.
+
+        Args:
+            handle (int): The handle returned by allocate or allocate_size.
+
+        Returns:
+            bool: True if the block was successfully deallocated, False otherwise.
+        """
+        if not 0 <= handle < len(self.block_pool) or self.block_pool[handle] == -1:
+            return False
+        pool = self.block_pool[handle]
+        slot = self.block_slot[handle]
+        self.block_pool[handle] = -1
+        self._free_block_ids.append(handle)
+        self.block_count -= 1
+        self.bytes -= self.block_size[handle]
+
+        offset = pool * self._bitmap_size + slot // 8
+        self.pool_bitmap[offset] &= ~(1 << (slot % 8)) & 0xFF
+        self.pool_used[pool] -= 1
+        size_class = self.pool_class[pool]
+        if self.pool_used[pool]:
+            # The pool has room again, so it is put back in the index
+            self.usedpools[size_class][pool] = None
+            return True
+
+        # If the pool is empty, release it and its arena once the arena is empty too
+        self.usedpools[size_class].pop(pool, None)
+        arena = self.pool_arena[pool]
+        self.pool_arena[pool] = -1
+        self._free_pool_ids.append(pool)
+        self.pool_count -= 1
+        self.arena_pools[arena] -= 1
+        if self.arena_pools[arena]:
+            self.usable_arenas[arena] = None
+        else:
+            self.usable_arenas.pop(arena, None)
+            self._free_arena_ids.append(arena)
+            self.arena_count -= 1
+        return True
+
+    def block_offset(self, handle):
+        """
+        Returns the byte offset of a block inside its pool.
+
+        Args:
+            handle (int): The handle of a block in use.
+
+        Returns:
+            int: The offset of the block's slot in bytes.
+        """
+        return self.block_slot[handle] * self.pool_class[self.block_pool[handle]]
+
+    def stats(self):
+        """
+        Returns the number of arenas, pools and blocks in use and the bytes they hold.
+
+        Returns:
+            dict: The arena, pool and block counts and the sum of the block sizes.
+        """
+        return {
+            'arenas': self.arena_count,
+            'pools': self.pool_count,
+            'blocks': self.block_count,
+            'bytes': self.bytes,
+        }
+
+    def bookkeeping_bytes(self):
+        """
+        Returns the number of bytes used by the arrays that store the simulation.
+
+        Returns:
+            int: The size of the arrays' buffers in bytes.
+        """
+        arrays = (
+            self.block_size, self.block_pool, self.block_slot, self._free_block_ids,
+            self.pool_class, self.pool_arena, self.pool_used, self._free_pool_ids,
+            self.arena_pools, self._free_arena_ids,
+        )
+        return sum(len(values) * values.itemsize for values in arrays) + len(self.pool_bitmap)
@@ -0,0 +1,210 @@
+"""
+NAME
+    freecache
+
+DESCRIPTION
+    This module provides the bounded caches that hold freed blocks, pools and arenas for reuse.
+    A FreeCache is used like the list it replaces: items are appended when freed and the most
+    recently freed one is popped for reuse, so the hottest items are reused first.
+    Items the cache does not keep are released, i.e. dropped so their memory goes back to the
+    system. Two release policies can be combined:
+        - a cap keeps at most that many of the most recently freed items, releasing the least
+          recently freed one on overflow (LRU, or "keep N hot");
+        - a maximum age releases items that stayed in the cache longer than that many seconds
+          (time-based decay). Ages are checked whenever the cache is used, or by trim.
+    A cache with neither is unbounded and costs no more than a plain deque.
+
+CLASSES
+    FreeCache
+        A cache of freed items with an optional cap and maximum age.
+
+        Methods defined here:
+            __init__(self, cap=None, max_age=None, concurrent=False, clock=time.monotonic)
+                Initializes the FreeCache with no items, its release policy, and zero released items.
+
+            __len__(self) -> int
+                Returns the number of retained items.
+
+            __iter__(self) -> iterator
+                Yields the retained items, from the least to the most recently freed.
+
+            __repr__(self) -> str
+                Returns the retained items as a list-like representation.
+
+            append(self, item)
+                Adds a freed item, releasing the items the policy no longer keeps.
+
+            pop(self) -> object
+                Removes and returns the most recently freed item.
+
+            _expire(self, now)
+                Releases the items older than the maximum age.
+
+            trim(self) -> int
+                Releases the items older than the maximum age without using the cache.
+
+            stats(self) -> dict
+                Returns the numbers of retained and released items.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+class FreeCache:
+    """
+    A cache of freed items with an optional cap and maximum age.
+
+    Attributes:
+        cap (int): The maximum number of retained items, or None for no cap.
+        max_age (float): The number of seconds an item is retained, or None for no limit.
+        released (int): The number of items released so far.
+        clock (callable): Returns the current time in seconds.
+
+    Methods:
+        append(item):
+            Adds a freed item, releasing the items the policy no longer keeps.
+        pop() -> object:
+            Removes and returns the most recently freed item.
+        trim() -> int:
+            Releases the items older than the maximum age without using the cache.
+        stats() -> dict:
+            Returns the numbers of retained and released items.
+    """
+
+    def __init__(self, cap=None, max_age=None, concurrent=False, clock=time.monotonic):
+        """
+        Initializes the FreeCache with no items, its release policy, and zero released items.
+
+        Args:
+            cap (int): The maximum number of retained items. Default is None, for no cap.
+            max_age (float): The number of seconds an item is retained. Default is None, for no limit.
+            concurrent (bool): Whether to lock the cache for use from several threads.
+                Default is False, in which case the lock does nothing.
+            clock (callable): Returns the current time in seconds. Default is time.monotonic.
+
+        Raises:
+            ValueError: If the cap is negative or the maximum age is not positive.
+        """
+        if cap is not None and cap < 0:
+            raise ValueError("Cap must not be negative")
+        if max_age is not None and max_age <= 0:
+            raise ValueError("Maximum age must be positive")
+        self.cap = cap
+        self.max_age = max_age
+        self.released = 0
+        self.clock = clock
+        self._items = deque()
+        # The free time of each item, in the order of the items, only kept for a maximum age
+        self._times = deque() if max_age is not None else None
+        self._lock = threading.Lock() if concurrent else nullcontext()
+        if cap is None and max_age is None:
+            # Nothing is ever released, so the deque's own atomic methods are used directly
+            self.append = self._items.append
+            self.pop = self._items.pop
+
+    def __len__(self):
+        """
+        Returns the number of retained items.
+
+        Returns:
+            int: The number of items in the cache.
+        """
+        return len(self._items)
+
+    def __iter__(self):
+        """
+        Yields the retained items, from the least to the most recently freed.
+
+        Returns:
+            iterator: The items in the cache.
+        """
+        return iter(list(self._items))
+
+    def __repr__(self):
+        """
+        Returns the retained items as a list-like representation.
+
+        Returns:
+            str: The representation of the cache.
+        """
+        return f"FreeCache({list(self)!r})"
+
+    def append(self, item):
+        """
+        Adds a freed item, releasing the items the policy no longer keeps.
+
+        Args:
+            item (object): The freed item.
+        """
+        with self._lock:
+            self._items.append(item)
+            if self._times is not None:
+                now = self.clock()
+                self._times.append(now)
+                self._expire(now)
+            if self.cap is not None:
+                while len(self._items) > self.cap:
+                    # Release the least recently freed item
+                    self._items.popleft()
+                    if self._times is not None:
+                        self._times.popleft()
+                    self.released += 1
+
+    def pop(self):
+        """
+        Removes and returns the most recently freed item.
+
+        Returns:
+            object: The item.
+
+        Raises:
+            IndexError: If the cache is empty.
+        """
+        with self._lock:
+            if self._times is not None:
+                self._expire(self.clock())
+                item = self._items.pop()
+                self._times.pop()
+                return item
+            return self._items.pop()
+
+    def _expire(self, now):
+        """
+        Releases the items older than the maximum age.
+        The oldest items are at the left end, so only expired items are looked at.
+
+        Args:
+            now (float): The current time in seconds.
+        """
+        times = self._times
+        deadline = now - self.max_age
+        while times and times[0] < deadline:
+            times.popleft()
+            self._items.popleft()
+            self.released += 1
+
+    def trim(self):
+        """
+        Releases the items older than the maximum age without using the cache.
+        Caches are otherwise only trimmed when used, so an idle cache keeps its items until then.
+
+        Returns:
+            int: The number of items released.
+        """
+        if self._times is None:
+            return 0
+        with self._lock:
+            released = self.released
+            self._expire(self.clock())
+            return self.released - released
+
+    def stats(self):
+        """
+        Returns the numbers of retained and released items.
+
+        Returns:
+            dict: The number of items in the cache and the number released so far.
+        """
+        return {'retained': len(self._items), 'released': self.released}
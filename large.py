@@ -0,0 +1,267 @@
+"""
+NAME
+    large
+
+DESCRIPTION
+    This module simulates the allocator that serves objects too large for pools.
+    Like CPython handing requests over 512 bytes to the system malloc, large objects get their own
+    extent of whole pages in a simulated address space. Free extents are kept sorted by address,
+    so allocation takes the lowest free extent that fits and a freed extent is coalesced with its
+    free neighbours. A free extent that reaches the top of the address space is unmapped.
+
+CLASSES
+    LargeBlock
+        A class to represent a large object and the extent of pages holding it.
+
+        Methods defined here:
+            __init__(self, obj, size, offset, length)
+                Initializes the LargeBlock with an object, its size, and its extent.
+
+    LargeObjectAllocator
+        A class to allocate page-rounded extents for large objects.
+
+        Methods defined here:
+            __init__(self, page_size=PAGE_SIZE, concurrent=False)
+                Initializes the LargeObjectAllocator with an empty address space and zero counters.
+
+            extent_size(self, size) -> int
+                Rounds a size up to a whole number of pages.
+
+            _take(self, length) -> int
+                Finds the lowest free extent of at least length bytes, or maps a new one at the top.
+
+            _release(self, offset, length)
+                Returns an extent, coalescing it with its free neighbours.
+
+            allocate(self, obj, size) -> LargeBlock
+                Allocates an extent for a large object.
+
+            free(self, block) -> bool
+                Frees the extent of a large object.
+
+            metrics(self) -> dict
+                Returns the usage and fragmentation of the large objects.
+"""
+
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext
+
+# The granularity of large object extents, like a page of the system allocator
+PAGE_SIZE = 4096
+
+class LargeBlock:
+    """
+    A class to represent a large object and the extent of pages holding it.
+
+    Attributes:
+        obj (object): The object stored in the block.
+        block_size (int): The size of the object.
+        offset (int): The start of the extent in the address space, or None once freed.
+        length (int): The length of the extent, a whole number of pages.
+    """
+    __slots__ = ('obj', 'block_size', 'offset', 'length')
+
+    def __init__(self, obj, size, offset, length):
+        """
+        Initializes the LargeBlock with an object, its size, and its extent.
+
+        Args:
+            obj (object): The object to be stored in the block.
+            size (int): The size of the object.
+            offset (int): The start of the extent.
+            length (int): The length of the extent.
+        """
+        self.obj = obj
+        self.block_size = size
+        self.offset = offset
+        self.length = length
+
+class LargeObjectAllocator:
+    """
+    A class to allocate page-rounded extents for large objects.
+
+    Attributes:
+        page_size (int): The granularity of the extents.
+        starts (list): The start of each free extent, in increasing order.
+        lengths (list): The length of each free extent, in the order of starts.
+        top (int): The end of the mapped address space.
+        live (dict): Maps the offset of each live large object to its block.
+        blocks (int): The number of live large objects.
+        requested (int): The sum of the sizes of the live large objects.
+        reserved (int): The sum of the lengths of their extents.
+
+    Methods:
+        extent_size(size) -> int:
+            Rounds a size up to a whole number of pages.
+        _take(length) -> int:
+            Finds the lowest free extent of at least length bytes, or maps a new one at the top.
+        _release(offset, length):
+            Returns an extent, coalescing it with its free neighbours.
+        allocate(obj, size) -> LargeBlock:
+            Allocates an extent for a large object.
+        free(block) -> bool:
+            Frees the extent of a large object.
+        metrics() -> dict:
+            Returns the usage and fragmentation of the large objects.
+    """
+
+    def __init__(self, page_size=PAGE_SIZE, concurrent=False):
+        """
+        Initializes the LargeObjectAllocator with an empty address space and zero counters.
+
+        Args:
+            page_size (int): The granularity of the extents. Default is PAGE_SIZE.
+            concurrent (bool): Whether to lock the allocator for use from several threads.
+                Default is False, in which case the lock does nothing.
+
+        Raises:
+            ValueError: If page_size is not positive.
+        """
+        if page_size <= 0:
+            raise ValueError("Page size must be positive")
+        self.page_size = page_size
+        self.starts = []
+        self.lengths = []
+        self.top = 0
+        self.live = {}
+        self.blocks = 0
+        self.requested = 0
+        self.reserved = 0
+        self._lock = threading.Lock() if concurrent else nullcontext()
+
+    def extent_size(self, size):
+        """
+        Rounds a size up to a whole number of pages.
+
+        Args:
+            size (int): The size in bytes.
+
+        Returns:
+            int: The size rounded up to a multiple of the page size, at least one page.
+        """
+        return max(-(-size // self.page_size), 1) * self.page_size
+
+    def _take(self, length):
+        """
+        Finds the lowest free extent of at least length bytes, or maps a new one at the top.
+        The extent is split if it is longer than needed, and its remainder stays free.
+
+        Args:
+            length (int): The length of the extent, a whole number of pages.
+
+        Returns:
+            int: The start of the extent.
+        """
+        for i, free in enumerate(self.lengths):
+            if free >= length:
+                offset = self.starts[i]
+                if free == length:
+                    del self.starts[i]
+                    del self.lengths[i]
+                else:
+                    self.starts[i] += length
+                    self.lengths[i] -= length
+                return offset
+        offset = self.top
+        self.top += length
+        return offset
+
+    def _release(self, offset, length):
+        """
+        Returns an extent, coalescing it with its free neighbours.
+        If the coalesced extent reaches the top of the address space, it is unmapped instead.
+
+        Args:
+            offset (int): The start of the extent.
+            length (int): The length of the extent.
+        """
+        i = bisect_left(self.starts, offset)
+        if i > 0 and self.starts[i - 1] + self.lengths[i - 1] == offset:
+            # Merge with the free extent below
+            i -= 1
+            offset = self.starts[i]
+            length += self.lengths[i]
+            del self.starts[i]
+            del self.lengths[i]
+        if i < len(self.starts) and offset + length == self.starts[i]:
+            # Merge with the free extent above
+            length += self.lengths[i]
+            del self.starts[i]
+            del self.lengths[i]
+
+        if offset + length == self.top:
+            self.top = offset
+        else:
+            self.starts.insert(i, offset)
+            self.lengths.insert(i, length)
+
+    def allocate(self, obj, size):
+        """
+        Allocates an extent for a large object.
+
+        Args:
+            obj (object): The object to be allocated memory.
+            size (int): The size of the object.
+
+        Returns:
+            LargeBlock: The block holding the object, to be passed to free.
+        """
+        length = self.extent_size(size)
+        with self._lock:
+            offset = self._take(length)
+            block = self.live[offset] = LargeBlock(obj, size, offset, length)
+            self.blocks += 1
+            self.requested += size
+            self.reserved += length
+        return block
+
+    def free(self, block):
+        """
+        Frees the extent of a large object.
+        Only a block that is live in this allocator is freed, so a block of another allocator
+        or one already freed never reaches the free extents.
+
+        Args:
+            block (LargeBlock): The block to be freed.
+
+        Returns:
+            bool: True if the block was successfully freed, False if it is not live in this allocator.
+        """
+        with self._lock:
+            if self.live.get(block.offset) is not block:
+                return False
+            del self.live[block.offset]
+            self._release(block.offset, block.length)
+            block.offset = None
+            self.blocks -= 1
+            self.requested -= block.block_size
+            self.reserved -= block.length
+        return True
+
+    def metrics(self):
+        """
+        Returns the usage and fragmentation of the large objects.
+
+        Fragmentation is given as fractions: internal fragmentation of the reserved bytes is lost
+        to rounding sizes up to whole pages, external fragmentation of the mapped bytes to free
+        extents below the top.
+
+        Returns:
+            dict: The numbers of live large objects and free extents, the bytes mapped, reserved,
+                requested and free, and the internal and external fragmentation.
+        """
+        with self._lock:
+            mapped = self.top
+            reserved = self.reserved
+            requested = self.requested
+            return {
+                'blocks': self.blocks,
+                'free_extents': len(self.starts),
+                'mapped': mapped,
+                'reserved': reserved,
+                'requested': requested,
+                'free': mapped - reserved,
+                'internal_fragmentation': (reserved - requested) / reserved if reserved else 0.0,
+                'external_fragmentation': (mapped - reserved) / mapped if mapped else 0.0,
+            }
@@ -4,18 +4,70 @@ NAME
 
 DESCRIPTION
     This module simulates a memory manager that manages memory blocks, pools, and arenas.
-    The MemoryManager class is a singleton and provides methods to allocate and deallocate memory.
+    The MemoryManager class provides methods to allocate and deallocate memory. Each instance is an
+    independent heap with its own geometry, and get_instance returns a shared default instance.
+    Objects larger than the maximum block size are served by a LargeObjectAllocator instead of pools.
+    Freed blocks, pools and arenas are kept for reuse in FreeCaches, which can be bounded so that
+    the manager releases what it does not keep after a spike.
 
 CLASSES
-    MemoryManager
-        A singleton class to manage memory blocks, pools, and arenas.
+    ThreadCache
+        A per-thread cache of freed blocks for each size class, in front of the shared pools.
+
+        Methods defined here:
+            __init__(self)
+                Initializes the ThreadCache with empty bins and zero counters.
+
+    ClassStats
+        The usage counters of one size class, kept up to date on every allocation and deallocation.
 
         Methods defined here:
             __init__(self)
-                Initializes the MemoryManager with empty lists for arenas, free blocks, free pools, and free arenas.
+                Initializes the ClassStats with zero counters and an empty occupancy histogram.
+
+    FirstFitPolicy
+        An arena policy that places new pools in the first arena of the manager with room.
+
+        Methods defined here:
+            __init__(self, manager)
+                Initializes the FirstFitPolicy with the manager whose arenas it selects from.
+
+            select(self) -> Arena
+                Returns the first arena with room for a pool, or None.
+
+            update(self, arena)
+                Does nothing, since the arenas are scanned on every selection.
+
+    MostUsedPolicy
+        An arena policy that places new pools in the arena with the fewest free pools.
+
+        Methods defined here:
+            __init__(self, manager)
+                Initializes the MostUsedPolicy with the manager whose arenas it selects from and no buckets.
+
+            _free_pools(arena) -> int
+                Returns the number of pools an arena still has room for.
+
+            select(self) -> Arena
+                Returns an arena with the fewest free pools, or None if no arena has room.
+
+            update(self, arena)
+                Files an arena under its current number of free pools, unless it is full.
+
+    MemoryManager
+        A class to manage memory blocks, pools, and arenas.
+
+        Methods defined here:
+            __init__(self, sizer='deep', concurrent=False, tcache=0, arena_size=None, pool_size=None,
+                     max_block_size=None, alignment=None, arena_policy='first_fit')
+                Initializes the MemoryManager with empty lists for arenas, free blocks, free pools, and free arenas,
+                the sizing strategy used to measure objects, its locks, its thread caches, and its geometry.
 
             get_instance() -> MemoryManager
-                Returns the singleton instance of the MemoryManager.
+                Returns the shared default instance of the MemoryManager.
+
+            _class_lock(self, size_class) -> RLock
+                Returns the lock guarding the pools of a size class.
 
             _allocate_arena(self) -> Arena
                 Allocates a new arena or reuses a free arena.
@@ -23,74 +75,478 @@ CLASSES
             _allocate_pool(self, block_size) -> Pool
                 Allocates a new pool or reuses a free pool.
 
-            _allocate_block(self, obj) -> Block
+            _find_pool(self, size_class) -> Pool
+                Finds a pool with room for the size class in the usedpools index.
+
+            _class_stats(self, size_class) -> ClassStats
+                Returns the usage counters of a size class, creating them if needed.
+
+            _occupancy(pool) -> int
+                Returns the bucket of the occupancy histogram a pool falls in.
+
+            _place_block(self, pool, block)
+                Places a block in a pool and updates the usedpools index and the usage counters.
+
+            _measure(self, obj) -> int
+                Measures the size of an object once for the whole allocation.
+
+            _make_block(self, obj, size) -> Block
+                Creates a new block or reuses a free block, without placing it in a pool.
+
+            _allocate_block(self, obj, size=None) -> Block
                 Allocates a new block or reuses a free block.
 
-            allocate(self, obj)
-                Allocates memory for the given object.
+            allocate(self, obj, size=None) -> Block
+                Allocates memory for the given object, measuring it unless its size is given.
+
+            allocate_many(self, objs) -> list
+                Allocates memory for several objects, grouped by size class.
+
+            _deallocate(self, block) -> bool
+                Deallocates the given block and saves it for reuse.
 
             deallocate(self, block) -> bool
                 Deallocates the given block(/pool/arena) and sets it for reuse.
+
+            free_many(self, blocks) -> int
+                Deallocates several blocks, grouped by size class.
+
+            _thread_cache(self) -> ThreadCache
+                Returns the thread cache of the calling thread, creating it if needed.
+
+            _flush(self, cache, blocks)
+                Returns cached blocks to the shared pools in one batch.
+
+            flush_tcache(self) -> int
+                Returns all blocks cached by the calling thread to the shared pools.
+
+            tcache_stats(self) -> dict
+                Returns how often the thread caches were hit, missed and flushed.
+
+            trim_caches(self) -> int
+                Releases the free blocks, pools and arenas that outstayed their cache's maximum age.
+
+            metrics(self) -> dict
+                Returns the utilization and fragmentation of the manager from its usage counters.
+
+            add_hook(self, event, callback)
+                Registers a callback to be called on an allocator event.
+
+            remove_hook(self, event, callback)
+                Unregisters a callback of an allocator event.
+
+            _emit(self, event, item)
+                Calls the callbacks registered for an event.
+
+            event_counts(self) -> dict
+                Returns the number of times each allocator event happened.
+
+FUNCTIONS
+    _push(items, item)
+        Appends an item to a list and records its position on the item.
+
+    _pop(items, item)
+        Removes an item from a list in constant time using its recorded position.
 """
 
+import threading
+from contextlib import nullcontext
 from memory import Arena, Pool, Block
-from pympler import asizeof
+from large import LargeBlock, LargeObjectAllocator
+from freecache import FreeCache
+from analyzer import MemoryAnalyzer, SIZERS
+
+# The number of buckets of the pool occupancy histograms, each covering an equal share of a pool
+OCCUPANCY_BUCKETS = 10
+
+# The allocator events that are counted and can be hooked
+EVENTS = ('block_reuse', 'pool_new', 'pool_reuse', 'pool_release', 'arena_new', 'arena_reuse', 'arena_release')
+
+# The kinds of freed items kept for reuse, each in its own FreeCache
+FREE_CACHES = ('blocks', 'pools', 'arenas')
+
+def _push(items, item):
+    """
+    Appends an item to a list and records its position on the item.
+
+    Args:
+        items (list): The list of arenas or pools.
+        item (Arena | Pool): The item to be appended.
+    """
+    item.index = len(items)
+    items.append(item)
+
+def _pop(items, item):
+    """
+    Removes an item from a list in constant time using its recorded position.
+    The last item of the list is moved into the freed position.
+
+    Args:
+        items (list): The list of arenas or pools.
+        item (Arena | Pool): The item to be removed.
+    """
+    last = items.pop()
+    if last is not item:
+        items[item.index] = last
+        last.index = item.index
+    item.index = None
+
+class ThreadCache:
+    """
+    A per-thread cache of freed blocks for each size class, in front of the shared pools.
+    Like glibc's tcache, cached blocks stay allocated in their pools, so reusing one never
+    touches shared state.
+
+    Attributes:
+        bins (dict): Maps each size class to the freed blocks cached for it.
+        hits (int): The number of allocations served from the cache.
+        misses (int): The number of allocations that fell back to the shared pools.
+        flushes (int): The number of batches of blocks returned to the shared pools.
+        requested (dict): Maps each size class to the change in requested bytes made by reusing
+            cached blocks, which the thread records without taking the class lock.
+    """
+
+    def __init__(self):
+        """
+        Initializes the ThreadCache with empty bins and zero counters.
+        """
+        self.bins = {}
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self.requested = {}
+
+class ClassStats:
+    """
+    The usage counters of one size class, kept up to date on every allocation and deallocation.
+    In concurrent mode they are only changed under the lock of their size class.
+
+    Attributes:
+        blocks (int): The number of blocks held by the pools of the class.
+        requested (int): The sum of the sizes of those blocks.
+        pools (int): The number of pools serving the class.
+        occupancy (list): The number of pools of the class in each occupancy bucket.
+        reused (int): The number of free blocks reused for the class.
+    """
+    __slots__ = ('blocks', 'requested', 'pools', 'occupancy', 'reused')
+
+    def __init__(self):
+        """
+        Initializes the ClassStats with zero counters and an empty occupancy histogram.
+        """
+        self.blocks = 0
+        self.requested = 0
+        self.pools = 0
+        self.occupancy = [0] * OCCUPANCY_BUCKETS
+        self.reused = 0
+
+class FirstFitPolicy:
+    """
+    An arena policy that places new pools in the first arena of the manager with room.
+    This spreads pools across arenas, so lightly used arenas are rarely emptied and released.
+
+    Attributes:
+        manager (MemoryManager): The manager whose arenas are selected from.
+    """
+
+    def __init__(self, manager):
+        """
+        Initializes the FirstFitPolicy with the manager whose arenas it selects from.
+
+        Args:
+            manager (MemoryManager): The manager.
+        """
+        self.manager = manager
+
+    def select(self):
+        """
+        Returns the first arena with room for a pool, or None.
+
+        Returns:
+            Arena: The arena the next pool is placed in, or None if a new arena is needed.
+        """
+        pool_size = self.manager.pool_size
+        for arena in self.manager.arenas:
+            # Check if the arena has enough space for the pool
+            if arena.check_arena(pool_size):
+                return arena
+        return None
+
+    def update(self, arena):
+        """
+        Does nothing, since the arenas are scanned on every selection.
+
+        Args:
+            arena (Arena): The arena that gained or lost a pool.
+        """
+
+class MostUsedPolicy:
+    """
+    An arena policy that places new pools in the arena with the fewest free pools.
+    Like CPython's usable_arenas ordering, the fullest arenas fill up first, so lightly used arenas
+    drain and get released. Placement does not change the number of pools, and a new arena is only
+    made once every arena is full, so the peak number of arenas is set by the peak number of pools.
+
+    Arenas are filed in buckets by their number of free pools. Like the usedpools index, buckets
+    are validated lazily: an arena is filed again whenever it changes, and entries that no longer
+    match the arena are dropped when a selection comes across them.
+
+    Attributes:
+        manager (MemoryManager): The manager whose arenas are selected from.
+        buckets (dict): Maps each number of free pools to the arenas filed under it, as an ordered set.
+    """
+
+    def __init__(self, manager):
+        """
+        Initializes the MostUsedPolicy with the manager whose arenas it selects from and no buckets.
+
+        Args:
+            manager (MemoryManager): The manager.
+        """
+        self.manager = manager
+        self.buckets = {}
+
+    @staticmethod
+    def _free_pools(arena):
+        """
+        Returns the number of pools an arena still has room for.
+
+        Args:
+            arena (Arena): The arena.
+
+        Returns:
+            int: The number of free pools of the arena.
+        """
+        return (arena.maxsize - arena.bytes) // arena.pool_size
+
+    def select(self):
+        """
+        Returns an arena with the fewest free pools, or None if no arena has room.
+
+        Returns:
+            Arena: The arena the next pool is placed in, or None if a new arena is needed.
+        """
+        for free in sorted(self.buckets):
+            arenas = self.buckets[free]
+            while arenas:
+                arena = next(iter(arenas))
+                # Released arenas have no index, and arenas that changed were filed elsewhere
+                if arena.index is not None and self._free_pools(arena) == free:
+                    return arena
+                del arenas[arena]
+            del self.buckets[free]
+        return None
+
+    def update(self, arena):
+        """
+        Files an arena under its current number of free pools, unless it is full.
+
+        Args:
+            arena (Arena): The arena that gained or lost a pool.
+        """
+        free = self._free_pools(arena)
+        if free:
+            self.buckets.setdefault(free, {})[arena] = None
+
+# Maps the name of each arena policy to its class
+ARENA_POLICIES = {
+    'first_fit': FirstFitPolicy,
+    'most_used': MostUsedPolicy,
+}
 
 class MemoryManager:
     """
-    A singleton class to manage memory blocks, pools, and arenas.
+    A class to manage memory blocks, pools, and arenas.
+    Instances are independent heaps, so several can be used side by side, each with its own geometry.
+    A block can only be deallocated by the manager that allocated it, others reject it.
 
     Attributes:
-        _instance (MemoryManager): The singleton instance of the MemoryManager.
+        _instance (MemoryManager): The shared default instance of the MemoryManager.
         arenas (list): A list to store arenas.
-        free_blocks (list): A list to store free blocks.
-        free_pools (list): A list to store free pools.
-        free_arenas (list): A list to store free arenas.
+        free_blocks (FreeCache): The free blocks kept for reuse.
+        free_pools (FreeCache): The free pools kept for reuse.
+        free_arenas (FreeCache): The free arenas kept for reuse.
+        usedpools (dict): Maps each size class to the pools in use that still have room.
+        sizer (str | callable): The sizing strategy used to measure objects, see analyzer.SIZERS.
+        concurrent (bool): Whether the manager locks its state for use from several threads.
+        tcache (int): The number of freed blocks each thread caches per size class, 0 disables caching.
+        cached (set): The blocks currently held by a thread cache, to reject double frees.
+        pool_count (int): The number of pools in use across all arenas.
+        class_stats (dict): Maps each size class to its usage counters.
+        counters (dict): The number of times each pool and arena event happened, see EVENTS.
+        arena_size (int): The maximum size of the manager's arenas.
+        pool_size (int): The maximum size of the manager's pools.
+        max_block_size (int): The largest size the manager allocates.
+        alignment (int): The granularity of the manager's size classes.
+        large (LargeObjectAllocator): The allocator of objects larger than max_block_size.
+        arena_policy (FirstFitPolicy | MostUsedPolicy): Selects the arena each new pool is placed in.
 
     Methods:
         get_instance() -> MemoryManager:
-            Returns the singleton instance of the MemoryManager.
+            Returns the shared default instance of the MemoryManager.
+        _class_lock(size_class) -> RLock:
+            Returns the lock guarding the pools of a size class.
         _allocate_arena() -> Arena:
             Allocates a new arena or reuses a free arena.
         _allocate_pool(block_size) -> Pool:
             Allocates a new pool or reuses a free pool.
-        _allocate_block(obj) -> Block:
+        _find_pool(size_class) -> Pool:
+            Finds a pool with room for the size class in the usedpools index.
+        _class_stats(size_class) -> ClassStats:
+            Returns the usage counters of a size class, creating them if needed.
+        _occupancy(pool) -> int:
+            Returns the bucket of the occupancy histogram a pool falls in.
+        _place_block(pool, block):
+            Places a block in a pool and updates the usedpools index and the usage counters.
+        _measure(obj) -> int:
+            Measures the size of an object once for the whole allocation.
+        _make_block(obj, size) -> Block:
+            Creates a new block or reuses a free block, without placing it in a pool.
+        _allocate_block(obj, size=None) -> Block:
             Allocates a new block or reuses a free block.
-        allocate(obj):
-            Allocates memory for the given object.
+        allocate(obj, size=None) -> Block:
+            Allocates memory for the given object, measuring it unless its size is given.
+        allocate_many(objs) -> list:
+            Allocates memory for several objects, grouped by size class.
+        _deallocate(block) -> bool:
+            Deallocates the given block and saves it for reuse.
         deallocate(block) -> bool:
             Deallocates the given block(/pool/arena) and sets it for reuse.
+        free_many(blocks) -> int:
+            Deallocates several blocks, grouped by size class.
+        _thread_cache() -> ThreadCache:
+            Returns the thread cache of the calling thread, creating it if needed.
+        _flush(cache, blocks):
+            Returns cached blocks to the shared pools in one batch.
+        flush_tcache() -> int:
+            Returns all blocks cached by the calling thread to the shared pools.
+        tcache_stats() -> dict:
+            Returns how often the thread caches were hit, missed and flushed.
+        trim_caches() -> int:
+            Releases the free blocks, pools and arenas that outstayed their cache's maximum age.
+        metrics() -> dict:
+            Returns the utilization and fragmentation of the manager from its usage counters.
+        add_hook(event, callback):
+            Registers a callback to be called on an allocator event.
+        remove_hook(event, callback):
+            Unregisters a callback of an allocator event.
+        _emit(event, item):
+            Calls the callbacks registered for an event.
+        event_counts() -> dict:
+            Returns the number of times each allocator event happened.
     """
     _instance = None
 
-    def __init__(self):
+    def __init__(self, sizer='deep', concurrent=False, tcache=0, arena_size=None, pool_size=None,
+                 max_block_size=None, alignment=None, arena_policy='first_fit', cache_limits=None):
         """
-        Initializes the MemoryManager with empty lists for arenas, free blocks, free pools, and free arenas.
+        Initializes the MemoryManager with an empty list of arenas, empty caches of free blocks, pools and arenas,
+        an empty usedpools index, the sizing strategy used to measure objects, its locks, its thread caches,
+        and its geometry.
+
+        In concurrent mode, each size class has a lock guarding its pools, blocks and usedpools entry,
+        and one lock guards the arena list, the arenas and the free pools and arenas.
+        A size class lock is always taken before the arena lock.
+
+        Args:
+            sizer (str | callable): The name of a sizing strategy ('shallow', 'fast' or 'deep'),
+                or a function returning the size of an object. Default is 'deep'.
+            concurrent (bool): Whether to lock the manager's state for use from several threads.
+                Default is False, in which case the locks do nothing.
+            tcache (int): The number of freed blocks each thread caches per size class before
+                flushing half of them back to the shared pools. Default is 0, which disables caching.
+            arena_size (int): The maximum size of an arena. Default is None, which uses Arena.MAXSIZE.
+            pool_size (int): The maximum size of a pool. Default is None, which uses Pool.MAXSIZE.
+            max_block_size (int): The largest size allocated. Default is None, which uses Block.MAXSIZE.
+            alignment (int): The granularity of the size classes. Default is None, which uses Pool.ALIGNMENT.
+            arena_policy (str | callable): The name of an arena policy ('first_fit' or 'most_used'),
+                or a function creating a policy for the manager. Default is 'first_fit'.
+            cache_limits (dict): Maps kinds of FREE_CACHES to the keyword arguments of their FreeCache,
+                such as {'arenas': {'cap': 2}, 'pools': {'max_age': 1.0}}. Default is None, in which
+                case every freed item is kept.
 
         Raises:
-            Exception: If an instance of MemoryManager already exists.
+            ValueError: If the sizer or the arena policy is not a known name or a callable, if the
+                geometry is inconsistent, or if a cache limit is unknown or invalid.
         """
-        if MemoryManager._instance is not None:
-            raise Exception("This class is a singleton!")
+        cache_limits = cache_limits or {}
+        arena_size = Arena.MAXSIZE if arena_size is None else arena_size
+        pool_size = Pool.MAXSIZE if pool_size is None else pool_size
+        max_block_size = Block.MAXSIZE if max_block_size is None else max_block_size
+        alignment = Pool.ALIGNMENT if alignment is None else alignment
+        if not callable(sizer) and sizer not in SIZERS:
+            raise ValueError(f"Unknown sizing strategy: {sizer}")
+        elif not callable(arena_policy) and arena_policy not in ARENA_POLICIES:
+            raise ValueError(f"Unknown arena policy: {arena_policy}")
+        elif alignment <= 0 or alignment % 8 != 0:
+            raise ValueError("Alignment must be a positive multiple of 8")
+        elif not 0 < Pool.size_class(max_block_size, alignment) <= pool_size <= arena_size:
+            raise ValueError("A block must fit in a pool and a pool in an arena")
+        elif not set(cache_limits) <= set(FREE_CACHES):
+            raise ValueError(f"Unknown free caches: {sorted(set(cache_limits) - set(FREE_CACHES))}")
         else:
             self.arenas = []
-            self.free_blocks = []
-            self.free_pools = []
-            self.free_arenas = []
-            MemoryManager._instance = self
+            # Blocks are freed under their size class lock, so their cache locks itself if bounded
+            self.free_blocks = FreeCache(concurrent=concurrent, **cache_limits.get('blocks', {}))
+            # Pools and arenas are freed under the arena lock
+            self.free_pools = FreeCache(**cache_limits.get('pools', {}))
+            self.free_arenas = FreeCache(**cache_limits.get('arenas', {}))
+            # Like pymalloc's usedpools, each dict is used as an ordered set of pools
+            self.usedpools = {}
+            self.sizer = sizer
+            self.concurrent = concurrent
+            self._class_locks = {}
+            self._arena_lock = threading.RLock() if concurrent else nullcontext()
+            self.tcache = tcache
+            self._tcaches = []
+            # set.add and set.discard are atomic, so the set needs no lock
+            self.cached = set()
+            self._local = threading.local()
+            self.pool_count = 0
+            self.class_stats = {}
+            # Pool and arena events are counted under the arena lock, block reuse in class_stats
+            self.counters = dict.fromkeys(EVENTS[1:], 0)
+            # Maps each hooked event to its callbacks, empty while no hook is registered
+            self._hooks = {}
+            self.arena_size = arena_size
+            self.pool_size = pool_size
+            self.max_block_size = max_block_size
+            self.alignment = alignment
+            self.large = LargeObjectAllocator(concurrent=concurrent)
+            # The policy is only used under the arena lock
+            self.arena_policy = ARENA_POLICIES.get(arena_policy, arena_policy)(self)
 
     @staticmethod
     def get_instance():
         """
-        Returns the singleton instance of the MemoryManager.
+        Returns the shared default instance of the MemoryManager, creating it with the default
+        geometry if needed.
 
         Returns:
-            MemoryManager: The singleton instance of the MemoryManager.
+            MemoryManager: The shared default instance of the MemoryManager.
         """
         if MemoryManager._instance is None:
-            MemoryManager()
+            MemoryManager._instance = MemoryManager()
         return MemoryManager._instance
 
+    def _class_lock(self, size_class):
+        """
+        Returns the lock guarding the pools of a size class.
+
+        Args:
+            size_class (int): The size class of the pools.
+
+        Returns:
+            RLock: The lock of the size class, or a context that does nothing if not concurrent.
+        """
+        if not self.concurrent:
+            return self._arena_lock
+        lock = self._class_locks.get(size_class)
+        if lock is None:
+            # dict.setdefault is atomic, so racing threads end up with the same lock
+            lock = self._class_locks.setdefault(size_class, threading.RLock())
+        return lock
+
     def _allocate_arena(self):
         """
         Allocates a new arena or reuses a free arena.
@@ -98,14 +554,20 @@ class MemoryManager:
         Returns:
             Arena: The allocated or reused arena.
         """
-        if self.free_arenas:
-            # Check if there is a free arena
-            arena = self.free_arenas.pop()
-        else:
-            # If there is no free arena, create a new arena
-            arena = Arena()
+        with self._arena_lock:
+            try:
+                # Check if there is a free arena, the cache may release stale ones when popped
+                arena = self.free_arenas.pop()
+                event = 'arena_reuse'
+            except IndexError:
+                # If there is no free arena, create a new arena
+                arena = Arena(self.arena_size, self.pool_size, self)
+                event = 'arena_new'
 
-        self.arenas.append(arena)
+            _push(self.arenas, arena)
+            self.counters[event] += 1
+            if self._hooks:
+                self._emit(event, arena)
         return arena
 
     def _allocate_pool(self, block_size):
@@ -118,115 +580,587 @@ class MemoryManager:
         Returns:
             Pool: The allocated or reused pool.
         """
-        if self.free_pools:
-            # Check if there is a free pool
-            pool = self.free_pools.pop()
-            pool.block_size = block_size
-        else:
-            # If there is no free pool, create a new pool
-            pool = Pool(block_size)
+        with self._arena_lock:
+            try:
+                # Check if there is a free pool, the cache may release stale ones when popped
+                pool = self.free_pools.pop()
+                pool.reset(block_size)
+                event = 'pool_reuse'
+            except IndexError:
+                # If there is no free pool, create a new pool
+                pool = Pool(block_size, self.pool_size)
+                event = 'pool_new'
 
-        for arena in self.arenas:
-            # Check if the arena has enough space for the pool
-            if arena.check_arena(pool.MAXSIZE):
-                arena.pools.append(pool)
-                arena.bytes += pool.MAXSIZE
-                return pool
+            arena = self.arena_policy.select()
+            if arena is None:
+                # If no existing arena can fit the pool, create a new arena
+                arena = self._allocate_arena()
 
-        # If no existing arena can fit the pool, create a new arena
-        arena = self._allocate_arena()
-        arena.pools.append(pool)
-        arena.bytes += pool.MAXSIZE
+            _push(arena.pools, pool)
+            pool.arena = arena
+            arena.bytes += pool.maxsize
+            self.arena_policy.update(arena)
+            self.pool_count += 1
+            stats = self._class_stats(block_size)
+            stats.pools += 1
+            stats.occupancy[0] += 1
+            self.usedpools.setdefault(block_size, {})[pool] = None
+            self.counters[event] += 1
+            if self._hooks:
+                self._emit(event, pool)
         return pool
 
-    def _allocate_block(self, obj):
+    def _find_pool(self, size_class):
+        """
+        Finds a pool with room for the size class in the usedpools index.
+        A pool is eligible whenever it has a free slot, however full its arena is, since its
+        memory is already reserved. Entries that no longer have room are dropped on the way.
+
+        Args:
+            size_class (int): The size class of the block to be placed.
+
+        Returns:
+            Pool: A pool with room for the block, or None if there is none.
+        """
+        pools = self.usedpools.get(size_class)
+        while pools:
+            pool = next(iter(pools))
+            if pool.check_pool(size_class) and pool.arena is not None:
+                return pool
+            del pools[pool]
+        return None
+
+    def _class_stats(self, size_class):
+        """
+        Returns the usage counters of a size class, creating them if needed.
+
+        Args:
+            size_class (int): The size class.
+
+        Returns:
+            ClassStats: The counters of the size class.
+        """
+        stats = self.class_stats.get(size_class)
+        if stats is None:
+            # dict.setdefault is atomic, so racing threads end up with the same counters
+            stats = self.class_stats.setdefault(size_class, ClassStats())
+        return stats
+
+    @staticmethod
+    def _occupancy(pool):
+        """
+        Returns the bucket of the occupancy histogram a pool falls in.
+
+        Args:
+            pool (Pool): The pool.
+
+        Returns:
+            int: The bucket of the share of the pool's bytes in use, full pools being in the last one.
+        """
+        return min(pool.bytes * OCCUPANCY_BUCKETS // pool.maxsize, OCCUPANCY_BUCKETS - 1)
+
+    def _place_block(self, pool, block):
+        """
+        Places a block in a pool and updates the usedpools index and the usage counters.
+
+        Args:
+            pool (Pool): The pool to place the block in.
+            block (Block): The block to be placed.
+        """
+        before = self._occupancy(pool)
+        pool.take_slot(block)
+        block.pool = pool
+        pool.bytes += pool.block_size
+
+        stats = self._class_stats(pool.block_size)
+        stats.blocks += 1
+        stats.requested += block.block_size
+        stats.occupancy[before] -= 1
+        stats.occupancy[self._occupancy(pool)] += 1
+
+        # A full pool has no room left for its size class
+        if not pool.check_pool(pool.block_size):
+            self.usedpools[pool.block_size].pop(pool, None)
+
+    def _measure(self, obj):
+        """
+        Measures the size of an object once for the whole allocation.
+        The size is then carried through block creation, pool selection and placement.
+
+        Args:
+            obj (object): The object to be measured.
+
+        Returns:
+            int: The size of the object in bytes.
+        """
+        return MemoryAnalyzer.get_instance().measure_size(obj, self.sizer)
+
+    def _make_block(self, obj, size):
+        """
+        Creates a new block or reuses a free block, without placing it in a pool.
+
+        Args:
+            obj (object): The object to be stored in the block.
+            size (int): The measured size of the object.
+
+        Returns:
+            Block: The new or reused block.
+        """
+        try:
+            # Check if there is a free block, popping is atomic even without locks
+            block = self.free_blocks.pop()
+        except IndexError:
+            # If there is no free block, create a new block
+            return Block(obj, size, self.max_block_size)
+        block.obj = obj
+        block.block_size = size
+        self._class_stats(Pool.size_class(size, self.alignment)).reused += 1
+        if self._hooks:
+            self._emit('block_reuse', block)
+        return block
+
+    def _allocate_block(self, obj, size=None):
         """
         Allocates a new block or reuses a free block.
 
         Args:
             obj (object): The object to be stored in the block.
+            size (int): The measured size of the object. Default is None, in which case
+                the object is measured.
 
         Returns:
-            Block: The allocated or reused block.
+            Block: The allocated or reused block, or None if no pool has room for it.
 
         Raises:
-            ValueError: If the size of the object exceeds the maximum block size.
+            ValueError: If the size is not between 1 and the maximum block size.
         """
-        if self.free_blocks:
-            # Check if there is a free block
-            block = self.free_blocks.pop()
+        if size is None:
+            size = self._measure(obj)
+        if size < 1:
+            raise ValueError("Size must be positive")
+        if size > self.max_block_size:
+            raise ValueError("Size too large")
 
-            size = asizeof.asizeof(obj)
-            if size > block.MAXSIZE:
-                raise ValueError("Size too large")
-            block.obj = obj
-            block.block_size = size
-        else:
-            # If there is no free block, create a new block
-            block = Block(obj)
-
-        for arena in self.arenas:
-            if arena.check_arena(4000):
-                for pool in arena.pools:
-                    # Check if the pool has enough space for the block
-                    if pool.check_pool(block.block_size):
-                        pool.blocks.append(block)
-                        pool.bytes += block.block_size
-                        return block
-        return None
+        size_class = Pool.size_class(size, self.alignment)
+        with self._class_lock(size_class):
+            pool = self._find_pool(size_class)
+            if pool is None:
+                return None
+            block = self._make_block(obj, size)
+            self._place_block(pool, block)
+        return block
 
-    def allocate(self, obj):
+    def allocate(self, obj, size=None):
         """
         Allocates memory for the given object.
+        Objects larger than the maximum block size get an extent from the large object allocator.
 
         Args:
             obj (object): The object to be allocated memory.
+            size (int): The size to allocate for the object. Default is None, in which case
+                the object is measured.
+
+        Returns:
+            Block | LargeBlock: The block holding the object, to be passed to deallocate.
 
         Raises:
-            ValueError: If the size of the object exceeds the maximum block size.
+            ValueError: If the size is not positive.
+        """
+        if size is None:
+            size = self._measure(obj)
+        if size < 1:
+            raise ValueError("Size must be positive")
+        if size > self.max_block_size:
+            return self.large.allocate(obj, size)
+        size_class = Pool.size_class(size, self.alignment)
+        if self.tcache:
+            cache = self._thread_cache()
+            cached = cache.bins.get(size_class)
+            if cached:
+                # The block is still held by its pool, so only the block itself changes
+                cache.hits += 1
+                block = cached.pop()
+                self.cached.discard(block)
+                cache.requested[size_class] = cache.requested.get(size_class, 0) + size - block.block_size
+                block.obj = obj
+                block.block_size = size
+                return block
+            cache.misses += 1
+
+        with self._class_lock(size_class):
+            block = self._allocate_block(obj, size)
+            # If there is no block since no pool, create a new pool
+            if block is None:
+                pool = self._allocate_pool(size_class)
+                block = self._make_block(obj, size)
+                self._place_block(pool, block)
+        return block
+
+    def allocate_many(self, objs):
         """
-        block = self._allocate_block(obj)
-        # If there is no block since no pool, create a new pool
-        if block is None:
-            block = Block(obj)
-            pool = self._allocate_pool(block.block_size)
-            pool.blocks.append(block)
-            pool.bytes += block.block_size
+        Allocates memory for several objects.
+        The blocks are grouped by size class, so each class lock is taken once for the batch.
+        Every block gets its pool through _find_pool like a single allocation, so the batch lays
+        out blocks exactly as allocating them one by one would. Large objects get their extents
+        one at a time.
+
+        Args:
+            objs (iterable): The objects to be allocated memory.
+
+        Returns:
+            list: The blocks holding the objects, in the same order.
+
+        Raises:
+            ValueError: If the size of an object is not positive, before anything is allocated.
+        """
+        sized = [(obj, self._measure(obj)) for obj in objs]
+        if any(size < 1 for _, size in sized):
+            raise ValueError("Size must be positive")
+        blocks = [None] * len(sized)
+
+        classes = {}
+        for position, (obj, size) in enumerate(sized):
+            if size > self.max_block_size:
+                blocks[position] = self.large.allocate(obj, size)
+            else:
+                classes.setdefault(Pool.size_class(size, self.alignment), []).append(position)
+
+        for size_class, positions in classes.items():
+            with self._class_lock(size_class):
+                for position in positions:
+                    # The first indexed pool is checked again, since filling a new pool can fill its arena
+                    pool = self._find_pool(size_class) or self._allocate_pool(size_class)
+                    block = blocks[position] = self._make_block(*sized[position])
+                    self._place_block(pool, block)
+        return blocks
+
+    def _deallocate(self, block):
+        """
+        Deallocates the given block and saves it for reuse.
+
+        Args:
+            block (Block): The block to be deallocated.
+
+        Returns:
+            bool: True if the block was successfully deallocated, False otherwise.
+        """
+        pool = getattr(block, 'pool', None)
+        if pool is None or block in self.cached:
+            return False
+        with self._class_lock(pool.block_size):
+            # The block may have been freed by another thread before the lock was taken,
+            # or belong to another manager, whose arenas this manager must not touch
+            if (block.pool is not pool or not pool.check_block(block) or pool.arena is None
+                    or pool.arena.owner is not self):
+                return False
+
+            # Remove the block from the pool
+            before = self._occupancy(pool)
+            pool.release_slot(block)
+            block.pool = None
+            pool.bytes -= pool.block_size
+
+            stats = self._class_stats(pool.block_size)
+            stats.blocks -= 1
+            stats.requested -= block.block_size
+            stats.occupancy[before] -= 1
+            if pool.bytes != 0:
+                stats.occupancy[self._occupancy(pool)] += 1
+            else:
+                stats.pools -= 1
+
+            # Save the block for reuse, unless its cache releases it
+            self.free_blocks.append(block)
+
+            pools = self.usedpools.setdefault(pool.block_size, {})
+            if pool.bytes != 0:
+                # The pool has room again, so it is put back in the index
+                pools[pool] = None
+                return True
+
+            # If the pool is empty, remove the pool from the usedpools index and the arena
+            pools.pop(pool, None)
+            with self._arena_lock:
+                arena = pool.arena
+                _pop(arena.pools, pool)
+                pool.arena = None
+                arena.bytes -= pool.maxsize
+                self.pool_count -= 1
+
+                # Save the pool for reuse, unless its cache releases it
+                self.free_pools.append(pool)
+                self.counters['pool_release'] += 1
+                if self._hooks:
+                    self._emit('pool_release', pool)
+
+                # If the arena is empty, remove the arena from the memory manager
+                if arena.bytes == 0:
+                    _pop(self.arenas, arena)
+
+                    # Save the arena for reuse, unless its cache releases it
+                    self.free_arenas.append(arena)
+                    self.counters['arena_release'] += 1
+                    if self._hooks:
+                        self._emit('arena_release', arena)
+                else:
+                    self.arena_policy.update(arena)
+
+        return True
 
     def deallocate(self, block):
         """
         Deallocates the given block and reuses it if possible.
+        The block's pool, slot and arena are found through its back-pointers, so no list is scanned.
 
         Args:
-            block (Block): The block to be deallocated.
+            block (Block | LargeBlock): The block to be deallocated.
 
         Returns:
             bool: True if the block was successfully deallocated, False otherwise.
         """
-        for arena in self.arenas:
-            for pool in arena.pools:
-                if block in pool.blocks:
-                    # Remove the block from the pool
-                    pool.blocks.remove(block)
-                    pool.bytes -= block.block_size
+        if block.__class__ is LargeBlock:
+            return self.large.free(block)
+        if self.tcache:
+            pool = getattr(block, 'pool', None)
+            # The same ownership check as _deallocate, so no stray block is cached and handed out again
+            if (pool is None or block in self.cached or not pool.check_block(block) or pool.arena is None
+                    or pool.arena.owner is not self):
+                return False
+            cache = self._thread_cache()
+            cached = cache.bins.setdefault(pool.block_size, [])
+            if len(cached) >= self.tcache:
+                # Flush the oldest half of the bin back to the shared pools in one batch
+                count = max(len(cached) // 2, 1)
+                self._flush(cache, cached[:count])
+                del cached[:count]
+            self.cached.add(block)
+            cached.append(block)
+            return True
+
+        return self._deallocate(block)
+
+    def free_many(self, blocks):
+        """
+        Deallocates several blocks, grouped by size class.
+
+        Args:
+            blocks (iterable): The blocks to be deallocated.
+
+        Returns:
+            int: The number of blocks that were successfully deallocated.
+        """
+        freed = 0
+        classes = {}
+        for block in blocks:
+            if block.__class__ is LargeBlock:
+                freed += self.large.free(block)
+                continue
+            pool = getattr(block, 'pool', None)
+            classes.setdefault(pool.block_size if pool is not None else None, []).append(block)
+
+        for size_class, group in classes.items():
+            # The lock is reentrant, so each group takes it once instead of once per block
+            with self._class_lock(size_class) if size_class is not None else nullcontext():
+                for block in group:
+                    freed += self._deallocate(block)
+        return freed
+
+    def _thread_cache(self):
+        """
+        Returns the thread cache of the calling thread, creating it if needed.
+
+        Returns:
+            ThreadCache: The cache of the calling thread.
+        """
+        cache = getattr(self._local, 'cache', None)
+        if cache is None:
+            cache = self._local.cache = ThreadCache()
+            with self._arena_lock:
+                self._tcaches.append(cache)
+        return cache
+
+    def _flush(self, cache, blocks):
+        """
+        Returns cached blocks to the shared pools in one batch.
+
+        Args:
+            cache (ThreadCache): The cache the blocks are flushed from.
+            blocks (list): The cached blocks to be returned.
+        """
+        for block in blocks:
+            self.cached.discard(block)
+        cache.flushes += 1
+        self.free_many(blocks)
+
+    def flush_tcache(self):
+        """
+        Returns all blocks cached by the calling thread to the shared pools.
+        Threads should call this before exiting, otherwise their cached blocks stay held by their pools.
+
+        Returns:
+            int: The number of blocks returned to the shared pools.
+        """
+        cache = getattr(self._local, 'cache', None)
+        if cache is None:
+            return 0
+        blocks = [block for cached in cache.bins.values() for block in cached]
+        cache.bins.clear()
+        if blocks:
+            self._flush(cache, blocks)
+        return len(blocks)
 
-                    # Save the block for reuse
-                    self.free_blocks.append(block)
+    def tcache_stats(self):
+        """
+        Returns how often the thread caches were hit, missed and flushed.
+
+        Returns:
+            dict: The hits, misses and flushes summed over all threads, and the number of blocks
+                currently cached.
+        """
+        with self._arena_lock:
+            caches = list(self._tcaches)
+        return {
+            'hits': sum(cache.hits for cache in caches),
+            'misses': sum(cache.misses for cache in caches),
+            'flushes': sum(cache.flushes for cache in caches),
+            'cached': len(self.cached),
+        }
+
+    def trim_caches(self):
+        """
+        Releases the free blocks, pools and arenas that outstayed their cache's maximum age.
+        Caches are otherwise only trimmed when used, so an idle manager should be trimmed
+        periodically to give its footprint back after a spike.
+
+        Returns:
+            int: The number of items released.
+        """
+        released = self.free_blocks.trim()
+        with self._arena_lock:
+            released += self.free_pools.trim() + self.free_arenas.trim()
+        return released
 
-                    # If the pool is empty, remove the pool from the arena
-                    if pool.bytes == 0:
-                        arena.pools.remove(pool)
-                        arena.bytes -= pool.MAXSIZE
+    def metrics(self):
+        """
+        Returns the utilization and fragmentation of the manager from its usage counters.
+        The counters are kept up to date on every allocation and deallocation, so this never walks
+        the arenas, pools or blocks. Blocks held by thread caches count as used.
 
-                        # Save the pool for reuse
-                        self.free_pools.append(pool)
+        The totals cover large objects too: their mapped bytes count as reserved, the extents of
+        live large objects as used, and their sizes as requested. Fragmentation is given as
+        fractions of the reserved bytes: internal fragmentation is lost to rounding sizes up to
+        their size class or to whole pages, external fragmentation to free slots and free extents.
+        The per size class figures only cover pools, and the large objects are also reported on
+        their own, see LargeObjectAllocator.metrics.
 
-                    # If the arena is empty, remove the arena from the memory manager
-                    if arena.bytes == 0:
-                        self.arenas.remove(arena)
+        Returns:
+            dict: The numbers of arenas, pools and blocks in use and on the free lists, the numbers
+                retained and released by each free cache, the bytes reserved, used and requested,
+                the internal and external fragmentation, the pool occupancy histogram, per size
+                class its blocks, pools, bytes and fragmentation, and the metrics of the large objects.
+        """
+        with self._arena_lock:
+            caches = list(self._tcaches)
+        classes = {}
+        occupancy = [0] * OCCUPANCY_BUCKETS
+        for size_class, stats in sorted(list(self.class_stats.items())):
+            requested = stats.requested + sum(cache.requested.get(size_class, 0) for cache in caches)
+            used = stats.blocks * size_class
+            reserved = stats.pools * self.pool_size
+            for bucket, count in enumerate(stats.occupancy):
+                occupancy[bucket] += count
+            classes[size_class] = {
+                'blocks': stats.blocks,
+                'pools': stats.pools,
+                'reserved': reserved,
+                'used': used,
+                'requested': requested,
+                'internal_fragmentation': (used - requested) / reserved if reserved else 0.0,
+                'external_fragmentation': (reserved - used) / reserved if reserved else 0.0,
+            }
 
-                        # Save the arena for reuse
-                        self.free_arenas.append(arena)
+        large = self.large.metrics()
+        reserved = sum(stats['reserved'] for stats in classes.values()) + large['mapped']
+        used = sum(stats['used'] for stats in classes.values()) + large['reserved']
+        requested = sum(stats['requested'] for stats in classes.values()) + large['requested']
+        return {
+            'arenas': len(self.arenas),
+            'pools': self.pool_count,
+            'blocks': sum(stats['blocks'] for stats in classes.values()) + large['blocks'],
+            'free_arenas': len(self.free_arenas),
+            'free_pools': len(self.free_pools),
+            'free_blocks': len(self.free_blocks),
+            'free_caches': {
+                'blocks': self.free_blocks.stats(),
+                'pools': self.free_pools.stats(),
+                'arenas': self.free_arenas.stats(),
+            },
+            'reserved': reserved,
+            'used': used,
+            'requested': requested,
+            'internal_fragmentation': (used - requested) / reserved if reserved else 0.0,
+            'external_fragmentation': (reserved - used) / reserved if reserved else 0.0,
+            'occupancy': occupancy,
+            'classes': classes,
+            'large': large,
+        }
+
+    def add_hook(self, event, callback):
+        """
+        Registers a callback to be called on an allocator event.
+        Callbacks run with the manager's locks held, so they should be quick. While no hook is
+        registered, an event costs a single check of an empty dict.
 
-                    return True
-        return False
+        Args:
+            event (str): One of EVENTS.
+            callback (callable): Called with the block, pool or arena the event happened to.
+
+        Raises:
+            ValueError: If the event is unknown.
+        """
+        if event not in EVENTS:
+            raise ValueError(f"Unknown allocator event: {event}")
+        with self._arena_lock:
+            # Replace the list rather than append to it, so events being emitted are unaffected
+            self._hooks[event] = self._hooks.get(event, []) + [callback]
+
+    def remove_hook(self, event, callback):
+        """
+        Unregisters a callback of an allocator event.
+
+        Args:
+            event (str): One of EVENTS.
+            callback (callable): A callback registered with add_hook.
+
+        Raises:
+            ValueError: If the callback is not registered for the event.
+        """
+        with self._arena_lock:
+            callbacks = list(self._hooks.get(event, ()))
+            callbacks.remove(callback)
+            if callbacks:
+                self._hooks[event] = callbacks
+            else:
+                del self._hooks[event]
+
+    def _emit(self, event, item):
+        """
+        Calls the callbacks registered for an event.
+
+        Args:
+            event (str): One of EVENTS.
+            item (Block | Pool | Arena): The block, pool or arena the event happened to.
+        """
+        for callback in self._hooks.get(event, ()):
+            callback(item)
+
+    def event_counts(self):
+        """
+        Returns the number of times each allocator event happened.
+
+        Returns:
+            dict: Maps each of EVENTS to its count.
+        """
+        counts = {'block_reuse': sum(stats.reused for stats in list(self.class_stats.values()))}
+        counts.update(self.counters)
+        return counts
@@ -5,14 +5,17 @@ NAME
 DESCRIPTION
     This module provides classes for memory management, including Arena, Pool, and Block.
     It uses the MemoryAnalyzer class to analyze and track memory usage of Python objects.
+    The classes use __slots__, so simulated arenas, pools and blocks carry no __dict__.
+    The MAXSIZE constants are the default geometry. Arenas and pools also record the sizes
+    they were created with, so managers with different geometries can coexist.
 
 CLASSES
     Arena
         A class to represent an Arena for memory management.
 
         Methods defined here:
-            __init__(self)
-                Initializes the Arena with an empty list of pools and zero bytes.
+            __init__(self, maxsize=None, pool_size=None, owner=None)
+                Initializes the Arena with an empty list of pools, zero bytes, no index, its geometry and its owner.
 
             check_arena(self, pool_size=4000) -> bool
                 Checks if adding a new pool would exceed the maximum size of the arena.
@@ -21,18 +24,44 @@ CLASSES
         A class to represent a Pool for memory management.
 
         Methods defined here:
-            __init__(self, block_size)
-                Initializes the Pool with an empty list of blocks, zero bytes, and a specified block size.
+            __init__(self, block_size, maxsize=None)
+                Initializes the Pool with no slots, zero bytes, a specified block size and maximum size,
+                and no owning arena.
+
+            blocks -> list
+                The blocks in the pool, in slot order.
+
+            reset(self, block_size)
+                Clears the slots of an empty pool and sets the block size it serves.
 
             check_pool(self, block_size) -> bool
                 Checks if adding a new block would exceed the maximum size of the pool.
 
+            check_block(self, block) -> bool
+                Checks if a block occupies its recorded slot in the pool.
+
+            take_slot(self, block) -> int
+                Places a block in the most recently freed slot, or the next unused one.
+
+            release_slot(self, block)
+                Frees the slot of a block for reuse.
+
+            offsets(self) -> list
+                Returns the byte offsets of the used slots.
+
+            free_offsets(self) -> list
+                Returns the byte offsets of the free slots, up to the pool's capacity.
+
+            size_class(size, alignment=None) -> int
+                Rounds a size up to the size class served by pools.
+
     Block
         A class to represent a Block for memory management.
 
         Methods defined here:
-            __init__(self, obj)
-                Initializes the Block with an object and measures its size.
+            __init__(self, obj, size=None, maxsize=None)
+                Initializes the Block with an object, measures its size unless given, and leaves it
+                without a pool or slot.
 """
 
 import math
@@ -43,22 +72,36 @@ class Arena:
     A class to represent an Arena for memory management.
 
     Attributes:
-        MAXSIZE (int): The maximum size of the arena.
+        MAXSIZE (int): The default maximum size of an arena.
         pools (list): A list to store pools in the arena.
         bytes (int): The current size of the arena in bytes.
+        index (int): The position of the arena in its manager's list of arenas, or None.
+        maxsize (int): The maximum size of the arena.
+        pool_size (int): The size of the pools the arena holds.
+        owner (MemoryManager): The manager the arena belongs to, or None.
 
     Methods:
         check_arena(pool_size=4000) -> bool:
             Checks if adding a new pool would exceed the maximum size of the arena.
     """
     MAXSIZE = 256000
+    __slots__ = ('pools', 'bytes', 'index', 'maxsize', 'pool_size', 'owner')
 
-    def __init__(self):
+    def __init__(self, maxsize=None, pool_size=None, owner=None):
         """
-        Initializes the Arena with an empty list of pools and zero bytes.
+        Initializes the Arena with an empty list of pools, zero bytes, no index, its geometry and its owner.
+
+        Args:
+            maxsize (int): The maximum size of the arena. Default is None, which uses MAXSIZE.
+            pool_size (int): The size of the pools the arena holds. Default is None, which uses Pool.MAXSIZE.
+            owner (MemoryManager): The manager the arena belongs to. Default is None.
         """
         self.pools = []
         self.bytes = 0
+        self.index = None
+        self.maxsize = self.MAXSIZE if maxsize is None else maxsize
+        self.pool_size = Pool.MAXSIZE if pool_size is None else pool_size
+        self.owner = owner
 
     def check_arena(self, pool_size=4000):
         """
@@ -75,27 +118,82 @@ class Arena:
         """
         if not isinstance(pool_size, int):
             raise TypeError("Pool size must be an integer")
-        return self.bytes + pool_size <= self.MAXSIZE and pool_size == Pool.MAXSIZE
+        return self.bytes + pool_size <= self.maxsize and pool_size == self.pool_size
 
 class Pool:
     """
     A class to represent a Pool for memory management.
 
     Attributes:
-        MAXSIZE (int): The maximum size of the pool.
-        blocks (list): A list to store blocks in the pool.
+        MAXSIZE (int): The default maximum size of a pool.
+        ALIGNMENT (int): The default granularity of the size classes served by pools.
+        slots (list): The block in each slot of the pool, or None for a free slot.
+            Only grows up to the highest slot used so far.
+        freeslots (list): A stack of free slots below the highest slot used, like pymalloc's freeblock list.
         bytes (int): The current size of the pool in bytes.
         block_size (int): The size of each block in the pool.
+        arena (Arena): The arena the pool belongs to, or None.
+        index (int): The position of the pool in its arena's list of pools, or None.
+        maxsize (int): The maximum size of the pool.
 
     Methods:
+        blocks -> list:
+            The blocks in the pool, in slot order.
+        reset(block_size):
+            Clears the slots of an empty pool and sets the block size it serves.
         check_pool(block_size) -> bool:
             Checks if adding a new block would exceed the maximum size of the pool.
+        check_block(block) -> bool:
+            Checks if a block occupies its recorded slot in the pool.
+        take_slot(block) -> int:
+            Places a block in the most recently freed slot, or the next unused one.
+        release_slot(block):
+            Frees the slot of a block for reuse.
+        offsets() -> list:
+            Returns the byte offsets of the used slots.
+        free_offsets() -> list:
+            Returns the byte offsets of the free slots, up to the pool's capacity.
+        size_class(size, alignment=None) -> int:
+            Rounds a size up to the size class served by pools.
     """
     MAXSIZE = 4000
+    ALIGNMENT = 8
+    __slots__ = ('slots', 'freeslots', 'bytes', 'block_size', 'arena', 'index', 'maxsize')
+
+    def __init__(self, block_size, maxsize=None):
+        """
+        Initializes the Pool with no slots, zero bytes, a specified block size and maximum size,
+        and no owning arena.
+
+        Args:
+            block_size (int): The size of each block in the pool.
+            maxsize (int): The maximum size of the pool. Default is None, which uses MAXSIZE.
+
+        Raises:
+            TypeError: If block_size is not an integer.
+            ValueError: If block_size is not divisible by 8 or is zero.
+        """
+        self.slots = []
+        self.freeslots = []
+        self.bytes = 0
+        self.arena = None
+        self.index = None
+        self.maxsize = self.MAXSIZE if maxsize is None else maxsize
+        self.reset(block_size)
+
+    @property
+    def blocks(self):
+        """
+        The blocks in the pool, in slot order.
+
+        Returns:
+            list: The blocks in the used slots.
+        """
+        return [block for block in self.slots if block is not None]
 
-    def __init__(self, block_size):
+    def reset(self, block_size):
         """
-        Initializes the Pool with an empty list of blocks, zero bytes, and a specified block size.
+        Clears the slots of an empty pool and sets the block size it serves.
 
         Args:
             block_size (int): The size of each block in the pool.
@@ -109,8 +207,8 @@ class Pool:
         if block_size % 8 != 0 or block_size == 0:
             raise ValueError("Block size must be divisible by 8")
 
-        self.blocks = []
-        self.bytes = 0
+        self.slots.clear()
+        self.freeslots.clear()
         self.block_size = block_size
 
     def check_pool(self, block_size):
@@ -128,37 +226,131 @@ class Pool:
         """
         if not isinstance(block_size, int):
             raise TypeError("Block size must be an integer")
-        return self.bytes + block_size <= self.MAXSIZE and self.block_size == block_size
+        return self.bytes + block_size <= self.maxsize and self.block_size == block_size
+
+    def check_block(self, block):
+        """
+        Checks if a block occupies its recorded slot in the pool.
+
+        Args:
+            block (Block): The block to look for.
+
+        Returns:
+            bool: True if the block is in the pool, False otherwise.
+        """
+        slot = block.slot
+        return slot is not None and slot < len(self.slots) and self.slots[slot] is block
+
+    def take_slot(self, block):
+        """
+        Places a block in the most recently freed slot, or the next unused one.
+
+        Args:
+            block (Block): The block to be placed.
+
+        Returns:
+            int: The slot of the block.
+        """
+        if self.freeslots:
+            slot = self.freeslots.pop()
+            self.slots[slot] = block
+        else:
+            slot = len(self.slots)
+            self.slots.append(block)
+        block.slot = slot
+        return slot
+
+    def release_slot(self, block):
+        """
+        Frees the slot of a block for reuse.
+
+        Args:
+            block (Block): The block to be removed, which must be in the pool.
+        """
+        self.slots[block.slot] = None
+        self.freeslots.append(block.slot)
+        block.slot = None
+
+    def offsets(self):
+        """
+        Returns the byte offsets of the used slots.
+
+        Returns:
+            list: The offset of each used slot from the start of the pool, in increasing order.
+        """
+        return [slot * self.block_size for slot, block in enumerate(self.slots) if block is not None]
+
+    def free_offsets(self):
+        """
+        Returns the byte offsets of the free slots, up to the pool's capacity.
+
+        Returns:
+            list: The offset of each free slot from the start of the pool, in increasing order.
+        """
+        capacity = self.maxsize // self.block_size
+        used = set(self.offsets())
+        return [offset for offset in range(0, capacity * self.block_size, self.block_size) if offset not in used]
+
+    @classmethod
+    def size_class(cls, size, alignment=None):
+        """
+        Rounds a size up to the size class served by pools.
+
+        Args:
+            size (int): The size of a block in bytes.
+            alignment (int): The granularity of the size classes. Default is None, which uses ALIGNMENT.
+
+        Returns:
+            int: The size rounded up to a multiple of the alignment.
+
+        Raises:
+            TypeError: If size is not an integer.
+        """
+        if not isinstance(size, int):
+            raise TypeError("Size must be an integer")
+        if alignment is None:
+            alignment = cls.ALIGNMENT
+        return -(-size // alignment) * alignment
 
 class Block:
     """
     A class to represent a Block for memory management.
 
     Attributes:
-        MAXSIZE (int): The maximum size of the block.
+        MAXSIZE (int): The default maximum size of a block.
         obj (object): The object stored in the block.
         block_size (int): The size of the block.
+        pool (Pool): The pool the block belongs to, or None.
+        slot (int): The slot of the block in its pool, or None.
 
     Methods:
-        __init__(obj):
-            Initializes the Block with an object and measures its size.
+        __init__(obj, size=None, maxsize=None):
+            Initializes the Block with an object and measures its size unless given.
     """
     MAXSIZE = 512
+    __slots__ = ('obj', 'block_size', 'pool', 'slot')
 
-    def __init__(self, obj):
+    def __init__(self, obj, size=None, maxsize=None):
         """
-        Initializes the Block with an object and measures its size.
+        Initializes the Block with an object, measures its size unless given, and leaves it
+        without a pool or slot.
 
         Args:
             obj (object): The object to be stored in the block.
+            size (int): The already measured size of the object. Default is None, in which case
+                the size is measured with the MemoryAnalyzer.
+            maxsize (int): The maximum size of the block. Default is None, which uses MAXSIZE.
 
         Raises:
             ValueError: If the size of the object exceeds the maximum block size.
         """
-        analyzer = MemoryAnalyzer.get_instance()
-        size = analyzer.measure_size(obj)
-        if size > self.MAXSIZE:
+        if size is None:
+            analyzer = MemoryAnalyzer.get_instance()
+            size = analyzer.measure_size(obj)
+        if size > (self.MAXSIZE if maxsize is None else maxsize):
             raise ValueError("Size too large")
 
         self.obj = obj
         self.block_size = size
+        self.pool = None
+        self.slot = None
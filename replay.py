@@ -0,0 +1,356 @@
+"""
+NAME
+    replay
+
+DESCRIPTION
+    This module replays allocation traces against the MemoryManager at full speed.
+    A trace is a sequence of (op, id, size) events, where op is ALLOC or FREE, id names the
+    allocation and size is the requested size in bytes (ignored for frees).
+    Traces are stored either as CSV with the header 'op,id,size' and ops 'alloc' and 'free',
+    or as fixed binary records of RECORD: a little-endian unsigned byte op, 64-bit id and
+    32-bit size.
+    Binary traces are streamed through a memory map by TraceReader, so replaying a trace of any
+    size holds one chunk of records at a time, and a replay can resume from a byte offset.
+
+CLASSES
+    TraceReader
+        Streams the events of a binary trace through a memory map.
+
+        Methods defined here:
+            __init__(self, path, offset=0)
+                Initializes the TraceReader with the trace to read and the byte offset to start at.
+
+            __iter__(self) -> iterator
+                Yields the events from the current offset to the end of the trace.
+
+            close(self)
+                Unmaps the trace.
+
+FUNCTIONS
+    read_csv(path) -> iterator
+        Reads the events of a CSV trace.
+
+    write_csv(path, events)
+        Writes events to a CSV trace.
+
+    read_binary(path, offset=0) -> TraceReader
+        Reads the events of a binary trace, starting at a byte offset.
+
+    write_binary(path, events)
+        Writes events to a binary trace.
+
+    read_trace(path, offset=0) -> iterator
+        Reads the events of a trace, in CSV if the file name ends with .csv and binary otherwise.
+
+    fragmentation(manager) -> dict
+        Measures how much of the memory reserved by pools and large objects is not holding requested bytes.
+
+    replay(events, manager=None) -> dict
+        Drives a manager with the events of a trace and reports its throughput and peak usage.
+
+    main(argv=None)
+        Replays the trace given on the command line and prints the report.
+"""
+
+import argparse
+import csv
+import mmap
+import os
+import struct
+import time
+from manager import MemoryManager
+
+ALLOC = 0
+FREE = 1
+RECORD = struct.Struct('<BQI')
+
+_OP_NAMES = {ALLOC: 'alloc', FREE: 'free'}
+_OPS = {name: op for op, name in _OP_NAMES.items()}
+# Number of records read from a binary trace at once
+_CHUNK = 4096
+
+def read_csv(path):
+    """
+    Reads the events of a CSV trace.
+
+    Args:
+        path (str): The path of the trace.
+
+    Yields:
+        tuple: The op, id and size of each event.
+
+    Raises:
+        ValueError: If a row has an unknown op or a negative size.
+    """
+    with open(path, newline='') as trace:
+        for row in csv.reader(trace):
+            if not row or row[0] == 'op':
+                continue
+            if row[0] not in _OPS:
+                raise ValueError(f"Unknown trace op: {row[0]}")
+            size = int(row[2]) if len(row) > 2 and row[2] else 0
+            if size < 0:
+                raise ValueError(f"Negative trace size: {size}")
+            yield _OPS[row[0]], int(row[1]), size
+
+def write_csv(path, events):
+    """
+    Writes events to a CSV trace.
+
+    Args:
+        path (str): The path of the trace.
+        events (iterable): The op, id and size of each event.
+    """
+    with open(path, 'w', newline='') as trace:
+        writer = csv.writer(trace)
+        writer.writerow(('op', 'id', 'size'))
+        for op, ident, size in events:
+            writer.writerow((_OP_NAMES[int(op)], int(ident), int(size)))
+
+class TraceReader:
+    """
+    Streams the events of a binary trace through a memory map.
+    Records are unpacked one chunk at a time, so memory use does not depend on the size of the
+    trace, and the pages already read can be dropped by the operating system.
+
+    Attributes:
+        path (str): The path of the trace.
+        offset (int): The byte offset of the next record to be read, which can be given to a
+            new TraceReader to resume from there.
+        size (int): The size of the trace in bytes.
+
+    Methods:
+        __iter__() -> iterator:
+            Yields the events from the current offset to the end of the trace.
+        close():
+            Unmaps the trace.
+    """
+
+    def __init__(self, path, offset=0):
+        """
+        Initializes the TraceReader with the trace to read and the byte offset to start at.
+
+        Args:
+            path (str): The path of the trace.
+            offset (int): The byte offset of the first record to read. Default is 0.
+
+        Raises:
+            ValueError: If the offset is not at the start of a record inside the trace.
+        """
+        self.path = path
+        self.size = os.path.getsize(path)
+        if offset % RECORD.size or not 0 <= offset <= self.size:
+            raise ValueError(f"Offset {offset} is not at a record in the trace")
+        self.offset = offset
+        self._map = None
+
+    def __iter__(self):
+        """
+        Yields the events from the current offset to the end of the trace.
+        The offset is advanced before each event is yielded, so it always points past the
+        events already handed out.
+
+        Yields:
+            tuple: The op, id and size of each event.
+
+        Raises:
+            ValueError: If a record has an unknown op, in which case the offset points at it,
+                or if the trace ends with a partial record.
+        """
+        if self.size == 0:
+            return
+        with open(self.path, 'rb') as trace:
+            self._map = mmap.mmap(trace.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            end = self.size - self.size % RECORD.size
+            while self.offset < end:
+                stop = min(self.offset + RECORD.size * _CHUNK, end)
+                # Slicing copies one chunk, so no view of the map outlives it
+                for record in RECORD.iter_unpack(self._map[self.offset:stop]):
+                    if record[0] not in _OP_NAMES:
+                        # A corrupt record or a file that is not a binary trace
+                        raise ValueError(f"Unknown trace op {record[0]} at offset {self.offset}")
+                    self.offset += RECORD.size
+                    yield record
+            if self.offset < self.size:
+                raise ValueError("Truncated trace record")
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Unmaps the trace. Iterating again maps it anew from the current offset.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+def read_binary(path, offset=0):
+    """
+    Reads the events of a binary trace, starting at a byte offset.
+
+    Args:
+        path (str): The path of the trace.
+        offset (int): The byte offset of the first record to read. Default is 0.
+
+    Returns:
+        TraceReader: The reader streaming the events, whose offset tracks the progress.
+    """
+    return TraceReader(path, offset)
+
+def write_binary(path, events):
+    """
+    Writes events to a binary trace.
+
+    Args:
+        path (str): The path of the trace.
+        events (iterable): The op, id and size of each event.
+    """
+    with open(path, 'wb') as trace:
+        for op, ident, size in events:
+            trace.write(RECORD.pack(int(op), int(ident), int(size)))
+
+def read_trace(path, offset=0):
+    """
+    Reads the events of a trace, in CSV if the file name ends with .csv and binary otherwise.
+
+    Args:
+        path (str): The path of the trace.
+        offset (int): The byte offset of the first record of a binary trace. Default is 0.
+
+    Returns:
+        iterator: The op, id and size of each event.
+
+    Raises:
+        ValueError: If an offset is given for a CSV trace.
+    """
+    if str(path).endswith('.csv'):
+        if offset:
+            raise ValueError("CSV traces cannot be resumed from an offset")
+        return read_csv(path)
+    return read_binary(path, offset)
+
+def fragmentation(manager):
+    """
+    Measures how much of the memory reserved by pools and large objects is not holding requested bytes.
+
+    Args:
+        manager (MemoryManager): The manager to be measured.
+
+    Returns:
+        dict: The bytes reserved by pools and large objects, used by blocks and requested by
+            objects, and the internal (size class and page rounding), external (free slots and
+            free extents) and total fragmentation
+            as fractions of the reserved bytes.
+    """
+    metrics = manager.metrics()
+    reserved = metrics['reserved']
+    return {
+        'reserved': reserved,
+        'used': metrics['used'],
+        'requested': metrics['requested'],
+        'internal': metrics['internal_fragmentation'],
+        'external': metrics['external_fragmentation'],
+        'total': (reserved - metrics['requested']) / reserved if reserved else 0.0,
+    }
+
+def replay(events, manager=None):
+    """
+    Drives a manager with the events of a trace and reports its throughput and peak usage.
+    Allocations are given their size from the trace, so no object is measured.
+
+    Like pymalloc, zero-byte requests are served as one byte. Requests larger than the manager's
+    maximum block size are served by its large object allocator, whose peak mapped bytes are reported.
+    Frees of unknown ids and allocations of ids that are still live are counted as invalid and skipped.
+    Events with an op other than ALLOC or FREE stop the replay with an error.
+
+    Args:
+        events (iterable): The op, id and size of each event.
+        manager (MemoryManager): The manager to drive. Default is None, in which case the
+            default instance is used.
+
+    Returns:
+        dict: The number of ops, the elapsed seconds, the ops per second, the peak numbers of
+            arenas, pools and blocks, the peak bytes mapped for large objects, the invalid event
+            count, the blocks still live at the end, the final fragmentation of the pools and
+            large objects, and the final metrics of the large objects.
+
+    Raises:
+        ValueError: If an event has an unknown op.
+    """
+    if manager is None:
+        manager = MemoryManager.get_instance()
+    allocate = manager.allocate
+    deallocate = manager.deallocate
+    max_block_size = manager.max_block_size
+    large = manager.large
+    live = {}
+    ops = invalid = 0
+    peak_arenas = peak_pools = peak_blocks = peak_large = 0
+
+    start = time.perf_counter()
+    for op, ident, size in events:
+        ops += 1
+        if op == ALLOC:
+            if ident in live:
+                invalid += 1
+                continue
+            live[ident] = allocate(ident, size or 1)
+            if len(live) > peak_blocks:
+                peak_blocks = len(live)
+            if size > max_block_size:
+                if large.top > peak_large:
+                    peak_large = large.top
+                continue
+            if manager.pool_count > peak_pools:
+                peak_pools = manager.pool_count
+            if len(manager.arenas) > peak_arenas:
+                peak_arenas = len(manager.arenas)
+        elif op == FREE:
+            block = live.pop(ident, None)
+            if block is not None:
+                deallocate(block)
+            else:
+                invalid += 1
+        else:
+            raise ValueError(f"Unknown trace op {op} in event {ops}")
+    elapsed = time.perf_counter() - start
+
+    return {
+        'ops': ops,
+        'seconds': elapsed,
+        'ops_per_sec': ops / elapsed if elapsed else 0.0,
+        'peak_arenas': peak_arenas,
+        'peak_pools': peak_pools,
+        'peak_blocks': peak_blocks,
+        'peak_large_mapped': peak_large,
+        'invalid': invalid,
+        'live_blocks': len(live),
+        'fragmentation': fragmentation(manager),
+        'large': large.metrics(),
+    }
+
+def main(argv=None):
+    """
+    Replays the trace given on the command line and prints the report.
+
+    Args:
+        argv (list): The command line arguments. Default is None, in which case sys.argv is used.
+    """
+    parser = argparse.ArgumentParser(description="Replay an allocation trace against the MemoryManager.")
+    parser.add_argument('trace', help="a .csv trace, or a binary trace of fixed records")
+    parser.add_argument('--tcache', type=int, default=0, help="blocks cached per size class, 0 disables caching")
+    parser.add_argument('--offset', type=int, default=0, help="byte offset to resume a binary trace from")
+    args = parser.parse_args(argv)
+
+    report = replay(read_trace(args.trace, args.offset), MemoryManager(tcache=args.tcache))
+    frag = report.pop('fragmentation')
+    large = report.pop('large')
+    for key, value in report.items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+    print(f"fragmentation: {frag['total']:.2%} (internal {frag['internal']:.2%}, external {frag['external']:.2%})")
+    print(f"large objects: {large['blocks']}, {large['mapped']} bytes mapped "
+          f"(internal {large['internal_fragmentation']:.2%}, external {large['external_fragmentation']:.2%})")
+
+if __name__ == "__main__":
+    main()
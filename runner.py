@@ -0,0 +1,215 @@
+"""
+NAME
+    runner
+
+DESCRIPTION
+    This module runs sweeps of independent simulations in parallel across processes.
+    A simulation replays a seeded synthetic workload against a fresh MemoryManager built with
+    its own geometry, the sizes of arenas, pools and blocks and the size class alignment, and its
+    own arena policy.
+    Simulations are CPU bound, so each runs in a worker process of a ProcessPoolExecutor, which
+    sends back a pickled summary of the replay.
+    The summaries are then aggregated over seeds for each workload and configuration.
+
+    Run it with: python runner.py --workloads uniform zipf --pool-size 4000 8000 --seeds 0 1 2,
+    or compare arena policies with: python runner.py --arena-policy first_fit most_used.
+
+FUNCTIONS
+    make_tasks(workloads, configs=({},), count=100000, seeds=(0,), params=None) -> list
+        Builds one simulation task for each workload, configuration and seed.
+
+    simulate(task) -> dict
+        Runs one simulation task and returns a summary of its replay.
+
+    run(tasks, workers=None) -> list
+        Runs simulation tasks in worker processes and returns their summaries in order.
+
+    _numbers(report, prefix='') -> dict
+        Flattens the numeric values of a report, naming nested values after their path.
+
+    aggregate(results) -> list
+        Summarizes the results of each workload and configuration over their seeds.
+
+    main(argv=None)
+        Runs the sweep given on the command line and prints or saves the aggregated results.
+"""
+
+import argparse
+import itertools
+import json
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from manager import MemoryManager, ARENA_POLICIES
+from replay import replay
+from workload import WORKLOADS, iter_events
+
+# The geometry settings of a configuration, each a keyword argument of MemoryManager
+GEOMETRY = ('arena_size', 'pool_size', 'max_block_size', 'alignment')
+# All the settings of a configuration
+SETTINGS = GEOMETRY + ('arena_policy',)
+
+def make_tasks(workloads, configs=({},), count=100000, seeds=(0,), params=None):
+    """
+    Builds one simulation task for each workload, configuration and seed.
+
+    Args:
+        workloads (iterable): The names of the workloads, see workload.WORKLOADS.
+        configs (iterable): The configurations, each mapping settings of SETTINGS to values.
+            Default is a single configuration with the default geometry.
+        count (int): The number of allocations of each workload. Default is 100000.
+        seeds (iterable): The seeds of the workloads. Default is (0,).
+        params (dict): Maps workload names to extra keyword arguments of their generator.
+            Default is None.
+
+    Returns:
+        list: The tasks, as dicts of workload, count, seed, params and config.
+
+    Raises:
+        ValueError: If a workload or a setting is unknown.
+    """
+    params = params or {}
+    tasks = []
+    for name, config, seed in itertools.product(workloads, configs, seeds):
+        if name not in WORKLOADS:
+            raise ValueError(f"Unknown workload: {name}")
+        for setting in config:
+            if setting not in SETTINGS:
+                raise ValueError(f"Unknown setting: {setting}")
+        tasks.append({
+            'workload': name,
+            'count': count,
+            'seed': seed,
+            'params': dict(params.get(name, {})),
+            'config': dict(config),
+        })
+    return tasks
+
+def simulate(task):
+    """
+    Runs one simulation task and returns a summary of its replay.
+    The workload is generated and replayed against a fresh manager with the task's geometry.
+
+    Args:
+        task (dict): The task, as built by make_tasks.
+
+    Returns:
+        dict: The task's workload, seed and config, the replay report and the allocator event counts.
+
+    Raises:
+        ValueError: If the geometry of the task is inconsistent.
+    """
+    manager = MemoryManager(**task['config'])
+    events = WORKLOADS[task['workload']](task['count'], seed=task['seed'], **task['params'])
+    report = replay(iter_events(events), manager)
+    report['events'] = manager.event_counts()
+    return {
+        'workload': task['workload'],
+        'seed': task['seed'],
+        'config': task['config'],
+        'report': report,
+    }
+
+def run(tasks, workers=None):
+    """
+    Runs simulation tasks in worker processes and returns their summaries in order.
+
+    Args:
+        tasks (list): The tasks, as built by make_tasks.
+        workers (int): The number of worker processes. Default is None, which uses one per CPU.
+            0 runs the tasks one after the other in the calling process.
+
+    Returns:
+        list: The summary of each task, as returned by simulate.
+    """
+    if workers == 0:
+        return [simulate(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(simulate, tasks))
+
+def _numbers(report, prefix=''):
+    """
+    Flattens the numeric values of a report, naming nested values after their path.
+
+    Args:
+        report (dict): The report, possibly holding nested dicts.
+        prefix (str): The prefix of the names. Default is ''.
+
+    Returns:
+        dict: Maps names such as 'fragmentation.total' to numbers.
+    """
+    numbers = {}
+    for key, value in report.items():
+        if isinstance(value, dict):
+            numbers.update(_numbers(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            numbers[prefix + key] = value
+    return numbers
+
+def aggregate(results):
+    """
+    Summarizes the results of each workload and configuration over their seeds.
+
+    Args:
+        results (list): The summaries returned by run.
+
+    Returns:
+        list: For each workload and configuration, in order of first appearance, a dict of the
+            workload, config, number of runs, and the mean, standard deviation, minimum and
+            maximum of each numeric value of the reports.
+    """
+    groups = {}
+    for result in results:
+        key = (result['workload'], tuple(sorted(result['config'].items())))
+        groups.setdefault(key, []).append(_numbers(result['report']))
+
+    summaries = []
+    for (name, config), reports in groups.items():
+        stats = {}
+        for metric in reports[0]:
+            values = np.array([report[metric] for report in reports], dtype=float)
+            stats[metric] = {
+                'mean': float(values.mean()),
+                'std': float(values.std()),
+                'min': float(values.min()),
+                'max': float(values.max()),
+            }
+        summaries.append({'workload': name, 'config': dict(config), 'runs': len(reports), 'metrics': stats})
+    return summaries
+
+def main(argv=None):
+    """
+    Runs the sweep given on the command line and prints or saves the aggregated results.
+    Every combination of the given geometry settings is a configuration.
+
+    Args:
+        argv (list): The command line arguments. Default is None, in which case sys.argv is used.
+    """
+    parser = argparse.ArgumentParser(description="Run a parallel sweep of allocator simulations.")
+    parser.add_argument('--workloads', nargs='+', default=sorted(WORKLOADS), choices=sorted(WORKLOADS))
+    parser.add_argument('--count', type=int, default=100000, help="allocations per workload")
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0])
+    for name in GEOMETRY:
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=int, nargs='+')
+    parser.add_argument('--arena-policy', dest='arena_policy', nargs='+', choices=sorted(ARENA_POLICIES))
+    parser.add_argument('--workers', type=int, default=None, help="worker processes, 0 runs in this process")
+    parser.add_argument('--output', help="path to write the aggregated results to as JSON")
+    args = parser.parse_args(argv)
+
+    settings = {name: getattr(args, name) for name in SETTINGS if getattr(args, name)}
+    configs = [dict(zip(settings, values)) for values in itertools.product(*settings.values())]
+    tasks = make_tasks(args.workloads, configs, args.count, args.seeds)
+    summaries = aggregate(run(tasks, args.workers))
+
+    for summary in summaries:
+        metrics = summary['metrics']
+        print(f"{summary['workload']} {summary['config']}: "
+              f"{metrics['ops_per_sec']['mean']:.0f} ops/s, "
+              f"peak arenas {metrics['peak_arenas']['mean']:.1f}, "
+              f"peak pools {metrics['peak_pools']['mean']:.1f}, "
+              f"fragmentation {metrics['fragmentation.total']['mean']:.2%}")
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(summaries, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -21,7 +21,7 @@ def allocate_blocks(manager, duration=30):
         manager.allocate(obj)
         time.sleep(0.01)  # Sleep for a short duration to simulate work
 
-def run_analyzer(analyzer, duration=30):
+def run_analyzer(analyzer, duration=30, manager=None):
     """
     Runs the MemoryAnalyzer to track memory usage during the specified duration.
 
@@ -29,10 +29,11 @@ def run_analyzer(analyzer, duration=30):
         analyzer (MemoryAnalyzer): The memory analyzer instance.
         duration (int): The duration for which to run the analyzer in seconds.
             Default is 60 seconds.
+        manager (MemoryManager): The manager to track. Default is None, which tracks the whole heap.
     """
     start_time = time.time()
     while time.time() - start_time < duration:
-        analyzer.track()
+        analyzer.track(manager)
         time.sleep(5)  # Track memory usage every 5 seconds
 
 if __name__ == "__main__":
@@ -41,7 +42,7 @@ if __name__ == "__main__":
 
     # Create threads for allocation and analysis
     allocation_thread = threading.Thread(target=allocate_blocks, args=(manager,))
-    analyzer_thread = threading.Thread(target=run_analyzer, args=(analyzer,))
+    analyzer_thread = threading.Thread(target=run_analyzer, args=(analyzer,), kwargs={'manager': manager})
 
     # Start the threads
     allocation_thread.start()
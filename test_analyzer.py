@@ -17,15 +17,108 @@ CLASSES
             test_get_instance(self)
                 Tests the singleton instance of the MemoryAnalyzer.
 
+            test_reset(self)
+                Tests that resetting closes the previous instance before replacing it.
+
             test_init(self, mock_tracker, mock_basicConfig)
                 Tests the initialization of the MemoryAnalyzer.
 
             test_measure_size(self, mock_asizeof, mock_logging_info)
                 Tests the measure_size method of the MemoryAnalyzer.
 
+            test_measure_size_count(self, mock_asizeof, mock_logging_info)
+                Tests that the measure_size method counts its measurements.
+
+            test_measure_size_strategies(self, name, obj)
+                Tests that the sizing strategies agree on flat objects.
+
+            test_measure_size_shallow(self)
+                Tests the measure_size method with the shallow strategy.
+
+            test_measure_size_fast_fallback(self)
+                Tests that the fast strategy falls back to the deep strategy.
+
+            test_measure_size_callable(self)
+                Tests the measure_size method with a custom strategy.
+
+            test_measure_size_invalid_strategy(self)
+                Tests the measure_size method with an unknown strategy.
+
+            test_cache_shape(self, mock_asizeof)
+                Tests that fixed-shape objects are cached by type and length.
+
+            test_cache_bytearray_capacity(self)
+                Tests that a bytearray is cached by its capacity rather than its length.
+
+            test_cache_str_kind(self, mock_asizeof)
+                Tests that strings are cached by length and width, without keeping them alive.
+
+            test_cache_value(self, mock_asizeof)
+                Tests that numbers are cached by value.
+
+            test_cache_uncacheable(self, mock_asizeof)
+                Tests that other objects are always measured.
+
+            test_cache_strategies(self)
+                Tests that each sizing strategy has its own cache entries.
+
+            test_cache_eviction(self)
+                Tests that the least recently used size is evicted from a full cache.
+
+            test_cache_disabled(self)
+                Tests the measure_size method with the cache disabled.
+
+            test_async_logging(self)
+                Tests that asynchronous logging writes the records once closed.
+
+            test_async_logging_root(self, mock_logging_info)
+                Tests that asynchronous logging does not go through the root logger.
+
+            test_sample_rate(self, mock_logging_info)
+                Tests that only a fraction of the size measurements is logged.
+
+            test_sample_rate_zero(self, mock_logging_info)
+                Tests that no size measurement is logged with a sample rate of zero.
+
+            test_sample_rate_fraction(self, name, sample_rate, expected, mock_logging_info)
+                Tests that a sample rate that is not 1/n logs that fraction of the measurements.
+
+            test_sample_rate_invalid(self)
+                Tests the MemoryAnalyzer with a sample rate out of range.
+
             test_track(self, mock_diff, mock_logging_info)
                 Tests the track method of the MemoryAnalyzer.
 
+            test_track_manager(self, mock_diff, mock_logging_info)
+                Tests that tracking a manager reports the changes of its metrics without scanning the heap.
+
+            test_structured(self, name, async_logging)
+                Tests that structured mode writes timestamped, typed JSON Lines records.
+
+            test_structured_track_manager(self)
+                Tests the structured record of tracking a manager.
+
+            test_structured_heap(self, mock_diff, mock_get_objects, mock_summarize)
+                Tests the structured records of tracking, analyzing and summarizing the heap.
+
+            test_close_drops_records(self, name, async_logging, structured, mock_logging_info)
+                Tests that records logged after closing are dropped instead of reaching the root logger.
+
+            test_load_columns(self)
+                Tests that the records of one type are loaded as NumPy columns.
+
+            test_sampling(self)
+                Tests that the sampling thread fills the ring buffer with the manager's metrics.
+
+            test_sampling_budget(self, mock_summarize)
+                Tests that deep summaries are skipped once they would exceed the budget.
+
+            test_sampling_no_budget(self, mock_summarize)
+                Tests that no deep summary is taken after the first one with a budget of zero.
+
+            test_sampling_invalid(self)
+                Tests starting sampling twice and with a budget out of range.
+
             test_analyze(self, mock_get_objects, mock_logging_info)
                 Tests the analyze method of the MemoryAnalyzer.
 
@@ -36,7 +129,14 @@ CLASSES
 import unittest
 from unittest.mock import patch, MagicMock
 import logging
-from analyzer import MemoryAnalyzer
+import os
+import sys
+import tempfile
+from pympler import asizeof
+import time
+from parameterized import parameterized
+from analyzer import MemoryAnalyzer, fast_size, read_records, load_columns
+from manager import MemoryManager
 
 class TestMemoryAnalyzer(unittest.TestCase):
     """
@@ -47,9 +147,8 @@ class TestMemoryAnalyzer(unittest.TestCase):
         """
         Sets up the test case environment.
         """
-        # Reset the singleton instance before each test
-        MemoryAnalyzer._instance = None
-        self.analyzer = MemoryAnalyzer.get_instance(log_file='test_log.txt')
+        # Replace the singleton instance before each test
+        self.analyzer = MemoryAnalyzer.reset(log_file='test_log.txt')
 
     def test_get_instance(self):
         """
@@ -59,6 +158,21 @@ class TestMemoryAnalyzer(unittest.TestCase):
         self.assertEqual(self.analyzer, MemoryAnalyzer._instance)
         self.assertEqual(self.analyzer, MemoryAnalyzer.get_instance())
 
+    def test_reset(self):
+        """
+        Tests that resetting closes the previous instance before replacing it.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            previous = MemoryAnalyzer.reset(log_file=os.path.join(directory, 'async_log.txt'), async_logging=True)
+            listener = previous._listener
+            analyzer = MemoryAnalyzer.reset(log_file='test_log.txt', sample_rate=0)
+
+            self.assertTrue(previous.closed)
+            self.assertIsNone(previous._listener)
+            self.assertIsNone(listener._thread)  # The logging thread was stopped
+            self.assertIsNot(analyzer, previous)
+            self.assertIs(MemoryAnalyzer.get_instance(), analyzer)
+
     @patch('analyzer.logging.basicConfig')
     @patch('analyzer.tracker.SummaryTracker')
     def test_init(self, mock_tracker, mock_basicConfig):
@@ -69,8 +183,7 @@ class TestMemoryAnalyzer(unittest.TestCase):
             mock_tracker (MagicMock): Mock for SummaryTracker.
             mock_basicConfig (MagicMock): Mock for logging.basicConfig.
         """
-        MemoryAnalyzer._instance = None  # Reset the singleton instance
-        analyzer = MemoryAnalyzer.get_instance(log_file='test_log.txt')
+        analyzer = MemoryAnalyzer.reset(log_file='test_log.txt')
         mock_tracker.assert_called_once()
         mock_basicConfig.assert_called_once_with(
             filename='test_log.txt', level=logging.INFO, format='%(asctime)s - %(message)s'
@@ -91,6 +204,256 @@ class TestMemoryAnalyzer(unittest.TestCase):
         mock_logging_info.assert_called_once_with("Size of object: 100 bytes\n")
         self.assertEqual(size, 100)
 
+    @patch('analyzer.logging.info')
+    @patch('pympler.asizeof.asizeof', return_value=100)
+    def test_measure_size_count(self, mock_asizeof, mock_logging_info):
+        """
+        Tests that the measure_size method counts its measurements.
+
+        Args:
+            mock_asizeof (MagicMock): Mock for asizeof.asizeof.
+            mock_logging_info (MagicMock): Mock for logging.info.
+        """
+        self.assertEqual(self.analyzer.measurements, 0)
+        self.analyzer.measure_size("object")
+        self.analyzer.measure_size("object")
+        self.assertEqual(self.analyzer.measurements, 2)
+
+    @parameterized.expand([
+        ("bytes", b'x' * 100),
+        ("bytearray", bytearray(200)),
+        ("string", "object"),
+        ("int", 16**100),
+        ("tuple", (1, "object", b'x')),
+    ])
+    def test_measure_size_strategies(self, name, obj):
+        """
+        Tests that the sizing strategies agree on flat objects.
+
+        Args:
+            name (str): The name of the object type.
+            obj (any): The object to measure.
+        """
+        self.assertEqual(self.analyzer.measure_size(obj, 'fast'), asizeof.asizeof(obj))
+        self.assertEqual(self.analyzer.measure_size(obj, 'deep'), asizeof.asizeof(obj))
+
+    def test_measure_size_shallow(self):
+        """
+        Tests the measure_size method with the shallow strategy.
+        """
+        obj = [bytearray(100)]
+        self.assertEqual(self.analyzer.measure_size(obj, 'shallow'), sys.getsizeof(obj))
+
+    def test_measure_size_fast_fallback(self):
+        """
+        Tests that the fast strategy falls back to the deep strategy.
+        """
+        obj = {"key": [1, 2, 3]}
+        self.assertEqual(self.analyzer.measure_size(obj, 'fast'), asizeof.asizeof(obj))
+
+    def test_measure_size_callable(self):
+        """
+        Tests the measure_size method with a custom strategy.
+        """
+        self.assertEqual(self.analyzer.measure_size("object", lambda obj: 64), 64)
+
+    def test_measure_size_invalid_strategy(self):
+        """
+        Tests the measure_size method with an unknown strategy.
+        """
+        with self.assertRaises(ValueError):
+            self.analyzer.measure_size("object", 'unknown')
+
+    @patch('pympler.asizeof.asizeof', return_value=100)
+    def test_cache_shape(self, mock_asizeof):
+        """
+        Tests that fixed-shape objects are cached by type and length.
+
+        Args:
+            mock_asizeof (MagicMock): Mock for asizeof.asizeof.
+        """
+        self.analyzer.measure_size(bytearray(200))
+        self.analyzer.measure_size(bytearray(200))
+        self.analyzer.measure_size(bytes(200))  # Same length, but another type
+
+        self.assertEqual(mock_asizeof.call_count, 2)
+        self.assertEqual(self.analyzer.cache_info(), {'hits': 1, 'misses': 2, 'size': 2, 'maxsize': 4096})
+
+    def test_cache_bytearray_capacity(self):
+        """
+        Tests that a bytearray is cached by its capacity rather than its length.
+        """
+        grown = bytearray(190)
+        grown.extend(bytes(10))  # Same length as a fresh bytearray, but over-allocated on growth
+        self.assertGreater(grown.__alloc__(), bytearray(200).__alloc__())
+
+        self.assertEqual(self.analyzer.measure_size(bytearray(200), 'shallow'), sys.getsizeof(bytearray(200)))
+        self.assertEqual(self.analyzer.measure_size(grown, 'shallow'), sys.getsizeof(grown))
+        self.assertEqual(self.analyzer.cache_misses, 2)
+
+    @patch('pympler.asizeof.asizeof', return_value=100)
+    def test_cache_str_kind(self, mock_asizeof):
+        """
+        Tests that strings are cached by length and width, without keeping them alive.
+
+        Args:
+            mock_asizeof (MagicMock): Mock for asizeof.asizeof.
+        """
+        for text in ("object", "others", "objet\xe9", "obj\u20acct", "obj\U0001f600ct"):
+            self.analyzer.measure_size(text)
+
+        # Equal-length ASCII strings share an entry, wider characters take more bytes each
+        self.assertEqual(mock_asizeof.call_count, 4)
+        self.assertEqual(self.analyzer.cache_hits, 1)
+        self.assertFalse(any(isinstance(part, str) for key in self.analyzer._cache for part in key))
+
+    @patch('pympler.asizeof.asizeof', return_value=100)
+    def test_cache_value(self, mock_asizeof):
+        """
+        Tests that numbers are cached by value.
+
+        Args:
+            mock_asizeof (MagicMock): Mock for asizeof.asizeof.
+        """
+        self.analyzer.measure_size(8)
+        self.analyzer.measure_size(8)
+        self.analyzer.measure_size(9)  # Same type, but another value
+        self.analyzer.measure_size(8.0)  # Equal value, but another type
+
+        self.assertEqual(mock_asizeof.call_count, 3)
+        self.assertEqual(self.analyzer.cache_hits, 1)
+
+    @patch('pympler.asizeof.asizeof', return_value=100)
+    def test_cache_uncacheable(self, mock_asizeof):
+        """
+        Tests that other objects are always measured.
+
+        Args:
+            mock_asizeof (MagicMock): Mock for asizeof.asizeof.
+        """
+        self.analyzer.measure_size([1, 2])
+        self.analyzer.measure_size([1, 2])
+
+        self.assertEqual(mock_asizeof.call_count, 2)
+        self.assertEqual(self.analyzer.cache_info()['size'], 0)
+
+    def test_cache_strategies(self):
+        """
+        Tests that each sizing strategy has its own cache entries.
+        """
+        obj = bytearray(200)
+        self.assertEqual(self.analyzer.measure_size(obj, 'shallow'), sys.getsizeof(obj))
+        self.assertEqual(self.analyzer.measure_size(obj, 'deep'), asizeof.asizeof(obj))
+        self.assertEqual(self.analyzer.cache_misses, 2)
+
+    def test_cache_eviction(self):
+        """
+        Tests that the least recently used size is evicted from a full cache.
+        """
+        analyzer = MemoryAnalyzer.reset(log_file='test_log.txt', cache_size=2, sample_rate=0)
+        analyzer.measure_size(bytearray(1))
+        analyzer.measure_size(bytearray(2))
+        analyzer.measure_size(bytearray(1))  # Hit, bytearray(2) becomes the oldest entry
+        analyzer.measure_size(bytearray(3))  # Evicts bytearray(2)
+        analyzer.measure_size(bytearray(1))
+        analyzer.measure_size(bytearray(2))
+
+        self.assertEqual(analyzer.cache_info(), {'hits': 2, 'misses': 4, 'size': 2, 'maxsize': 2})
+
+    def test_cache_disabled(self):
+        """
+        Tests the measure_size method with the cache disabled.
+        """
+        analyzer = MemoryAnalyzer.reset(log_file='test_log.txt', cache_size=0, sample_rate=0)
+        analyzer.measure_size(bytearray(1))
+        analyzer.measure_size(bytearray(1))
+
+        self.assertEqual(analyzer.cache_info(), {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 0})
+
+    def test_async_logging(self):
+        """
+        Tests that asynchronous logging writes the records once closed.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            log_file = os.path.join(directory, 'async_log.txt')
+            analyzer = MemoryAnalyzer.reset(log_file=log_file, async_logging=True, batch_size=10)
+            for length in range(25):
+                analyzer.measure_size(bytearray(length))
+            analyzer.close()
+
+            with open(log_file) as file:
+                lines = [line for line in file if "Size of object" in line]
+        self.assertEqual(len(lines), 25)
+
+    @patch('analyzer.logging.info')
+    def test_async_logging_root(self, mock_logging_info):
+        """
+        Tests that asynchronous logging does not go through the root logger.
+
+        Args:
+            mock_logging_info (MagicMock): Mock for logging.info.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            analyzer = MemoryAnalyzer.reset(
+                log_file=os.path.join(directory, 'async_log.txt'), async_logging=True
+            )
+            analyzer.measure_size("object")
+            analyzer.close()
+        mock_logging_info.assert_not_called()
+
+    @patch('analyzer.logging.info')
+    def test_sample_rate(self, mock_logging_info):
+        """
+        Tests that only a fraction of the size measurements is logged.
+
+        Args:
+            mock_logging_info (MagicMock): Mock for logging.info.
+        """
+        analyzer = MemoryAnalyzer.reset(log_file='test_log.txt', sample_rate=0.25)
+        for _ in range(8):
+            analyzer.measure_size("object")
+
+        self.assertEqual(mock_logging_info.call_count, 2)
+        self.assertEqual(analyzer.measurements, 8)
+
+    @patch('analyzer.logging.info')
+    def test_sample_rate_zero(self, mock_logging_info):
+        """
+        Tests that no size measurement is logged with a sample rate of zero.
+
+        Args:
+            mock_logging_info (MagicMock): Mock for logging.info.
+        """
+        analyzer = MemoryAnalyzer.reset(log_file='test_log.txt', sample_rate=0)
+        analyzer.measure_size("object")
+
+        mock_logging_info.assert_not_called()
+
+    @parameterized.expand([("seven_tenths", 0.7, 7), ("six_tenths", 0.6, 6), ("one_third", 1 / 3, 3)])
+    @patch('analyzer.logging.info')
+    def test_sample_rate_fraction(self, name, sample_rate, expected, mock_logging_info):
+        """
+        Tests that a sample rate that is not 1/n logs that fraction of the measurements.
+
+        Args:
+            name (str): The name of the case.
+            sample_rate (float): The fraction of size measurements that are logged.
+            expected (int): The number of the ten measurements expected to be logged.
+            mock_logging_info (MagicMock): Mock for logging.info.
+        """
+        analyzer = MemoryAnalyzer.reset(log_file='test_log.txt', sample_rate=sample_rate)
+        for _ in range(10):
+            analyzer.measure_size("object")
+
+        self.assertEqual(mock_logging_info.call_count, expected)
+
+    def test_sample_rate_invalid(self):
+        """
+        Tests the MemoryAnalyzer with a sample rate out of range.
+        """
+        with self.assertRaises(ValueError):
+            MemoryAnalyzer.reset(log_file='test_log.txt', sample_rate=2)
+
     @patch('analyzer.logging.info')
     @patch('analyzer.tracker.SummaryTracker.diff', return_value=[('list', 1, 100)])
     def test_track(self, mock_diff, mock_logging_info):
@@ -107,6 +470,215 @@ class TestMemoryAnalyzer(unittest.TestCase):
         mock_logging_info.assert_any_call("Track:")
         mock_logging_info.assert_any_call("Type: list, Count: 1, Size: 100 bytes")
 
+    @patch('analyzer.logging.info')
+    @patch('analyzer.tracker.SummaryTracker.diff')
+    def test_track_manager(self, mock_diff, mock_logging_info):
+        """
+        Tests that tracking a manager reports the changes of its metrics without scanning the heap.
+
+        Args:
+            mock_diff (MagicMock): Mock for SummaryTracker.diff.
+            mock_logging_info (MagicMock): Mock for logging.info.
+        """
+        MemoryManager._instance = None
+        manager = MemoryManager()
+        blocks = [manager.allocate(None, 100) for _ in range(3)]
+
+        deltas = self.analyzer.track(manager)
+        self.assertEqual(deltas, {'arenas': 1, 'pools': 1, 'blocks': 3, 'reserved': 4000, 'used': 312, 'requested': 300})
+        mock_logging_info.assert_called_with(
+            "Track: arenas 1 (+1), pools 1 (+1), blocks 3 (+3), reserved 4000 (+4000), used 312 (+312), requested 300 (+300)")
+
+        manager.deallocate(blocks[0])
+        deltas = self.analyzer.track(manager)
+        self.assertEqual(deltas, {'arenas': 0, 'pools': 0, 'blocks': -1, 'reserved': 0, 'used': -104, 'requested': -100})
+        mock_diff.assert_not_called()
+        MemoryManager._instance = None
+
+    @parameterized.expand([("sync", False), ("async", True)])
+    def test_structured(self, name, async_logging):
+        """
+        Tests that structured mode writes timestamped, typed JSON Lines records.
+
+        Args:
+            name (str): The name of the logging mode.
+            async_logging (bool): Whether to log through the queue.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            log_file = os.path.join(directory, 'log.jsonl')
+            analyzer = MemoryAnalyzer.reset(log_file=log_file, async_logging=async_logging, structured=True)
+            before = time.time()
+            for length in range(3):
+                analyzer.measure_size(bytearray(length), 'fast')
+            analyzer.close()
+
+            records = list(read_records(log_file))
+        self.assertEqual([record['type'] for record in records], ['size'] * 3)
+        self.assertEqual([record['size'] for record in records], [fast_size(bytearray(length)) for length in range(3)])
+        self.assertTrue(all(record['time'] >= before - 1 for record in records))
+
+    def test_structured_track_manager(self):
+        """
+        Tests the structured record of tracking a manager.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            log_file = os.path.join(directory, 'log.jsonl')
+            analyzer = MemoryAnalyzer.reset(log_file=log_file, structured=True)
+            MemoryManager._instance = None
+            manager = MemoryManager()
+            manager.allocate(None, 100)
+            analyzer.track(manager)
+            analyzer.close()
+            MemoryManager._instance = None
+
+            record, = read_records(log_file, 'track')
+        self.assertEqual(record['blocks'], 1)
+        self.assertEqual(record['blocks_delta'], 1)
+        self.assertEqual(record['requested'], 100)
+        self.assertEqual(record['used_delta'], 104)
+
+    @patch('pympler.summary.summarize', return_value=[('list', 1, 5000)])
+    @patch('pympler.muppy.get_objects', return_value=['obj1', 'obj2'])
+    @patch('analyzer.tracker.SummaryTracker.diff', return_value=[('list', 1, 100)])
+    def test_structured_heap(self, mock_diff, mock_get_objects, mock_summarize):
+        """
+        Tests the structured records of tracking, analyzing and summarizing the heap.
+
+        Args:
+            mock_diff (MagicMock): Mock for SummaryTracker.diff.
+            mock_get_objects (MagicMock): Mock for muppy.get_objects.
+            mock_summarize (MagicMock): Mock for summary.summarize.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            log_file = os.path.join(directory, 'log.jsonl')
+            analyzer = MemoryAnalyzer.reset(log_file=log_file, structured=True)
+            analyzer.track()
+            analyzer.summarize()
+            analyzer.close()
+
+            records = list(read_records(log_file))
+        self.assertEqual([record['type'] for record in records], ['track', 'objects', 'summary'])
+        self.assertEqual(records[0]['entries'], [{'type': 'list', 'count': 1, 'size': 100}])
+        self.assertEqual(records[1]['count'], 2)
+        self.assertEqual(records[2]['entries'], [{'type': 'list', 'count': 1, 'size': 5000}])
+
+    @parameterized.expand([("text", False, False), ("async", True, False), ("structured", False, True)])
+    @patch('analyzer.logging.info')
+    def test_close_drops_records(self, name, async_logging, structured, mock_logging_info):
+        """
+        Tests that records logged after closing are dropped instead of reaching the root logger.
+
+        Args:
+            name (str): The name of the logging mode.
+            async_logging (bool): Whether to log through the queue.
+            structured (bool): Whether to write JSON Lines records.
+            mock_logging_info (MagicMock): Mock for logging.info.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            log_file = os.path.join(directory, 'log.txt')
+            analyzer = MemoryAnalyzer.reset(log_file=log_file, async_logging=async_logging,
+                                                   structured=structured)
+            analyzer.close()
+            analyzer.measure_size("object")
+            analyzer.analyze()
+
+            self.assertTrue(analyzer.closed)
+            mock_logging_info.assert_not_called()
+            if async_logging or structured:
+                with open(log_file) as file:
+                    self.assertEqual(file.read(), "")
+
+    def test_load_columns(self):
+        """
+        Tests that the records of one type are loaded as NumPy columns.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            log_file = os.path.join(directory, 'log.jsonl')
+            analyzer = MemoryAnalyzer.reset(log_file=log_file, structured=True)
+            for length in (0, 100, 200):
+                analyzer.measure_size(bytearray(length), 'shallow')
+            analyzer._record('objects', count=5)
+            analyzer.close()
+
+            columns = load_columns(log_file, 'size')
+        self.assertEqual(set(columns), {'time', 'size'})
+        self.assertEqual(columns['size'].dtype.kind, 'i')
+        self.assertEqual(columns['size'].tolist(), [sys.getsizeof(bytearray(length)) for length in (0, 100, 200)])
+        self.assertTrue((columns['time'][1:] >= columns['time'][:-1]).all())
+
+    def test_sampling(self):
+        """
+        Tests that the sampling thread fills the ring buffer with the manager's metrics.
+        """
+        MemoryManager._instance = None
+        manager = MemoryManager()
+        manager.allocate(None, 100)
+        self.analyzer.start_sampling(manager, interval=0.001, capacity=5, summary_interval=None)
+        while len(self.analyzer.samples) < 5:
+            time.sleep(0.001)
+        self.analyzer.stop_sampling()
+        MemoryManager._instance = None
+
+        self.assertEqual(len(self.analyzer.samples), 5)  # Older samples are dropped
+        sample = self.analyzer.samples[-1]
+        self.assertEqual(sample['blocks'], 1)
+        self.assertEqual(sample['requested'], 100)
+        self.assertLessEqual(self.analyzer.samples[0]['time'], sample['time'])
+        stats = self.analyzer.sampling_stats()
+        self.assertEqual(stats['samples'], 5)
+        self.assertEqual(stats['summaries_taken'], 0)
+        self.assertGreater(stats['busy'], 0)
+        self.assertLess(stats['overhead'], 1)
+
+    @patch('analyzer.MemoryAnalyzer.summarize', side_effect=lambda: time.sleep(0.05))
+    def test_sampling_budget(self, mock_summarize):
+        """
+        Tests that deep summaries are skipped once they would exceed the budget.
+
+        Args:
+            mock_summarize (MagicMock): Mock for MemoryAnalyzer.summarize, taking 50ms.
+        """
+        self.analyzer.start_sampling(MagicMock(), interval=0.001, budget=0.5, summary_interval=0.001)
+        time.sleep(0.3)
+        self.analyzer.stop_sampling()
+        stats = self.analyzer.sampling_stats()
+
+        self.assertGreaterEqual(stats['summaries_taken'], 1)
+        self.assertGreater(stats['summaries_skipped'], 0)
+        self.assertEqual(mock_summarize.call_count, stats['summaries_taken'])
+        # Each summary is only taken while the overhead stays under the budget
+        self.assertLess(stats['overhead'], 0.5 + 0.05 / 0.3)
+
+    @patch('analyzer.MemoryAnalyzer.summarize')
+    def test_sampling_no_budget(self, mock_summarize):
+        """
+        Tests that no deep summary is taken after the first one with a budget of zero.
+
+        Args:
+            mock_summarize (MagicMock): Mock for MemoryAnalyzer.summarize.
+        """
+        manager = MagicMock()
+        self.analyzer.start_sampling(manager, interval=0.001, budget=0, summary_interval=0.001)
+        while self.analyzer.sampling_stats()['summaries_skipped'] < 3:
+            time.sleep(0.001)
+        self.analyzer.stop_sampling()
+
+        self.assertLessEqual(mock_summarize.call_count, 1)
+        self.assertGreater(manager.metrics.call_count, 0)
+
+    def test_sampling_invalid(self):
+        """
+        Tests starting sampling twice and with a budget out of range.
+        """
+        with self.assertRaises(ValueError):
+            self.analyzer.start_sampling(MagicMock(), budget=2)
+        self.analyzer.start_sampling(MagicMock(), interval=0.001)
+        try:
+            with self.assertRaises(RuntimeError):
+                self.analyzer.start_sampling(MagicMock())
+        finally:
+            self.analyzer.close()
+
     @patch('analyzer.logging.info') 
     @patch('pympler.muppy.get_objects', return_value=['obj1', 'obj2'])
     def test_analyze(self, mock_get_objects, mock_logging_info):
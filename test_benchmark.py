@@ -0,0 +1,171 @@
+"""
+NAME
+    test_benchmark
+
+DESCRIPTION
+    This module contains unit tests for the benchmark suite.
+    It uses the unittest framework and parameterized tests for the size distributions.
+
+CLASSES
+    TestBenchmark
+        Unit tests for the benchmark module.
+
+        Methods defined here:
+            setUpClass(cls)
+                Sets up an analyzer that logs no sizes for the benchmarked allocations.
+
+            setUp(self)
+                Sets up the test case environment.
+
+            test_make_sizes(self, name, distribution)
+                Tests that each distribution draws reproducible sizes a block can hold.
+
+            test_make_sizes_unknown(self)
+                Tests that an unknown distribution raises an error.
+
+            test_prefill(self)
+                Tests that prefill creates a fresh manager holding the live blocks, leaving the default instance alone.
+
+            test_bench_allocate_restores_manager(self)
+                Tests that benchmarking allocations leaves the manager with its initial blocks.
+
+            test_bench_allocate_pool_releases_pools(self)
+                Tests that benchmarking pool creation releases the pools it creates.
+
+            test_run(self)
+                Tests that a small run times every case and keeps the default instance.
+
+            test_compare(self)
+                Tests that only cases slower than the threshold are reported, worst first.
+
+            test_save_load(self)
+                Tests that saved results are loaded back unchanged.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from parameterized import parameterized
+
+from benchmark import (DISTRIBUTIONS, make_sizes, prefill, bench_allocate, bench_allocate_pool,
+                       run, compare, save, load)
+from manager import MemoryManager
+from memory import Block
+from analyzer import MemoryAnalyzer
+
+class TestBenchmark(unittest.TestCase):
+    """
+    Unit tests for the benchmark module.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Sets up an analyzer that logs no sizes for the benchmarked allocations.
+        """
+        MemoryAnalyzer.reset(sample_rate=0)
+
+    def setUp(self):
+        """
+        Sets up the test case environment.
+        """
+        MemoryManager._instance = None
+
+    @parameterized.expand([(distribution, distribution) for distribution in DISTRIBUTIONS])
+    def test_make_sizes(self, name, distribution):
+        """
+        Tests that each distribution draws reproducible sizes a block can hold.
+
+        Args:
+            name (str): The name of the distribution.
+            distribution (str): The distribution.
+        """
+        sizes = make_sizes(distribution, 1000)
+
+        self.assertEqual(sizes, make_sizes(distribution, 1000))
+        self.assertTrue(all(isinstance(size, int) and 1 <= size <= Block.MAXSIZE for size in sizes))
+
+    def test_make_sizes_unknown(self):
+        """
+        Tests that an unknown distribution raises an error.
+        """
+        with self.assertRaises(ValueError):
+            make_sizes('normal', 10)
+
+    def test_prefill(self):
+        """
+        Tests that prefill creates a fresh manager holding the live blocks, leaving the default instance alone.
+        """
+        default = MemoryManager.get_instance()
+        first = prefill(100, 'fixed')
+        manager = prefill(200, 'fixed')
+
+        self.assertIsNot(manager, first)
+        self.assertIs(MemoryManager.get_instance(), default)
+        self.assertEqual(default.arenas, [])
+        self.assertEqual(sum(len(pool.blocks) for arena in manager.arenas for pool in arena.pools), 200)
+
+    def test_bench_allocate_restores_manager(self):
+        """
+        Tests that benchmarking allocations leaves the manager with its initial blocks.
+        """
+        manager = prefill(100, 'uniform')
+        pools = manager.pool_count
+        allocate, deallocate = bench_allocate(manager, make_sizes('uniform', 50, seed=1), repeat=2)
+
+        self.assertGreater(allocate, 0)
+        self.assertGreater(deallocate, 0)
+        self.assertEqual(manager.pool_count, pools)
+        self.assertEqual(sum(len(pool.blocks) for arena in manager.arenas for pool in arena.pools), 100)
+
+    def test_bench_allocate_pool_releases_pools(self):
+        """
+        Tests that benchmarking pool creation releases the pools it creates.
+        """
+        manager = prefill(100, 'fixed')
+        pools = manager.pool_count
+
+        self.assertGreater(bench_allocate_pool(manager, 5, repeat=2), 0)
+        self.assertEqual(manager.pool_count, pools)
+
+    def test_run(self):
+        """
+        Tests that a small run times every case and keeps the default instance.
+        """
+        default = MemoryManager.get_instance()
+        results = run(live_counts=(100,), distributions=('fixed',), batch=10, repeat=1)
+
+        self.assertEqual(set(results), {
+            'allocate[fixed-100]', 'deallocate[fixed-100]', '_allocate_pool[fixed-100]', 'Block[known-size]',
+            'measure_size[shallow]', 'measure_size[fast]', 'measure_size[deep]',
+        })
+        self.assertTrue(all(result > 0 for result in results.values()))
+        self.assertIs(MemoryManager.get_instance(), default)
+
+    def test_compare(self):
+        """
+        Tests that only cases slower than the threshold are reported, worst first.
+        """
+        baseline = {'a': 100.0, 'b': 100.0, 'c': 100.0, 'd': 100.0}
+        results = {'a': 110.0, 'b': 130.0, 'c': 200.0, 'e': 1000.0}
+
+        self.assertEqual(compare(results, baseline, threshold=0.2), [
+            ('c', 100.0, 200.0, 2.0),
+            ('b', 100.0, 130.0, 1.3),
+        ])
+
+    def test_save_load(self):
+        """
+        Tests that saved results are loaded back unchanged.
+        """
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "baseline.json")
+            save(path, {'allocate[fixed-1000]': 1234.5})
+            self.assertEqual(load(path), {'allocate[fixed-1000]': 1234.5})
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
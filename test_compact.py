@@ -0,0 +1,247 @@
+"""
+NAME
+    test_compact
+
+DESCRIPTION
+    This module contains unit tests for the CompactMemoryManager class.
+    It uses the unittest framework and parameterized tests for various sizes.
+
+CLASSES
+    TestCompactMemoryManager
+        Unit tests for the CompactMemoryManager class.
+
+        Methods defined here:
+            setUpClass(cls)
+                Sets up an analyzer that logs no sizes for the objects the compact manager measures.
+
+            setUp(self)
+                Sets up the test case environment.
+
+            test_allocate_size(self, name, size)
+                Tests the allocation of blocks of various sizes.
+
+            test_allocate_size_too_large(self)
+                Tests the allocation of a block that exceeds the maximum block size.
+
+            test_allocate_size_not_positive(self, name, size)
+                Tests that the allocation of a block of zero or negative size raises an error.
+
+            test_geometry(self)
+                Tests the allocation of blocks in a manager with its own geometry.
+
+            test_geometry_invalid(self, name, geometry)
+                Tests that an inconsistent geometry raises an error.
+
+            test_allocate(self)
+                Tests the allocation of a block for a measured object.
+
+            test_allocate_same_class(self)
+                Tests that blocks of the same size class share a pool and get consecutive slots.
+
+            test_allocate_full_pool(self)
+                Tests that a new pool is created once a pool is full.
+
+            test_allocate_full_arena(self)
+                Tests that a new arena is created once an arena is full.
+
+            test_deallocate(self)
+                Tests the deallocation of a block and the reuse of its slot and handle.
+
+            test_deallocate_invalid(self)
+                Tests the deallocation of unknown and already deallocated handles.
+
+            test_deallocate_to_empty(self)
+                Tests that empty pools and arenas are released and reused.
+
+            test_bookkeeping_bytes(self)
+                Tests that the bookkeeping stays a few bytes per block.
+"""
+
+import unittest
+from parameterized import parameterized
+
+from compact import CompactMemoryManager
+from memory import Arena, Pool, Block
+from analyzer import MemoryAnalyzer, fast_size
+
+class TestCompactMemoryManager(unittest.TestCase):
+    """
+    Unit tests for the CompactMemoryManager class.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Sets up an analyzer that logs no sizes for the objects the compact manager measures.
+        """
+        MemoryAnalyzer.reset(sample_rate=0)
+
+    def setUp(self):
+        """
+        Sets up the test case environment.
+        """
+        self.manager = CompactMemoryManager(sizer='fast')
+
+    @parameterized.expand([("smallest", 1), ("aligned", 64), ("unaligned", 57), ("largest", Block.MAXSIZE)])
+    def test_allocate_size(self, name, size):
+        """
+        Tests the allocation of blocks of various sizes.
+
+        Args:
+            name (str): The name of the size.
+            size (int): The size of the block.
+        """
+        handle = self.manager.allocate_size(size)
+
+        self.assertEqual(handle, 0)
+        self.assertEqual(self.manager.block_size[handle], size)
+        self.assertEqual(self.manager.pool_class[self.manager.block_pool[handle]], Pool.size_class(size))
+        self.assertEqual(self.manager.stats(), {'arenas': 1, 'pools': 1, 'blocks': 1, 'bytes': size})
+
+    def test_allocate_size_too_large(self):
+        """
+        Tests the allocation of a block that exceeds the maximum block size.
+        """
+        with self.assertRaises(ValueError):
+            self.manager.allocate_size(Block.MAXSIZE + 1)
+        self.assertEqual(self.manager.stats()['arenas'], 0)
+
+    @parameterized.expand([("zero", 0), ("negative", -5)])
+    def test_allocate_size_not_positive(self, name, size):
+        """
+        Tests that the allocation of a block of zero or negative size raises an error.
+
+        Args:
+            name (str): The name of the size.
+            size (int): The size of the block.
+        """
+        with self.assertRaises(ValueError):
+            self.manager.allocate_size(size)
+        self.assertEqual(self.manager.stats()['arenas'], 0)
+
+    def test_geometry(self):
+        """
+        Tests the allocation of blocks in a manager with its own geometry.
+        """
+        manager = CompactMemoryManager(sizer='fast', arena_size=2048, pool_size=1024,
+                                       max_block_size=1024, alignment=32)
+        handles = [manager.allocate_size(1000) for _ in range(3)]
+
+        self.assertEqual(manager.pool_class[manager.block_pool[handles[0]]], 1024)
+        self.assertEqual(manager.stats(), {'arenas': 2, 'pools': 3, 'blocks': 3, 'bytes': 3000})
+        self.assertEqual(manager.block_offset(manager.allocate_size(20)), 0)  # A 32 byte class
+        with self.assertRaises(ValueError):
+            manager.allocate_size(1025)
+
+    @parameterized.expand([
+        ("alignment", {'alignment': 12}),
+        ("block_over_pool", {'pool_size': 256}),
+        ("pool_over_arena", {'arena_size': 2048, 'pool_size': 4096}),
+        ("too_many_slots", {'arena_size': 1 << 20, 'pool_size': 1 << 20}),
+    ])
+    def test_geometry_invalid(self, name, geometry):
+        """
+        Tests that an inconsistent geometry raises an error.
+
+        Args:
+            name (str): The name of the case.
+            geometry (dict): The geometry of the manager.
+        """
+        with self.assertRaises(ValueError):
+            CompactMemoryManager(**geometry)
+
+    def test_allocate(self):
+        """
+        Tests the allocation of a block for a measured object.
+        """
+        obj = bytearray(200)
+        handle = self.manager.allocate(obj)
+
+        self.assertEqual(self.manager.block_size[handle], fast_size(obj))
+
+    def test_allocate_same_class(self):
+        """
+        Tests that blocks of the same size class share a pool and get consecutive slots.
+        """
+        handles = [self.manager.allocate_size(size) for size in (57, 60, 64)]
+
+        self.assertEqual(len(set(self.manager.block_pool[handle] for handle in handles)), 1)
+        self.assertEqual([self.manager.block_offset(handle) for handle in handles], [0, 64, 128])
+
+    def test_allocate_full_pool(self):
+        """
+        Tests that a new pool is created once a pool is full.
+        """
+        slots = Pool.MAXSIZE // 512
+        handles = [self.manager.allocate_size(512) for _ in range(slots + 1)]
+
+        self.assertEqual(self.manager.stats()['pools'], 2)
+        self.assertNotIn(self.manager.block_pool[handles[0]], self.manager.usedpools[512])
+        self.assertIn(self.manager.block_pool[handles[-1]], self.manager.usedpools[512])
+
+    def test_allocate_full_arena(self):
+        """
+        Tests that a new arena is created once an arena is full.
+        """
+        slots = Pool.MAXSIZE // 512
+        pools = Arena.MAXSIZE // Pool.MAXSIZE
+        for _ in range(slots * pools + 1):
+            self.manager.allocate_size(512)
+
+        self.assertEqual(self.manager.stats()['arenas'], 2)
+        self.assertEqual(self.manager.stats()['pools'], pools + 1)
+
+    def test_deallocate(self):
+        """
+        Tests the deallocation of a block and the reuse of its slot and handle.
+        """
+        handle1 = self.manager.allocate_size(64)
+        handle2 = self.manager.allocate_size(64)
+        offset = self.manager.block_offset(handle1)
+
+        self.assertTrue(self.manager.deallocate(handle1))
+        self.assertEqual(self.manager.stats(), {'arenas': 1, 'pools': 1, 'blocks': 1, 'bytes': 64})
+        handle3 = self.manager.allocate_size(64)
+        self.assertEqual(handle3, handle1)  # The handle is reused
+        self.assertEqual(self.manager.block_offset(handle3), offset)  # The slot is reused
+        self.assertNotEqual(self.manager.block_offset(handle2), offset)
+
+    def test_deallocate_invalid(self):
+        """
+        Tests the deallocation of unknown and already deallocated handles.
+        """
+        handle = self.manager.allocate_size(64)
+
+        self.assertFalse(self.manager.deallocate(-1))
+        self.assertFalse(self.manager.deallocate(handle + 1))
+        self.assertTrue(self.manager.deallocate(handle))
+        self.assertFalse(self.manager.deallocate(handle))
+
+    def test_deallocate_to_empty(self):
+        """
+        Tests that empty pools and arenas are released and reused.
+        """
+        handles = [self.manager.allocate_size(size) for size in (8, 64, 512)]
+        for handle in handles:
+            self.assertTrue(self.manager.deallocate(handle))
+
+        self.assertEqual(self.manager.stats(), {'arenas': 0, 'pools': 0, 'blocks': 0, 'bytes': 0})
+        self.assertEqual(self.manager.pool_bitmap, bytes(len(self.manager.pool_bitmap)))
+        self.manager.allocate_size(128)
+        self.assertEqual(len(self.manager.arena_pools), 1)  # The arena ID is reused
+        self.assertEqual(len(self.manager.pool_class), 3)  # A pool ID is reused
+
+    def test_bookkeeping_bytes(self):
+        """
+        Tests that the bookkeeping stays a few bytes per block.
+        """
+        count = 100000
+        for index in range(count):
+            self.manager.allocate_size(8 + index % 500)
+
+        self.assertEqual(self.manager.stats()['blocks'], count)
+        self.assertLess(self.manager.bookkeeping_bytes() / count, 32)
+
+
+if __name__ == '__main__':
+    unittest.main()
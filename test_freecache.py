@@ -0,0 +1,194 @@
+"""
+NAME
+    test_freecache
+
+DESCRIPTION
+    This module contains unit tests for the bounded caches of freed items.
+    It uses the unittest framework and parameterized tests for the invalid limits.
+
+CLASSES
+    TestFreeCache
+        Unit tests for the FreeCache class.
+
+        Methods defined here:
+            setUp(self)
+                Sets up the test case environment.
+
+            tick(self)
+                Returns the time of the fake clock.
+
+            test_unbounded(self)
+                Tests that an unbounded cache keeps every item and pops the most recently freed.
+
+            test_pop_empty(self)
+                Tests that popping an empty cache raises an error.
+
+            test_cap(self)
+                Tests that a capped cache keeps the most recently freed items and releases the others.
+
+            test_cap_zero(self)
+                Tests that a cache with a cap of zero releases every item.
+
+            test_max_age(self)
+                Tests that items older than the maximum age are released when the cache is used.
+
+            test_pop_expired(self)
+                Tests that popping a cache whose items all expired raises an error.
+
+            test_trim(self)
+                Tests that trimming releases expired items of an idle cache.
+
+            test_invalid_limits(self, name, limits)
+                Tests that an invalid cap or maximum age raises an error.
+
+            test_list_compatible(self)
+                Tests that a cache iterates and counts like a list of its items.
+"""
+
+import unittest
+from parameterized import parameterized
+
+from freecache import FreeCache
+
+class TestFreeCache(unittest.TestCase):
+    """
+    Unit tests for the FreeCache class.
+    """
+
+    def setUp(self):
+        """
+        Sets up the test case environment.
+        """
+        self.now = 0.0
+
+    def tick(self):
+        """
+        Returns the time of the fake clock.
+
+        Returns:
+            float: The current fake time in seconds.
+        """
+        return self.now
+
+    def test_unbounded(self):
+        """
+        Tests that an unbounded cache keeps every item and pops the most recently freed.
+        """
+        cache = FreeCache()
+        for item in range(100):
+            cache.append(item)
+
+        self.assertEqual(cache.pop(), 99)
+        self.assertEqual(cache.stats(), {'retained': 99, 'released': 0})
+
+    def test_pop_empty(self):
+        """
+        Tests that popping an empty cache raises an error.
+        """
+        with self.assertRaises(IndexError):
+            FreeCache().pop()
+        with self.assertRaises(IndexError):
+            FreeCache(cap=2).pop()
+
+    def test_cap(self):
+        """
+        Tests that a capped cache keeps the most recently freed items and releases the others.
+        """
+        cache = FreeCache(cap=3)
+        for item in range(5):
+            cache.append(item)
+
+        self.assertEqual(list(cache), [2, 3, 4])
+        self.assertEqual(cache.stats(), {'retained': 3, 'released': 2})
+        self.assertEqual(cache.pop(), 4)
+        cache.append(5)
+        self.assertEqual(list(cache), [2, 3, 5])
+        self.assertEqual(cache.released, 2)
+
+    def test_cap_zero(self):
+        """
+        Tests that a cache with a cap of zero releases every item.
+        """
+        cache = FreeCache(cap=0)
+        cache.append("item")
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.released, 1)
+
+    def test_max_age(self):
+        """
+        Tests that items older than the maximum age are released when the cache is used.
+        """
+        cache = FreeCache(max_age=10, clock=self.tick)
+        cache.append("old")
+        self.now = 5.0
+        cache.append("young")
+        self.now = 12.0
+        cache.append("new")
+
+        self.assertEqual(list(cache), ["young", "new"])
+        self.assertEqual(cache.released, 1)
+        self.now = 20.0
+        self.assertEqual(cache.pop(), "new")
+        self.assertEqual(len(cache), 0)  # The young item expired when popping
+        self.assertEqual(cache.released, 2)
+
+    def test_pop_expired(self):
+        """
+        Tests that popping a cache whose items all expired raises an error.
+        """
+        cache = FreeCache(max_age=1, clock=self.tick)
+        cache.append("item")
+        self.now = 2.0
+
+        with self.assertRaises(IndexError):
+            cache.pop()
+        self.assertEqual(cache.stats(), {'retained': 0, 'released': 1})
+
+    def test_trim(self):
+        """
+        Tests that trimming releases expired items of an idle cache.
+        """
+        cache = FreeCache(cap=5, max_age=10, clock=self.tick)
+        for item in range(3):
+            self.now = float(item * 5)
+            cache.append(item)
+        self.now = 19.0
+
+        self.assertEqual(cache.trim(), 2)
+        self.assertEqual(list(cache), [2])
+        self.assertEqual(FreeCache().trim(), 0)
+
+    @parameterized.expand([
+        ("negative_cap", {'cap': -1}),
+        ("zero_max_age", {'max_age': 0}),
+        ("negative_max_age", {'max_age': -1.0}),
+    ])
+    def test_invalid_limits(self, name, limits):
+        """
+        Tests that an invalid cap or maximum age raises an error.
+
+        Args:
+            name (str): The name of the case.
+            limits (dict): The keyword arguments of the cache.
+        """
+        with self.assertRaises(ValueError):
+            FreeCache(**limits)
+
+    def test_list_compatible(self):
+        """
+        Tests that a cache iterates and counts like a list of its items.
+        """
+        cache = FreeCache(cap=4)
+        for item in "abc":
+            cache.append(item)
+
+        self.assertEqual(list(cache), ["a", "b", "c"])
+        self.assertEqual(len(cache), 3)
+        self.assertIn("b", cache)
+        self.assertTrue(cache)
+        self.assertFalse(FreeCache())
+        self.assertEqual(repr(cache), "FreeCache(['a', 'b', 'c'])")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+"""
+NAME
+    test_large
+
+DESCRIPTION
+    This module contains unit tests for the large object allocator.
+    It uses the unittest framework and parameterized tests for the extent sizes.
+
+CLASSES
+    TestLargeObjectAllocator
+        Unit tests for the LargeObjectAllocator class.
+
+        Methods defined here:
+            setUp(self)
+                Sets up the test case environment.
+
+            check_extents(self)
+                Checks that the free extents are sorted, disjoint, not adjacent and below the top.
+
+            test_extent_size(self, name, size, expected)
+                Tests that sizes are rounded up to whole pages.
+
+            test_invalid_page_size(self)
+                Tests that a page size that is not positive raises an error.
+
+            test_allocate(self)
+                Tests that extents are mapped one after the other at the top.
+
+            test_free_top(self)
+                Tests that freeing the extent at the top unmaps it, with the free extents below it.
+
+            test_free_coalesces(self)
+                Tests that a freed extent is coalesced with its free neighbours on both sides.
+
+            test_reuse_lowest_fit(self)
+                Tests that allocation takes the lowest free extent that fits and splits it.
+
+            test_free_twice(self)
+                Tests that freeing a block twice fails the second time.
+
+            test_free_foreign(self)
+                Tests that a block of another allocator is not freed and leaves the extents alone.
+
+            test_metrics(self)
+                Tests the usage and fragmentation of the large objects.
+
+            test_random_churn(self)
+                Tests that the extents stay consistent through random allocations and frees.
+"""
+
+import random
+import unittest
+from parameterized import parameterized
+
+from large import PAGE_SIZE, LargeBlock, LargeObjectAllocator
+
+class TestLargeObjectAllocator(unittest.TestCase):
+    """
+    Unit tests for the LargeObjectAllocator class.
+    """
+
+    def setUp(self):
+        """
+        Sets up the test case environment.
+        """
+        self.allocator = LargeObjectAllocator()
+
+    def check_extents(self):
+        """
+        Checks that the free extents are sorted, disjoint, not adjacent and below the top.
+        """
+        allocator = self.allocator
+        extents = list(zip(allocator.starts, allocator.lengths))
+        for (start, length), (next_start, _) in zip(extents, extents[1:]):
+            self.assertLess(start + length, next_start)  # Adjacent extents would have been coalesced
+        if extents:
+            start, length = extents[-1]
+            self.assertLess(start + length, allocator.top)  # A free extent at the top is unmapped
+        self.assertEqual(allocator.top - sum(allocator.lengths), allocator.reserved)
+
+    @parameterized.expand([
+        ("zero", 0, PAGE_SIZE),
+        ("small", 513, PAGE_SIZE),
+        ("page", PAGE_SIZE, PAGE_SIZE),
+        ("over_page", PAGE_SIZE + 1, 2 * PAGE_SIZE),
+    ])
+    def test_extent_size(self, name, size, expected):
+        """
+        Tests that sizes are rounded up to whole pages.
+
+        Args:
+            name (str): The name of the case.
+            size (int): The size to be rounded.
+            expected (int): The expected extent size.
+        """
+        self.assertEqual(self.allocator.extent_size(size), expected)
+
+    def test_invalid_page_size(self):
+        """
+        Tests that a page size that is not positive raises an error.
+        """
+        with self.assertRaises(ValueError):
+            LargeObjectAllocator(page_size=0)
+
+    def test_allocate(self):
+        """
+        Tests that extents are mapped one after the other at the top.
+        """
+        first = self.allocator.allocate("first", 1000)
+        second = self.allocator.allocate("second", 5000)
+
+        self.assertIsInstance(first, LargeBlock)
+        self.assertEqual((first.obj, first.block_size, first.offset, first.length), ("first", 1000, 0, PAGE_SIZE))
+        self.assertEqual((second.offset, second.length), (PAGE_SIZE, 2 * PAGE_SIZE))
+        self.assertEqual(self.allocator.top, 3 * PAGE_SIZE)
+
+    def test_free_top(self):
+        """
+        Tests that freeing the extent at the top unmaps it, with the free extents below it.
+        """
+        blocks = [self.allocator.allocate(None, PAGE_SIZE) for _ in range(3)]
+        self.allocator.free(blocks[1])
+        self.assertEqual(self.allocator.top, 3 * PAGE_SIZE)
+
+        self.allocator.free(blocks[2])
+        self.assertEqual(self.allocator.top, PAGE_SIZE)
+        self.assertEqual(self.allocator.starts, [])
+        self.check_extents()
+
+    def test_free_coalesces(self):
+        """
+        Tests that a freed extent is coalesced with its free neighbours on both sides.
+        """
+        blocks = [self.allocator.allocate(None, PAGE_SIZE) for _ in range(5)]
+        self.allocator.free(blocks[1])
+        self.allocator.free(blocks[3])
+        self.assertEqual(self.allocator.starts, [PAGE_SIZE, 3 * PAGE_SIZE])
+
+        self.allocator.free(blocks[2])
+        self.assertEqual(self.allocator.starts, [PAGE_SIZE])
+        self.assertEqual(self.allocator.lengths, [3 * PAGE_SIZE])
+        self.check_extents()
+
+    def test_reuse_lowest_fit(self):
+        """
+        Tests that allocation takes the lowest free extent that fits and splits it.
+        """
+        blocks = [self.allocator.allocate(None, size) for size in (PAGE_SIZE, PAGE_SIZE, 3 * PAGE_SIZE, PAGE_SIZE)]
+        self.allocator.free(blocks[0])
+        self.allocator.free(blocks[2])
+
+        block = self.allocator.allocate(None, 2 * PAGE_SIZE)  # Too large for the first free extent
+        self.assertEqual(block.offset, 2 * PAGE_SIZE)
+        self.assertEqual(self.allocator.starts, [0, 4 * PAGE_SIZE])
+        self.assertEqual(self.allocator.lengths, [PAGE_SIZE, PAGE_SIZE])
+
+        self.assertEqual(self.allocator.allocate(None, 1).offset, 0)
+        self.check_extents()
+
+    def test_free_twice(self):
+        """
+        Tests that freeing a block twice fails the second time.
+        """
+        block = self.allocator.allocate(None, 1000)
+        self.assertTrue(self.allocator.free(block))
+        self.assertFalse(self.allocator.free(block))
+        self.assertEqual(self.allocator.blocks, 0)
+
+    def test_free_foreign(self):
+        """
+        Tests that a block of another allocator is not freed and leaves the extents alone.
+        """
+        other = LargeObjectAllocator()
+        foreign = other.allocate(None, PAGE_SIZE)
+        blocks = [self.allocator.allocate(None, PAGE_SIZE) for _ in range(2)]
+
+        self.assertFalse(self.allocator.free(foreign))  # Same offset as blocks[0]
+        self.assertFalse(self.allocator.free(LargeBlock(None, PAGE_SIZE, PAGE_SIZE, PAGE_SIZE)))
+        self.assertEqual((self.allocator.starts, self.allocator.top, self.allocator.blocks), ([], 2 * PAGE_SIZE, 2))
+        self.assertTrue(other.free(foreign))
+        self.assertTrue(all(self.allocator.free(block) for block in blocks))
+
+    def test_metrics(self):
+        """
+        Tests the usage and fragmentation of the large objects.
+        """
+        blocks = [self.allocator.allocate(None, size) for size in (1000, 5000, 3000)]
+        self.allocator.free(blocks[1])
+
+        self.assertEqual(self.allocator.metrics(), {
+            'blocks': 2,
+            'free_extents': 1,
+            'mapped': 4 * PAGE_SIZE,
+            'reserved': 2 * PAGE_SIZE,
+            'requested': 4000,
+            'free': 2 * PAGE_SIZE,
+            'internal_fragmentation': (2 * PAGE_SIZE - 4000) / (2 * PAGE_SIZE),
+            'external_fragmentation': 0.5,
+        })
+
+    def test_random_churn(self):
+        """
+        Tests that the extents stay consistent through random allocations and frees.
+        """
+        rng = random.Random(1)
+        live = []
+        for _ in range(2000):
+            if live and rng.random() < 0.5:
+                self.assertTrue(self.allocator.free(live.pop(rng.randrange(len(live)))))
+            else:
+                live.append(self.allocator.allocate(None, rng.randint(513, 10 * PAGE_SIZE)))
+            self.check_extents()
+
+        extents = sorted((block.offset, block.length) for block in live)
+        for (start, length), (next_start, _) in zip(extents, extents[1:]):
+            self.assertLessEqual(start + length, next_start)  # Live extents never overlap
+        for block in live:
+            self.allocator.free(block)
+        self.assertEqual(self.allocator.top, 0)
+
+if __name__ == '__main__':
+    unittest.main()
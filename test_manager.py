@@ -11,11 +11,53 @@ CLASSES
         Unit tests for the MemoryManager class.
 
         Methods defined here:
+            setUpClass(cls)
+                Sets up an analyzer that logs no sizes, so allocations leave memory_log.txt untouched.
+
             setUp(self)
                 Sets up the test case environment.
 
             test_get_instance(self)
-                Tests the singleton instance of the MemoryManager.
+                Tests the default instance of the MemoryManager.
+
+            test_sizer(self, name, sizer)
+                Tests the allocation of memory with each sizing strategy.
+
+            test_sizer_invalid(self)
+                Tests the MemoryManager with an unknown sizing strategy.
+
+            test_independent_instances(self)
+                Tests that managers are independent heaps, apart from the default instance.
+
+            test_deallocate_foreign_block(self, name, tcache, sizes)
+                Tests that a manager rejects a block of another manager and leaves both heaps intact.
+
+            test_geometry(self)
+                Tests the allocation of memory in a manager with its own geometry.
+
+            test_geometry_invalid(self, name, geometry)
+                Tests the MemoryManager with inconsistent geometries.
+
+            make_two_arenas(self, policy) -> tuple
+                Creates a manager with arenas of four pools, the first holding one pool and the second three.
+
+            test_arena_policy(self, name, policy, expected)
+                Tests which arena each arena policy places a new pool in.
+
+            test_most_used_policy_drains_arenas(self)
+                Tests that the most used policy lets a lightly used arena empty and be released.
+
+            test_most_used_policy_lazy(self)
+                Tests that the most used policy drops stale entries when selecting an arena.
+
+            test_arena_policy_churn(self, name, policy)
+                Tests that on a churn workload an arena policy needs no more arenas than its peak pools fill.
+
+            test_arena_policy_callable(self)
+                Tests the MemoryManager with a custom arena policy.
+
+            test_arena_policy_invalid(self)
+                Tests the MemoryManager with an unknown arena policy.
 
             test_allocate_arena(self)
                 Tests the allocation of arenas.
@@ -63,11 +105,44 @@ CLASSES
                 Tests the allocation of memory for an object with the maximum block size.
 
             test_allocate_large_block_size(self)
-                Tests the allocation of memory for an object with a size that is too large.
+                Tests that an object larger than the maximum block size is allocated as a large object.
+
+            test_allocate_invalid_size(self, name, size)
+                Tests that allocating a size that is not positive raises an error and takes no pool.
 
             test_allocate_multiple_arenas(self)
                 Tests the allocation of memory that requires multiple arenas.
 
+            test_allocate_returns_block(self)
+                Tests that the allocation of memory returns the block holding the object.
+
+            test_allocate_many(self)
+                Tests the allocation of memory for several objects at once.
+
+            test_allocate_many_multiple_pools(self)
+                Tests the allocation of memory for more objects than fit in one pool.
+
+            test_allocate_many_same_layout(self)
+                Tests that a batch lays out blocks like single allocations, also when arenas fill up.
+
+            test_allocate_many_large_block_size(self)
+                Tests the allocation of memory for several objects when one is a large object.
+
+            test_deallocate_large_block(self)
+                Tests the deallocation of large objects, alone and in a batch.
+
+            test_allocate_measures_once(self)
+                Tests that each allocation measures the object exactly once.
+
+            test_allocate_many_measures_once(self)
+                Tests that allocating several objects measures each object exactly once.
+
+            test_usedpools_full_pool(self)
+                Tests that a full pool is removed from the usedpools index.
+
+            test_usedpools_deallocate(self)
+                Tests that the usedpools index follows pools as blocks are deallocated.
+
             test_deallocate_multiple_blocks_to_empty(self)
                 Tests the deallocation of multiple blocks to empty the manager.
 
@@ -83,6 +158,39 @@ CLASSES
             test_deallocate_from_full_arena(self)
                 Tests the deallocation of a block from a full arena.
 
+            test_deallocate_twice(self)
+                Tests the deallocation of a block that was already deallocated.
+
+            test_deallocate_not_a_block(self, name, tcache)
+                Tests that deallocating an object that is not a block returns False.
+
+            test_deallocate_back_pointers(self)
+                Tests that deallocation keeps the back-pointers of the remaining blocks correct.
+
+            test_deallocate_reuses_slot(self)
+                Tests that a block allocated after a deallocation reuses the freed slot.
+
+            test_free_many(self)
+                Tests the deallocation of several blocks at once.
+
+            test_tcache_hit(self)
+                Tests that a block freed into the thread cache is reused by the next allocation.
+
+            test_tcache_miss(self)
+                Tests that an allocation of another size class falls back to the shared pools.
+
+            test_tcache_flush_batch(self)
+                Tests that a full thread cache bin flushes half of its blocks to the shared pools.
+
+            test_tcache_double_free(self)
+                Tests the deallocation of a block that is already in the thread cache.
+
+            test_tcache_foreign_block(self)
+                Tests that a block not in its recorded slot is rejected instead of cached.
+
+            test_flush_tcache(self)
+                Tests that flushing the thread cache returns all its blocks to the shared pools.
+
             test_reuse_free_block(self)
                 Tests the reuse of a free block.
 
@@ -91,14 +199,94 @@ CLASSES
 
             test_reuse_free_arena(self)
                 Tests the reuse of a free arena.
+
+            test_metrics_empty(self)
+                Tests the metrics of a manager without blocks.
+
+            test_metrics(self)
+                Tests the block counts, bytes and fragmentation reported by the metrics.
+
+            test_metrics_occupancy(self)
+                Tests that the occupancy histogram follows pools as they fill up and empty.
+
+            test_metrics_large(self)
+                Tests that the totals of the metrics include the large objects.
+
+            test_metrics_free_lists(self)
+                Tests that the metrics count the free arenas, pools and blocks.
+
+            test_cache_limits(self)
+                Tests that capped free caches keep the most recently freed items after a spike.
+
+            test_cache_limits_max_age(self)
+                Tests that free caches with a maximum age are trimmed once their items expire.
+
+            test_cache_limits_invalid(self, name, limits)
+                Tests the MemoryManager with an unknown or invalid cache limit.
+
+            test_metrics_tcache(self)
+                Tests that reusing a cached block updates the requested bytes.
+
+            test_event_counts(self)
+                Tests that new, reused and released blocks, pools and arenas are counted.
+
+            test_hooks(self)
+                Tests that hooks are called with the block, pool or arena of their event.
+
+            test_remove_hook(self)
+                Tests that a removed hook is no longer called.
+
+            test_hook_invalid(self)
+                Tests hooking an unknown event and removing a hook that was never added.
+
+    TestConcurrentMemoryManager
+        Stress tests for the MemoryManager in concurrent mode.
+
+        Methods defined here:
+            setUpClass(cls)
+                Sets up an analyzer that logs no sizes, since the stress tests measure many objects.
+
+            setUp(self)
+                Sets up a concurrent MemoryManager and a short thread switch interval.
+
+            tearDown(self)
+                Restores the thread switch interval and resets the default instance.
+
+            check_invariants(self, live)
+                Checks that the arenas, pools and blocks of the manager are consistent, and match its metrics.
+
+            run_threads(self, work)
+                Runs work in several threads and fails on the first exception raised in one of them.
+
+            test_concurrent(self)
+                Tests that N threads x M random allocations and deallocations keep the manager consistent.
+
+            test_concurrent_batches(self)
+                Tests that concurrent batch allocations and deallocations keep the manager consistent.
+
+            test_concurrent_most_used(self)
+                Tests that concurrent allocations across many arenas keep the most used policy consistent.
+
+            test_concurrent_tcache(self)
+                Tests that concurrent allocations through thread caches keep the manager consistent.
+
+            test_concurrent_cache_limits(self)
+                Tests that concurrent allocations with bounded free caches keep the manager consistent.
 """
 
+import random
+import sys
+import threading
 import unittest
 from pympler import asizeof
 from parameterized import parameterized
 
-from manager import MemoryManager
+from manager import MemoryManager, OCCUPANCY_BUCKETS, EVENTS
 from memory import Arena, Pool, Block
+from large import PAGE_SIZE, LargeBlock
+from analyzer import MemoryAnalyzer
+from replay import replay
+from workload import churn, iter_events
 
 def get_types():
     """
@@ -114,7 +302,7 @@ def get_types():
         ("dict", {}),
         ("tuple", ()),
         ("set", set()),
-        ("custom_object", Block(8)) # Test with a custom object
+        ("custom_object", Block(8, asizeof.asizeof(8))) # Test with a custom object, measured without logging
     ]
 
 class TestMemoryManager(unittest.TestCase):
@@ -122,22 +310,236 @@ class TestMemoryManager(unittest.TestCase):
     Unit tests for the MemoryManager class.
     """
 
+    @classmethod
+    def setUpClass(cls):
+        """
+        Sets up an analyzer that logs no sizes, so allocations leave memory_log.txt untouched.
+        """
+        MemoryAnalyzer.reset(sample_rate=0)
+
     def setUp(self):
         """
         Sets up the test case environment.
         """
+        # Reset the default instance before each test
+        MemoryManager._instance = None
         self.manager = MemoryManager.get_instance()
-        self.manager.arenas = []  # Reset the singleton instance for each test
 
     def test_get_instance(self):
         """
-        Tests the singleton instance of the MemoryManager.
+        Tests the default instance of the MemoryManager.
         """
         self.manager = MemoryManager.get_instance()
         self.assertIsInstance(self.manager, MemoryManager)
         self.assertEqual(self.manager, MemoryManager._instance)
         self.assertEqual(self.manager, MemoryManager.get_instance())
 
+    @parameterized.expand([("shallow", 'shallow'), ("fast", 'fast'), ("deep", 'deep')])
+    def test_sizer(self, name, sizer):
+        """
+        Tests the allocation of memory with each sizing strategy.
+
+        Args:
+            name (str): The name of the sizing strategy.
+            sizer (str): The sizing strategy to test.
+        """
+        MemoryManager._instance = None
+        self.manager = MemoryManager(sizer=sizer)
+        obj = bytearray(150)
+        block = self.manager.allocate(obj)
+
+        self.assertEqual(block.block_size, MemoryAnalyzer.get_instance().measure_size(obj, sizer))
+        self.assertEqual(block.pool.block_size, Pool.size_class(block.block_size))
+
+    def test_sizer_invalid(self):
+        """
+        Tests the MemoryManager with an unknown sizing strategy.
+        """
+        MemoryManager._instance = None
+        with self.assertRaises(ValueError):
+            MemoryManager(sizer='unknown')
+
+    def test_independent_instances(self):
+        """
+        Tests that managers are independent heaps, apart from the default instance.
+        """
+        first = MemoryManager()
+        second = MemoryManager()
+        block = first.allocate(None, 64)
+
+        self.assertIsNot(first, self.manager)
+        self.assertIs(MemoryManager.get_instance(), self.manager)
+        self.assertEqual(len(first.arenas), 1)
+        self.assertEqual(second.arenas, [])
+        self.assertEqual(self.manager.arenas, [])
+        self.assertTrue(first.deallocate(block))
+
+    @parameterized.expand([("two_arenas", 0, (64, 128)), ("one_arena", 0, (64,)), ("tcache", 4, (64, 128))])
+    def test_deallocate_foreign_block(self, name, tcache, sizes):
+        """
+        Tests that a manager rejects a block of another manager and leaves both heaps intact.
+
+        Args:
+            name (str): The name of the case.
+            tcache (int): The thread cache size of the managers.
+            sizes (tuple): The sizes allocated by the second manager, each in an arena of its own.
+        """
+        first = MemoryManager(arena_size=4000, tcache=tcache)
+        second = MemoryManager(arena_size=4000, tcache=tcache)
+        block = first.allocate(None, 64)
+        for size in sizes:
+            second.allocate(None, size)
+        arenas = list(second.arenas)
+
+        self.assertFalse(second.deallocate(block))
+        self.assertEqual(second.free_many([block]), 0)
+        self.assertEqual(second.arenas, arenas)
+        self.assertEqual(len(second.free_pools), 0)
+        self.assertEqual(first.arenas, [block.pool.arena])
+        self.assertEqual(block.pool.arena.index, 0)
+        self.assertTrue(first.deallocate(block))
+
+    def test_geometry(self):
+        """
+        Tests the allocation of memory in a manager with its own geometry.
+        """
+        manager = MemoryManager(arena_size=4000, pool_size=2000, max_block_size=1024, alignment=16)
+        block = manager.allocate(None, 17)
+        pool = block.pool
+
+        self.assertEqual(pool.block_size, 32)
+        self.assertEqual(pool.maxsize, 2000)
+        self.assertEqual(pool.arena.maxsize, 4000)
+        self.assertEqual(manager.allocate(None, 1024).block_size, 1024)
+        self.assertIsInstance(manager.allocate(None, 1025), LargeBlock)
+
+        manager.allocate(None, 48)  # A third size class needs a second arena of two pools
+        self.assertEqual(len(manager.arenas), 2)
+        self.assertEqual(manager.metrics()['reserved'], 3 * 2000 + 4096)  # Three pools and one page
+        # The defaults are unchanged
+        self.assertEqual(self.manager.allocate(None, 17).pool.block_size, 24)
+
+    @parameterized.expand([
+        ("pool_exceeds_arena", {'arena_size': 4000, 'pool_size': 8000}),
+        ("block_exceeds_pool", {'pool_size': 1000, 'max_block_size': 1024}),
+        ("unaligned", {'alignment': 12}),
+        ("zero_alignment", {'alignment': 0}),
+        ("zero_block_size", {'max_block_size': 0}),
+    ])
+    def test_geometry_invalid(self, name, geometry):
+        """
+        Tests the MemoryManager with inconsistent geometries.
+
+        Args:
+            name (str): The name of the geometry.
+            geometry (dict): The geometry keyword arguments.
+        """
+        with self.assertRaises(ValueError):
+            MemoryManager(**geometry)
+
+    def make_two_arenas(self, policy):
+        """
+        Creates a manager with arenas of four pools, the first holding one pool and the second three.
+
+        Args:
+            policy (str): The arena policy of the manager.
+
+        Returns:
+            tuple: The manager, its two arenas, and the blocks held by their pools.
+        """
+        manager = MemoryManager(arena_size=4 * Pool.MAXSIZE, arena_policy=policy)
+        # Each size class gets its own pool, so the first four fill the first arena
+        blocks = [manager.allocate(None, size) for size in range(8, 64, 8)]
+        for block in blocks[1:4]:
+            manager.deallocate(block)
+        first, second = blocks[0].pool.arena, blocks[-1].pool.arena
+        return manager, first, second, [blocks[0]] + blocks[4:]
+
+    @parameterized.expand([("first_fit", 'first_fit', 0), ("most_used", 'most_used', 1)])
+    def test_arena_policy(self, name, policy, expected):
+        """
+        Tests which arena each arena policy places a new pool in.
+
+        Args:
+            name (str): The name of the policy.
+            policy (str): The arena policy.
+            expected (int): The position of the expected arena, 0 for the least used one.
+        """
+        manager, first, second, _ = self.make_two_arenas(policy)
+        self.assertEqual((len(first.pools), len(second.pools)), (1, 3))
+
+        block = manager.allocate(None, 64)
+        self.assertIs(block.pool.arena, (first, second)[expected])
+
+    def test_most_used_policy_drains_arenas(self):
+        """
+        Tests that the most used policy lets a lightly used arena empty and be released.
+        """
+        manager, first, second, blocks = self.make_two_arenas('most_used')
+        manager.allocate(None, 64)  # Fills the second arena
+        manager.deallocate(blocks[0])
+
+        self.assertEqual(manager.arenas, [second])
+        self.assertEqual(list(manager.free_arenas), [first])
+
+    def test_most_used_policy_lazy(self):
+        """
+        Tests that the most used policy drops stale entries when selecting an arena.
+        """
+        manager, first, second, blocks = self.make_two_arenas('most_used')
+        policy = manager.arena_policy
+        for block in blocks[1:]:
+            manager.deallocate(block)  # The second arena is released, its entries become stale
+
+        self.assertIs(policy.select(), first)
+        self.assertTrue(all(second not in arenas for arenas in policy.buckets.values()))
+        self.assertEqual(list(policy.buckets), [3])  # Only the bucket of the first arena is left
+
+    @parameterized.expand([("first_fit", 'first_fit'), ("most_used", 'most_used')])
+    def test_arena_policy_churn(self, name, policy):
+        """
+        Tests that on a churn workload an arena policy needs no more arenas than its peak pools fill.
+
+        Args:
+            name (str): The name of the policy.
+            policy (str): The arena policy.
+        """
+        manager = MemoryManager(arena_size=16 * Pool.MAXSIZE, arena_policy=policy)
+        report = replay(iter_events(churn(10000, seed=0, live=1000)), manager)
+
+        self.assertEqual(report['peak_arenas'], -(-report['peak_pools'] // 16))
+        # Skipping the pools of full arenas once took over 50 arenas and 800 pools here
+        self.assertLessEqual(report['peak_arenas'], 8)
+        self.assertLess(report['peak_pools'], 128)
+
+    def test_arena_policy_callable(self):
+        """
+        Tests the MemoryManager with a custom arena policy.
+        """
+        class NewArenaPolicy:
+            def __init__(self, manager):
+                self.updates = 0
+
+            def select(self):
+                return None
+
+            def update(self, arena):
+                self.updates += 1
+
+        manager = MemoryManager(arena_policy=NewArenaPolicy)
+        manager.allocate(None, 8)
+        manager.allocate(None, 16)
+
+        self.assertEqual(len(manager.arenas), 2)
+        self.assertEqual(manager.arena_policy.updates, 2)
+
+    def test_arena_policy_invalid(self):
+        """
+        Tests the MemoryManager with an unknown arena policy.
+        """
+        with self.assertRaises(ValueError):
+            MemoryManager(arena_policy='best_fit')
+
     def test_allocate_arena(self):
         """
         Tests the allocation of arenas.
@@ -305,20 +707,180 @@ class TestMemoryManager(unittest.TestCase):
 
     def test_allocate_large_block_size(self):
         """
-        Tests the allocation of memory for an object with a size that is too large.
+        Tests that an object larger than the maximum block size is allocated as a large object.
+        """
+        obj = "x" * 10000
+        block = self.manager.allocate(obj)
+
+        self.assertIsInstance(block, LargeBlock)
+        self.assertIs(block.obj, obj)
+        self.assertEqual(block.length, self.manager.large.extent_size(block.block_size))
+        self.assertEqual(self.manager.arenas, [])  # No pool is created
+        self.assertEqual(self.manager.metrics()['large']['blocks'], 1)
+
+    @parameterized.expand([("zero", 0), ("negative", -8)])
+    def test_allocate_invalid_size(self, name, size):
+        """
+        Tests that allocating a size that is not positive raises an error and takes no pool.
+
+        Args:
+            name (str): The name of the case.
+            size (int): The invalid size.
         """
+        self.manager.free_pools.append(self.manager._allocate_pool(8))
+        self.manager.usedpools.clear()
         with self.assertRaises(ValueError):
-            self.manager.allocate("x" * 10000)
+            self.manager.allocate(None, size)
+        with self.assertRaises(ValueError):
+            MemoryManager(sizer=lambda obj: size).allocate_many([b'x', b'y'])
+
+        self.assertEqual(len(self.manager.free_pools), 1)  # The free pool is not lost
+        self.assertEqual(self.manager.usedpools, {})
 
     def test_allocate_multiple_arenas(self):
         """
         Tests the allocation of memory that requires multiple arenas.
         """
-        self.manager.allocate(8)
+        first = self.manager.allocate(8)
         self.manager.arenas[0].bytes = 256000
+        second = self.manager.allocate(8)
+        self.manager.allocate(b'x' * 100)
+
+        self.assertIs(second.pool, first.pool)  # The pool still has room, however full its arena is
+        self.assertEqual(len(self.manager.arenas), 2)  # New arena created for the new pool
+
+    def test_allocate_returns_block(self):
+        """
+        Tests that the allocation of memory returns the block holding the object.
+        """
+        block1 = self.manager.allocate(8)
+        block2 = self.manager.allocate("object")
+
+        self.assertIs(block1, self.manager.arenas[0].pools[0].blocks[0])
+        self.assertEqual(block2.obj, "object")
+        self.assertTrue(self.manager.deallocate(block1))
+
+    def test_allocate_many(self):
+        """
+        Tests the allocation of memory for several objects at once.
+        """
+        objs = [8, "object", 16, "other"]
+        blocks = self.manager.allocate_many(objs)
+
+        self.assertEqual([block.obj for block in blocks], objs)
+        self.assertEqual(len(self.manager.arenas), 1)
+        self.assertEqual(len(self.manager.arenas[0].pools), 2)  # One pool per size class
+        for block in blocks:
+            self.assertTrue(block.pool.check_block(block))
+
+    def test_allocate_many_multiple_pools(self):
+        """
+        Tests the allocation of memory for more objects than fit in one pool.
+        """
+        size = asizeof.asizeof(8)
+        blocks = self.manager.allocate_many([8] * (Pool.MAXSIZE // size + 1))
+
+        self.assertEqual(len(self.manager.arenas[0].pools), 2)
+        self.assertEqual(len(self.manager.arenas[0].pools[0].blocks), Pool.MAXSIZE // size)
+        self.assertEqual(self.manager.arenas[0].pools[1].blocks, [blocks[-1]])
+
+    def test_allocate_many_same_layout(self):
+        """
+        Tests that a batch lays out blocks like single allocations, also when arenas fill up.
+        """
+        rng = random.Random(3)
+        # Grouped by size class, in the order the batch allocates them
+        objs = sorted((b"x" * rng.choice((8, 24, 200, 512)) for _ in range(2000)), key=len)
+        single = MemoryManager(sizer=len, arena_size=2 * Pool.MAXSIZE)
+        batch = MemoryManager(sizer=len, arena_size=2 * Pool.MAXSIZE)
+
+        def layout(blocks):
+            return [(block.pool.arena.index, block.pool.index, block.slot) for block in blocks]
+
+        self.assertEqual(layout(batch.allocate_many(objs)), layout([single.allocate(obj) for obj in objs]))
+        self.assertEqual(len(batch.arenas), len(single.arenas))
+
+    def test_allocate_many_large_block_size(self):
+        """
+        Tests the allocation of memory for several objects when one is a large object.
+        """
+        blocks = self.manager.allocate_many([8, "x" * 10000])
+
+        self.assertIsInstance(blocks[0], Block)
+        self.assertIsInstance(blocks[1], LargeBlock)
+        self.assertEqual([block.obj for block in blocks], [8, "x" * 10000])
+        self.assertEqual(self.manager.pool_count, 1)
+
+    def test_deallocate_large_block(self):
+        """
+        Tests the deallocation of large objects, alone and in a batch.
+        """
+        blocks = [self.manager.allocate(None, 5000) for _ in range(3)] + [self.manager.allocate(None, 8)]
+
+        self.assertTrue(self.manager.deallocate(blocks[0]))
+        self.assertFalse(self.manager.deallocate(blocks[0]))  # Already freed
+        self.assertEqual(self.manager.free_many(blocks), 3)
+        self.assertEqual(self.manager.metrics()['large']['blocks'], 0)
+        self.assertEqual(self.manager.large.top, 0)  # Every extent is unmapped
+        self.assertEqual(self.manager.pool_count, 0)
+
+    def test_allocate_measures_once(self):
+        """
+        Tests that each allocation measures the object exactly once.
+        """
+        analyzer = MemoryAnalyzer.get_instance()
+        measurements = analyzer.measurements
+        block = self.manager.allocate(8)  # Slow path, a pool is created
+        self.assertEqual(analyzer.measurements, measurements + 1)
+
+        self.manager.allocate(16)  # Fast path, the pool is found
+        self.assertEqual(analyzer.measurements, measurements + 2)
+
+        self.manager.deallocate(block)
+        self.manager.allocate("object")  # The free block is reused
+        self.assertEqual(analyzer.measurements, measurements + 3)
+
+    def test_allocate_many_measures_once(self):
+        """
+        Tests that allocating several objects measures each object exactly once.
+        """
+        analyzer = MemoryAnalyzer.get_instance()
+        measurements = analyzer.measurements
+        self.manager.allocate_many([8, "object", 16])
+
+        self.assertEqual(analyzer.measurements, measurements + 3)
+
+    def test_usedpools_full_pool(self):
+        """
+        Tests that a full pool is removed from the usedpools index.
+        """
+        size = asizeof.asizeof(8)
+        for _ in range(Pool.MAXSIZE // size):
+            self.manager.allocate(8)
+        pool = self.manager.arenas[0].pools[0]
+
+        self.assertFalse(pool.check_pool(size))
+        self.assertNotIn(pool, self.manager.usedpools[size])  # Full pool has no room
         self.manager.allocate(8)
+        self.assertEqual(len(self.manager.arenas[0].pools), 2)  # A second pool is created
+        self.assertIn(self.manager.arenas[0].pools[1], self.manager.usedpools[size])
 
-        self.assertEqual(len(self.manager.arenas), 2)  # New arena created for the third allocation
+    def test_usedpools_deallocate(self):
+        """
+        Tests that the usedpools index follows pools as blocks are deallocated.
+        """
+        size = asizeof.asizeof(8)
+        for _ in range(Pool.MAXSIZE // size):
+            self.manager.allocate(8)
+        pool = self.manager.arenas[0].pools[0]
+        blocks = list(pool.blocks)
+        self.manager.deallocate(blocks[0])
+
+        self.assertIn(pool, self.manager.usedpools[size])  # Pool has room again
+        for block in blocks[1:]:
+            self.manager.deallocate(block)
+        self.assertNotIn(pool, self.manager.usedpools[size])  # Empty pool is released
+        self.assertEqual(list(self.manager.free_pools), [pool])
 
     def test_deallocate_multiple_blocks_to_empty(self):
         """
@@ -385,6 +947,172 @@ class TestMemoryManager(unittest.TestCase):
         self.assertEqual(len(self.manager.free_pools), 1)  # Pool is saved for reuse
         self.assertEqual(len(self.manager.arenas), 1)  # Arena is not removed
 
+    def test_deallocate_twice(self):
+        """
+        Tests the deallocation of a block that was already deallocated.
+        """
+        self.manager.allocate(8)
+        self.manager.allocate(16)
+        block = self.manager.arenas[0].pools[0].blocks[0]
+
+        self.assertTrue(self.manager.deallocate(block))
+        self.assertFalse(self.manager.deallocate(block))  # Second deallocation should fail
+        self.assertEqual(len(self.manager.arenas[0].pools[0].blocks), 1)
+
+    @parameterized.expand([("shared", 0), ("tcache", 4)])
+    def test_deallocate_not_a_block(self, name, tcache):
+        """
+        Tests that deallocating an object that is not a block returns False.
+
+        Args:
+            name (str): The name of the case.
+            tcache (int): The thread cache size of the manager.
+        """
+        manager = MemoryManager(tcache=tcache)
+        manager.allocate(None, 8)
+
+        self.assertFalse(manager.deallocate(None))
+        self.assertFalse(manager.deallocate(object()))
+        self.assertEqual(manager.free_many([None, object()]), 0)
+        self.assertEqual(len(manager.arenas[0].pools[0].blocks), 1)
+
+    def test_deallocate_back_pointers(self):
+        """
+        Tests that deallocation keeps the back-pointers of the remaining blocks correct.
+        """
+        for obj in range(3):
+            self.manager.allocate(obj)
+        pool = self.manager.arenas[0].pools[0]
+        block1, block2, block3 = pool.blocks
+        self.manager.deallocate(block1)
+
+        self.assertIsNone(block1.pool)
+        self.assertIsNone(block1.slot)
+        self.assertEqual(pool.blocks, [block2, block3])
+        for block in pool.blocks:
+            self.assertIs(block.pool, pool)
+            self.assertIs(pool.slots[block.slot], block)
+        self.assertEqual(pool.offsets(), [pool.block_size, 2 * pool.block_size])  # Blocks do not move
+        self.assertTrue(self.manager.deallocate(block3))
+        self.assertTrue(self.manager.deallocate(block2))
+        self.assertEqual(len(self.manager.arenas), 0)  # Manager is empty
+
+    def test_deallocate_reuses_slot(self):
+        """
+        Tests that a block allocated after a deallocation reuses the freed slot.
+        """
+        for obj in range(3):
+            self.manager.allocate(obj)
+        pool = self.manager.arenas[0].pools[0]
+        block = pool.blocks[1]
+        self.manager.deallocate(block)
+        self.assertEqual(pool.free_offsets()[0], pool.block_size)
+
+        new_block = self.manager.allocate(3)
+        self.assertIs(new_block.pool, pool)
+        self.assertEqual(new_block.slot, 1)
+        self.assertEqual(len(pool.slots), 3)  # The pool did not grow
+
+    def test_free_many(self):
+        """
+        Tests the deallocation of several blocks at once.
+        """
+        blocks = self.manager.allocate_many([8, "object", 16])
+        freed = self.manager.free_many(blocks + [Block(32)])
+
+        self.assertEqual(freed, 3)  # The unallocated block is not counted
+        self.assertEqual(len(self.manager.free_blocks), 3)
+        self.assertEqual(len(self.manager.arenas), 0)  # Manager is empty
+
+    def test_tcache_hit(self):
+        """
+        Tests that a block freed into the thread cache is reused by the next allocation.
+        """
+        MemoryManager._instance = None
+        self.manager = MemoryManager(tcache=4)
+        block1 = self.manager.allocate("object 1")
+        pool = block1.pool
+        self.assertTrue(self.manager.deallocate(block1))
+
+        self.assertIs(block1.pool, pool)  # The block is still held by its pool
+        self.assertEqual(list(self.manager.free_blocks), [])
+        block2 = self.manager.allocate("object 2")
+        self.assertIs(block1, block2)
+        self.assertEqual(block2.obj, "object 2")
+        self.assertEqual(self.manager.tcache_stats(), {'hits': 1, 'misses': 1, 'flushes': 0, 'cached': 0})
+
+    def test_tcache_miss(self):
+        """
+        Tests that an allocation of another size class falls back to the shared pools.
+        """
+        MemoryManager._instance = None
+        self.manager = MemoryManager(tcache=4)
+        block1 = self.manager.allocate(8)
+        self.manager.deallocate(block1)
+        block2 = self.manager.allocate("x" * 100)
+
+        self.assertIsNot(block1, block2)
+        self.assertEqual(self.manager.tcache_stats(), {'hits': 0, 'misses': 2, 'flushes': 0, 'cached': 1})
+
+    def test_tcache_flush_batch(self):
+        """
+        Tests that a full thread cache bin flushes half of its blocks to the shared pools.
+        """
+        MemoryManager._instance = None
+        self.manager = MemoryManager(tcache=4)
+        blocks = [self.manager.allocate(8) for _ in range(5)]
+        for block in blocks:
+            self.assertTrue(self.manager.deallocate(block))
+
+        self.assertEqual(list(self.manager.free_blocks), blocks[:2])  # The oldest half is flushed
+        self.assertIsNone(blocks[0].pool)
+        self.assertEqual(len(self.manager.arenas[0].pools[0].blocks), 3)
+        self.assertEqual(self.manager.tcache_stats()['flushes'], 1)
+        self.assertEqual(self.manager.tcache_stats()['cached'], 3)
+
+    def test_tcache_double_free(self):
+        """
+        Tests the deallocation of a block that is already in the thread cache.
+        """
+        MemoryManager._instance = None
+        self.manager = MemoryManager(tcache=4)
+        block = self.manager.allocate(8)
+
+        self.assertTrue(self.manager.deallocate(block))
+        self.assertFalse(self.manager.deallocate(block))
+        self.assertEqual(self.manager.free_many([block]), 0)
+        self.assertFalse(self.manager.deallocate(Block(16)))
+
+    def test_tcache_foreign_block(self):
+        """
+        Tests that a block not in its recorded slot is rejected instead of cached.
+        """
+        MemoryManager._instance = None
+        self.manager = MemoryManager(tcache=4)
+        block = self.manager.allocate(None, 16)
+        foreign = Block(None, 16)
+        foreign.pool, foreign.slot = block.pool, block.slot  # Claims the slot of a live block
+
+        self.assertFalse(self.manager.deallocate(foreign))
+        self.assertNotIn(foreign, self.manager.cached)
+        self.assertIsNot(self.manager.allocate(None, 16), foreign)
+        self.assertEqual(self.manager.tcache_stats()['cached'], 0)
+
+    def test_flush_tcache(self):
+        """
+        Tests that flushing the thread cache returns all its blocks to the shared pools.
+        """
+        MemoryManager._instance = None
+        self.manager = MemoryManager(tcache=4)
+        blocks = [self.manager.allocate(obj) for obj in (8, 16, "object")]
+        for block in blocks:
+            self.manager.deallocate(block)
+
+        self.assertEqual(self.manager.flush_tcache(), 3)
+        self.assertEqual(self.manager.arenas, [])  # Manager is empty
+        self.assertEqual(self.manager.tcache_stats()['cached'], 0)
+        self.assertEqual(self.manager.flush_tcache(), 0)
+
     def test_reuse_free_block(self):
         """
         Tests the reuse of a free block.
@@ -423,6 +1151,441 @@ class TestMemoryManager(unittest.TestCase):
 
         self.assertIs(arena1, arena2) # The same arena is reused
 
+    def test_metrics_empty(self):
+        """
+        Tests the metrics of a manager without blocks.
+        """
+        metrics = self.manager.metrics()
+
+        self.assertEqual(metrics['arenas'], 0)
+        self.assertEqual(metrics['blocks'], 0)
+        self.assertEqual(metrics['reserved'], 0)
+        self.assertEqual(metrics['internal_fragmentation'], 0.0)
+        self.assertEqual(metrics['external_fragmentation'], 0.0)
+        self.assertEqual(metrics['occupancy'], [0] * OCCUPANCY_BUCKETS)
+        self.assertEqual(metrics['classes'], {})
+
+    def test_metrics(self):
+        """
+        Tests the block counts, bytes and fragmentation reported by the metrics.
+        """
+        self.manager.allocate(None, 100)
+        self.manager.allocate(None, 100)
+        block = self.manager.allocate(None, 16)
+        metrics = self.manager.metrics()
+
+        self.assertEqual(metrics['arenas'], 1)
+        self.assertEqual(metrics['pools'], 2)
+        self.assertEqual(metrics['blocks'], 3)
+        self.assertEqual(metrics['reserved'], 2 * Pool.MAXSIZE)
+        self.assertEqual(metrics['used'], 2 * 104 + 16)
+        self.assertEqual(metrics['requested'], 216)
+        self.assertAlmostEqual(metrics['internal_fragmentation'], 8 / (2 * Pool.MAXSIZE))
+        self.assertAlmostEqual(metrics['external_fragmentation'], (2 * Pool.MAXSIZE - 224) / (2 * Pool.MAXSIZE))
+        self.assertEqual(metrics['classes'][104], {
+            'blocks': 2,
+            'pools': 1,
+            'reserved': Pool.MAXSIZE,
+            'used': 208,
+            'requested': 200,
+            'internal_fragmentation': 8 / Pool.MAXSIZE,
+            'external_fragmentation': (Pool.MAXSIZE - 208) / Pool.MAXSIZE,
+        })
+
+        self.manager.deallocate(block)
+        metrics = self.manager.metrics()
+        self.assertEqual(metrics['pools'], 1)
+        self.assertEqual(metrics['classes'][16]['blocks'], 0)
+        self.assertEqual(metrics['classes'][16]['pools'], 0)
+        self.assertEqual(metrics['requested'], 200)
+
+    def test_metrics_occupancy(self):
+        """
+        Tests that the occupancy histogram follows pools as they fill up and empty.
+        """
+        blocks = [self.manager.allocate(None, 400) for _ in range(Pool.MAXSIZE // 400)]
+        self.assertEqual(self.manager.metrics()['occupancy'], [0] * (OCCUPANCY_BUCKETS - 1) + [1])  # Full
+
+        for block in blocks[:6]:
+            self.manager.deallocate(block)
+        occupancy = self.manager.metrics()['occupancy']
+        self.assertEqual(occupancy[4], 1)  # 1600 of 4000 bytes in use
+        self.assertEqual(sum(occupancy), 1)
+
+        for block in blocks[6:]:
+            self.manager.deallocate(block)
+        self.assertEqual(self.manager.metrics()['occupancy'], [0] * OCCUPANCY_BUCKETS)
+
+    def test_metrics_large(self):
+        """
+        Tests that the totals of the metrics include the large objects.
+        """
+        self.manager.allocate(None, 100)
+        large = [self.manager.allocate(None, size) for size in (5000, 1000)]
+        self.manager.deallocate(large[0])
+        metrics = self.manager.metrics()
+
+        self.assertEqual(metrics['blocks'], 2)
+        self.assertEqual(metrics['requested'], 1100)
+        self.assertEqual(metrics['used'], 104 + PAGE_SIZE)
+        # The freed extent below the live one stays mapped and counts as external fragmentation
+        self.assertEqual(metrics['reserved'], Pool.MAXSIZE + 3 * PAGE_SIZE)
+        self.assertAlmostEqual(metrics['external_fragmentation'],
+                               (Pool.MAXSIZE + 3 * PAGE_SIZE - 104 - PAGE_SIZE) / (Pool.MAXSIZE + 3 * PAGE_SIZE))
+        self.assertEqual(metrics['classes'][104]['requested'], 100)
+
+    def test_metrics_free_lists(self):
+        """
+        Tests that the metrics count the free arenas, pools and blocks.
+        """
+        block = self.manager.allocate(None, 8)
+        self.manager.deallocate(block)
+        metrics = self.manager.metrics()
+
+        self.assertEqual(metrics['arenas'], 0)
+        self.assertEqual(metrics['pools'], 0)
+        self.assertEqual(metrics['free_arenas'], 1)
+        self.assertEqual(metrics['free_pools'], 1)
+        self.assertEqual(metrics['free_blocks'], 1)
+        self.assertEqual(metrics['free_caches']['arenas'], {'retained': 1, 'released': 0})
+
+    def test_cache_limits(self):
+        """
+        Tests that capped free caches keep the most recently freed items after a spike.
+        """
+        manager = MemoryManager(arena_size=2 * Pool.MAXSIZE,
+                                cache_limits={'blocks': {'cap': 4}, 'pools': {'cap': 2}, 'arenas': {'cap': 1}})
+        # Each size class gets its own pool, so the spike spreads over three arenas of two pools
+        blocks = [manager.allocate(None, size) for size in range(8, 56, 8)]
+        pools = [block.pool for block in blocks]
+        arenas = [pool.arena for pool in pools[::2]]
+        for block in blocks:
+            manager.deallocate(block)
+
+        self.assertEqual(list(manager.free_arenas), arenas[-1:])
+        self.assertEqual(list(manager.free_pools), pools[-2:])
+        self.assertEqual(list(manager.free_blocks), blocks[-4:])
+        self.assertEqual(manager.metrics()['free_caches'], {
+            'blocks': {'retained': 4, 'released': 2},
+            'pools': {'retained': 2, 'released': 4},
+            'arenas': {'retained': 1, 'released': 2},
+        })
+        # The retained items are still reused
+        manager.allocate(None, 8)
+        self.assertEqual(manager.event_counts()['arena_reuse'], 1)
+
+    def test_cache_limits_max_age(self):
+        """
+        Tests that free caches with a maximum age are trimmed once their items expire.
+        """
+        manager = MemoryManager(cache_limits={kind: {'max_age': 60} for kind in ('blocks', 'pools', 'arenas')})
+        block = manager.allocate(None, 8)
+        manager.deallocate(block)
+        self.assertEqual(manager.trim_caches(), 0)
+
+        for cache in (manager.free_blocks, manager.free_pools, manager.free_arenas):
+            cache.clock = lambda: float('inf')
+        self.assertEqual(manager.trim_caches(), 3)
+        metrics = manager.metrics()
+        self.assertEqual((metrics['free_arenas'], metrics['free_pools'], metrics['free_blocks']), (0, 0, 0))
+        self.assertEqual(metrics['free_caches']['pools'], {'retained': 0, 'released': 1})
+
+    @parameterized.expand([
+        ("unknown_kind", {'slabs': {'cap': 1}}),
+        ("negative_cap", {'pools': {'cap': -1}}),
+        ("zero_max_age", {'arenas': {'max_age': 0}}),
+    ])
+    def test_cache_limits_invalid(self, name, limits):
+        """
+        Tests the MemoryManager with an unknown or invalid cache limit.
+
+        Args:
+            name (str): The name of the case.
+            limits (dict): The cache limits of the manager.
+        """
+        with self.assertRaises(ValueError):
+            MemoryManager(cache_limits=limits)
+
+    def test_metrics_tcache(self):
+        """
+        Tests that reusing a cached block updates the requested bytes.
+        """
+        MemoryManager._instance = None
+        self.manager = MemoryManager(tcache=4)
+        block = self.manager.allocate(None, 10)
+        self.manager.deallocate(block)
+        self.manager.allocate(None, 14)  # Same size class, served from the cache
+        metrics = self.manager.metrics()
+
+        self.assertEqual(metrics['blocks'], 1)
+        self.assertEqual(metrics['requested'], 14)
+        self.manager.flush_tcache()
+        self.assertEqual(self.manager.metrics()['requested'], 14)
+
+    def test_event_counts(self):
+        """
+        Tests that new, reused and released blocks, pools and arenas are counted.
+        """
+        self.assertEqual(self.manager.event_counts(), dict.fromkeys(EVENTS, 0))
+        block = self.manager.allocate(None, 8)
+        self.manager.deallocate(block)
+        self.manager.allocate(None, 8)
+
+        self.assertEqual(self.manager.event_counts(), {
+            'block_reuse': 1,
+            'pool_new': 1,
+            'pool_reuse': 1,
+            'pool_release': 1,
+            'arena_new': 1,
+            'arena_reuse': 1,
+            'arena_release': 1,
+        })
+
+    def test_hooks(self):
+        """
+        Tests that hooks are called with the block, pool or arena of their event.
+        """
+        calls = []
+        for event in EVENTS:
+            self.manager.add_hook(event, lambda item, event=event: calls.append((event, item)))
+        block = self.manager.allocate(None, 8)
+        pool = block.pool
+        arena = pool.arena
+        self.manager.deallocate(block)
+        reused = self.manager.allocate(None, 8)
+
+        self.assertEqual(calls, [
+            ('arena_new', arena),
+            ('pool_new', pool),
+            ('pool_release', pool),
+            ('arena_release', arena),
+            ('arena_reuse', arena),
+            ('pool_reuse', pool),
+            ('block_reuse', reused),
+        ])
+
+    def test_remove_hook(self):
+        """
+        Tests that a removed hook is no longer called.
+        """
+        calls = []
+        self.manager.add_hook('pool_new', calls.append)
+        self.manager.add_hook('pool_new', calls.append)
+        self.manager.remove_hook('pool_new', calls.append)
+        self.manager.allocate(None, 8)
+        self.assertEqual(len(calls), 1)  # Only one of the two registrations is removed
+
+        self.manager.remove_hook('pool_new', calls.append)
+        self.assertEqual(self.manager._hooks, {})
+        self.manager.allocate(None, 16)
+        self.assertEqual(len(calls), 1)
+
+    def test_hook_invalid(self):
+        """
+        Tests hooking an unknown event and removing a hook that was never added.
+        """
+        with self.assertRaises(ValueError):
+            self.manager.add_hook('block_new', print)
+        with self.assertRaises(ValueError):
+            self.manager.remove_hook('pool_new', print)
+
+
+
+class TestConcurrentMemoryManager(unittest.TestCase):
+    """
+    Stress tests for the MemoryManager in concurrent mode.
+    """
+    THREADS = 8
+    OPS = 10000
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Sets up an analyzer that logs no sizes, since the stress tests measure many objects.
+        """
+        MemoryAnalyzer.reset(sample_rate=0)
+
+    def setUp(self):
+        """
+        Sets up a concurrent MemoryManager and a short thread switch interval.
+        """
+        MemoryManager._instance = None
+        self.manager = MemoryManager(sizer='fast', concurrent=True)
+        # Switch threads often, so races have a chance to show up
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        """
+        Restores the thread switch interval and resets the default instance.
+        """
+        sys.setswitchinterval(self.switch_interval)
+        MemoryManager._instance = None
+
+    def check_invariants(self, live):
+        """
+        Checks that the arenas, pools and blocks of the manager are consistent, and match its metrics.
+
+        Args:
+            live (list): The blocks that are still allocated.
+        """
+        blocks = set()
+        classes = {}
+        for index, arena in enumerate(self.manager.arenas):
+            self.assertEqual(arena.index, index)
+            self.assertEqual(arena.bytes, len(arena.pools) * Pool.MAXSIZE)
+            for pool_index, pool in enumerate(arena.pools):
+                self.assertIs(pool.arena, arena)
+                self.assertEqual(pool.index, pool_index)
+                self.assertEqual(pool.bytes, len(pool.blocks) * pool.block_size)
+                self.assertGreater(pool.bytes, 0)
+                self.assertEqual(len(pool.slots), len(pool.blocks) + len(pool.freeslots))
+                counts = classes.setdefault(pool.block_size, [0, 0])
+                counts[0] += 1
+                counts[1] += len(pool.blocks)
+                for block in pool.blocks:
+                    self.assertIs(block.pool, pool)
+                    self.assertIs(pool.slots[block.slot], block)
+                    self.assertEqual(Pool.size_class(block.block_size), pool.block_size)
+                    blocks.add(block)
+
+        self.assertEqual(blocks, set(live))
+        self.assertTrue(blocks.isdisjoint(self.manager.free_blocks))
+        for pool in self.manager.free_pools:
+            self.assertIsNone(pool.arena)
+        for arena in self.manager.free_arenas:
+            self.assertEqual(arena.bytes, 0)
+
+        metrics = self.manager.metrics()
+        self.assertEqual(metrics['pools'], sum(pools for pools, _ in classes.values()))
+        self.assertEqual(metrics['blocks'], len(blocks))
+        self.assertEqual(metrics['requested'], sum(block.block_size for block in blocks))
+        self.assertEqual(sum(metrics['occupancy']), metrics['pools'])
+        counts = self.manager.event_counts()
+        self.assertEqual(counts['pool_new'] + counts['pool_reuse'] - counts['pool_release'], metrics['pools'])
+        self.assertEqual(counts['arena_new'] + counts['arena_reuse'] - counts['arena_release'], metrics['arenas'])
+        # Every pool created is in use, kept in the free cache, or released by it
+        released = metrics['free_caches']['pools']['released']
+        self.assertEqual(counts['pool_new'], metrics['pools'] + metrics['free_pools'] + released)
+        for size_class, stats in metrics['classes'].items():
+            self.assertEqual([stats['pools'], stats['blocks']], classes.get(size_class, [0, 0]))
+
+    def run_threads(self, work):
+        """
+        Runs work in several threads and fails on the first exception raised in one of them.
+
+        Args:
+            work (callable): The function run by each thread, called with the thread number.
+        """
+        errors = []
+
+        def run(seed):
+            try:
+                work(seed)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=run, args=(seed,)) for seed in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    def test_concurrent(self):
+        """
+        Tests that N threads x M random allocations and deallocations keep the manager consistent.
+        """
+        live = [[] for _ in range(self.THREADS)]
+
+        def work(seed):
+            rng = random.Random(seed)
+            blocks = live[seed]
+            for _ in range(self.OPS):
+                if blocks and rng.random() < 0.45:
+                    block = blocks.pop(rng.randrange(len(blocks)))
+                    self.assertTrue(self.manager.deallocate(block))
+                else:
+                    blocks.append(self.manager.allocate(bytearray(rng.randint(1, 400))))
+
+        self.run_threads(work)
+
+        self.check_invariants([block for blocks in live for block in blocks])
+        for blocks in live:
+            for block in blocks:
+                self.assertTrue(self.manager.deallocate(block))
+        self.check_invariants([])
+        self.assertEqual(self.manager.arenas, [])
+
+    def test_concurrent_batches(self):
+        """
+        Tests that concurrent batch allocations and deallocations keep the manager consistent.
+        """
+        live = [[] for _ in range(self.THREADS)]
+
+        def work(seed):
+            rng = random.Random(seed)
+            for _ in range(self.OPS // 50):
+                blocks = self.manager.allocate_many(
+                    [bytearray(rng.randint(1, 400)) for _ in range(rng.randint(1, 100))]
+                )
+                freed = blocks[:len(blocks) // 2]
+                self.assertEqual(self.manager.free_many(freed), len(freed))
+                live[seed].extend(blocks[len(blocks) // 2:])
+
+        self.run_threads(work)
+
+        self.check_invariants([block for blocks in live for block in blocks])
+
+    def test_concurrent_most_used(self):
+        """
+        Tests that concurrent allocations across many arenas keep the most used policy consistent.
+        """
+        MemoryManager._instance = None
+        self.manager = MemoryManager(sizer='fast', concurrent=True, arena_size=4 * Pool.MAXSIZE,
+                                     arena_policy='most_used')
+        self.test_concurrent()
+
+    def test_concurrent_cache_limits(self):
+        """
+        Tests that concurrent allocations with bounded free caches keep the manager consistent.
+        """
+        MemoryManager._instance = None
+        self.manager = MemoryManager(sizer='fast', concurrent=True, arena_size=4 * Pool.MAXSIZE,
+                                     cache_limits={'blocks': {'cap': 16}, 'pools': {'cap': 2}, 'arenas': {'cap': 1}})
+        self.test_concurrent()
+        self.assertLessEqual(len(self.manager.free_arenas), 1)
+
+    def test_concurrent_tcache(self):
+        """
+        Tests that concurrent allocations through thread caches keep the manager consistent.
+        """
+        MemoryManager._instance = None
+        self.manager = MemoryManager(sizer='fast', concurrent=True, tcache=8)
+        live = [[] for _ in range(self.THREADS)]
+        allocations = [0] * self.THREADS
+
+        def work(seed):
+            rng = random.Random(seed)
+            blocks = live[seed]
+            for _ in range(self.OPS):
+                if blocks and rng.random() < 0.45:
+                    block = blocks.pop(rng.randrange(len(blocks)))
+                    self.assertTrue(self.manager.deallocate(block))
+                else:
+                    blocks.append(self.manager.allocate(bytearray(rng.randint(1, 400))))
+                    allocations[seed] += 1
+            self.manager.flush_tcache()
+
+        self.run_threads(work)
+
+        self.check_invariants([block for blocks in live for block in blocks])
+        stats = self.manager.tcache_stats()
+        self.assertEqual(stats['cached'], 0)
+        self.assertGreater(stats['hits'], 0)
+        self.assertEqual(stats['hits'] + stats['misses'], sum(allocations))
+
 
 if __name__ == '__main__':
     unittest.main()
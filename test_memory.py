@@ -26,6 +26,9 @@ CLASSES
             test_check_arena_invalid_pool_size_type(self, name, invalid_type)
                 Tests the check_arena method with invalid pool size types.
 
+            test_check_arena_geometry(self)
+                Tests the check_arena method for an arena with its own size and pool size.
+
     TestPool
         Unit tests for the Pool class.
 
@@ -51,10 +54,40 @@ CLASSES
             test_check_pool_full(self)
                 Tests the check_pool method when the pool is full.
 
+            test_take_slot(self)
+                Tests that take_slot hands out consecutive slots in an empty pool.
+
+            test_release_slot(self)
+                Tests that release_slot frees a slot and take_slot reuses it first.
+
+            test_check_block(self)
+                Tests the check_block method for blocks inside and outside the pool.
+
+            test_offsets(self)
+                Tests the offsets and free_offsets methods.
+
+            test_reset(self)
+                Tests that reset clears the slots and changes the block size.
+
+            test_size_class(self)
+                Tests the size_class method.
+
+            test_size_class_invalid_type(self, name, invalid_type)
+                Tests the size_class method with invalid size types.
+
+            test_pool_maxsize(self)
+                Tests the check_pool and free_offsets methods for a pool with its own maximum size.
+
+            test_size_class_alignment(self)
+                Tests the size_class method with a given alignment.
+
     TestBlock
         Unit tests for the Block class.
 
         Methods defined here:
+            setUpClass(cls)
+                Sets up an analyzer that logs no sizes for the measured blocks.
+
             test_block_types(self, name, obj_type)
                 Tests the Block class with various object types.
 
@@ -63,6 +96,9 @@ CLASSES
 
             test_block_size_too_large(self)
                 Tests the Block class with an object size that is too large.
+
+            test_block_maxsize(self)
+                Tests the Block class with a given maximum size.
 """
 
 import unittest
@@ -70,6 +106,7 @@ from pympler import asizeof
 from parameterized import parameterized
 
 from memory import Arena, Pool, Block
+from analyzer import MemoryAnalyzer
 
 def get_invalid_types():
     """
@@ -85,7 +122,7 @@ def get_invalid_types():
         ("dict", {}),
         ("tuple", ()),
         ("set", set()),
-        ("custom_object", Block(8)) # Test with a custom object
+        ("custom_object", Block(8, asizeof.asizeof(8))) # Test with a custom object, measured without logging
     ]
 
 
@@ -139,6 +176,19 @@ class TestArena(unittest.TestCase):
         with self.assertRaises(TypeError):
             a.check_arena(invalid_type)
 
+    def test_check_arena_geometry(self):
+        """
+        Tests the check_arena method for an arena with its own size and pool size.
+        """
+        a = Arena(maxsize=16000, pool_size=8000)
+        self.assertTrue(a.check_arena(8000))
+        self.assertFalse(a.check_arena(4000))  # Not the pool size of the arena
+
+        a.bytes = 8000
+        self.assertTrue(a.check_arena(8000))
+        a.bytes = 16000
+        self.assertFalse(a.check_arena(8000))
+
 
 class TestPool(unittest.TestCase):
     """
@@ -205,12 +255,129 @@ class TestPool(unittest.TestCase):
         p.bytes = 4000
         self.assertFalse(p.check_pool(8))
 
+    def test_take_slot(self):
+        """
+        Tests that take_slot hands out consecutive slots in an empty pool.
+        """
+        p = Pool(8)
+        blocks = [Block(obj, 8) for obj in range(3)]
+        self.assertEqual([p.take_slot(block) for block in blocks], [0, 1, 2])
+        self.assertEqual([block.slot for block in blocks], [0, 1, 2])
+        self.assertEqual(p.blocks, blocks)
+
+    def test_release_slot(self):
+        """
+        Tests that release_slot frees a slot and take_slot reuses it first.
+        """
+        p = Pool(8)
+        blocks = [Block(obj, 8) for obj in range(3)]
+        for block in blocks:
+            p.take_slot(block)
+        p.release_slot(blocks[0])
+        p.release_slot(blocks[1])
+        self.assertIsNone(blocks[0].slot)
+        self.assertEqual(p.blocks, [blocks[2]])
+
+        # The most recently freed slot is reused first
+        self.assertEqual(p.take_slot(Block(3, 8)), 1)
+        self.assertEqual(p.take_slot(Block(4, 8)), 0)
+        self.assertEqual(p.take_slot(Block(5, 8)), 3)
+
+    def test_check_block(self):
+        """
+        Tests the check_block method for blocks inside and outside the pool.
+        """
+        p = Pool(8)
+        other = Pool(8)
+        block = Block(0, 8)
+        self.assertFalse(p.check_block(block))
+        p.take_slot(block)
+        self.assertTrue(p.check_block(block))
+        self.assertFalse(other.check_block(block))
+        p.release_slot(block)
+        self.assertFalse(p.check_block(block))
+
+    def test_offsets(self):
+        """
+        Tests the offsets and free_offsets methods.
+        """
+        p = Pool(1000)
+        blocks = [Block(obj, 8) for obj in range(3)]
+        for block in blocks:
+            p.take_slot(block)
+        p.release_slot(blocks[1])
+        self.assertEqual(p.offsets(), [0, 2000])
+        self.assertEqual(p.free_offsets(), [1000, 3000])
+
+    def test_reset(self):
+        """
+        Tests that reset clears the slots and changes the block size.
+        """
+        p = Pool(8)
+        p.take_slot(Block(0, 8))
+        p.reset(16)
+        self.assertEqual(p.blocks, [])
+        self.assertEqual(p.freeslots, [])
+        self.assertEqual(p.block_size, 16)
+        with self.assertRaises(ValueError):
+            p.reset(10)
+
+    def test_size_class(self):
+        """
+        Tests the size_class method.
+        """
+        self.assertEqual(Pool.size_class(1), 8)
+        self.assertEqual(Pool.size_class(8), 8)
+        self.assertEqual(Pool.size_class(57), 64)
+        self.assertEqual(Pool.size_class(512), 512)
+
+    @parameterized.expand(get_invalid_types())
+    def test_size_class_invalid_type(self, name, invalid_type):
+        """
+        Tests the size_class method with invalid size types.
+
+        Args:
+            name (str): The name of the invalid type.
+            invalid_type (any): The invalid type to test.
+        """
+        with self.assertRaises(TypeError):
+            Pool.size_class(invalid_type)
+
+    def test_pool_maxsize(self):
+        """
+        Tests the check_pool and free_offsets methods for a pool with its own maximum size.
+        """
+        p = Pool(64, maxsize=128)
+        self.assertEqual(p.maxsize, 128)
+        self.assertEqual(Pool(64).maxsize, Pool.MAXSIZE)
+        self.assertEqual(p.free_offsets(), [0, 64])
+
+        p.bytes = 64
+        self.assertTrue(p.check_pool(64))
+        p.bytes = 128
+        self.assertFalse(p.check_pool(64))
+
+    def test_size_class_alignment(self):
+        """
+        Tests the size_class method with a given alignment.
+        """
+        self.assertEqual(Pool.size_class(1, 16), 16)
+        self.assertEqual(Pool.size_class(17, 16), 32)
+        self.assertEqual(Pool.size_class(64, 32), 64)
+
 
 class TestBlock(unittest.TestCase):
     """
     Unit tests for the Block class.
     """
 
+    @classmethod
+    def setUpClass(cls):
+        """
+        Sets up an analyzer that logs no sizes for the measured blocks.
+        """
+        MemoryAnalyzer.reset(sample_rate=0)
+
     @parameterized.expand(get_invalid_types())
     def test_block_types(self, name, obj_type):
         """
@@ -238,6 +405,14 @@ class TestBlock(unittest.TestCase):
         with self.assertRaises(ValueError):
             Block(b'x' * 512) # + 40 bytes overhead
 
+    def test_block_maxsize(self):
+        """
+        Tests the Block class with a given maximum size.
+        """
+        self.assertEqual(Block(None, 1024, maxsize=1024).block_size, 1024)
+        with self.assertRaises(ValueError):
+            Block(None, 257, maxsize=256)
+
 
 if __name__ == '__main__':
     unittest.main()
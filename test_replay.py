@@ -0,0 +1,328 @@
+"""
+NAME
+    test_replay
+
+DESCRIPTION
+    This module contains unit tests for the trace replay engine.
+    It uses the unittest framework and parameterized tests for the trace formats.
+
+CLASSES
+    TestReplay
+        Unit tests for the replay module.
+
+        Methods defined here:
+            setUpClass(cls)
+                Sets up an analyzer that logs no sizes for the replayed objects.
+
+            setUp(self)
+                Sets up the test case environment.
+
+            tearDown(self)
+                Removes the temporary trace files.
+
+            test_trace_round_trip(self, name, suffix)
+                Tests that events written to a trace are read back unchanged.
+
+            test_read_csv_unknown_op(self)
+                Tests that reading a CSV trace with an unknown op raises an error.
+
+            test_read_csv_negative_size(self)
+                Tests that reading a CSV trace with a negative size raises an error.
+
+            test_read_binary_unknown_op(self)
+                Tests that reading a binary record with an unknown op raises an error and stops at it.
+
+            test_read_binary_truncated(self)
+                Tests that reading a binary trace with a partial record raises an error.
+
+            test_trace_reader_resume(self)
+                Tests that a new reader resumes from the offset where another one stopped.
+
+            test_trace_reader_chunks(self)
+                Tests that a trace spanning several chunks is read completely and in order.
+
+            test_trace_reader_empty(self)
+                Tests that an empty trace has no events.
+
+            test_trace_reader_invalid_offset(self, name, offset)
+                Tests that offsets that are not at a record of the trace raise an error.
+
+            test_read_trace_csv_offset(self)
+                Tests that a CSV trace cannot be resumed from an offset.
+
+            test_replay(self)
+                Tests that a replay frees what it allocates and reports the peak usage.
+
+            test_replay_live_blocks(self)
+                Tests that blocks that are never freed are reported and held by the manager.
+
+            test_replay_large(self)
+                Tests that allocations larger than the maximum block size are served as large objects.
+
+            test_replay_invalid(self)
+                Tests that frees of unknown ids and allocations of live ids are skipped.
+
+            test_replay_unknown_op(self)
+                Tests that replaying an event with an unknown op raises an error.
+
+            test_replay_zero_size(self)
+                Tests that zero-byte allocations are served from the smallest size class.
+
+            test_fragmentation(self)
+                Tests the internal, external and total fragmentation of the manager.
+
+            test_allocate_with_size(self)
+                Tests that the manager allocates a given size without measuring the object.
+"""
+
+import itertools
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from parameterized import parameterized
+
+import replay as replay_module
+from replay import ALLOC, FREE, RECORD, TraceReader, read_trace, write_csv, write_binary, read_csv, read_binary, replay, fragmentation
+from manager import MemoryManager
+from memory import Pool, Block
+from large import LargeBlock
+from analyzer import MemoryAnalyzer
+
+class TestReplay(unittest.TestCase):
+    """
+    Unit tests for the replay module.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Sets up an analyzer that logs no sizes for the replayed objects.
+        """
+        MemoryAnalyzer.reset(sample_rate=0)
+
+    def setUp(self):
+        """
+        Sets up the test case environment.
+        """
+        MemoryManager._instance = None
+        self.manager = MemoryManager.get_instance()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Removes the temporary trace files.
+        """
+        shutil.rmtree(self.directory)
+
+    @parameterized.expand([("csv", ".csv"), ("binary", ".bin")])
+    def test_trace_round_trip(self, name, suffix):
+        """
+        Tests that events written to a trace are read back unchanged.
+
+        Args:
+            name (str): The name of the trace format.
+            suffix (str): The file name suffix selecting the format.
+        """
+        events = [(ALLOC, 1, 24), (ALLOC, 2**40, 512), (FREE, 1, 0), (FREE, 2**40, 0)]
+        path = os.path.join(self.directory, "trace" + suffix)
+        write = write_csv if suffix == ".csv" else write_binary
+        write(path, events)
+
+        self.assertEqual(list(read_trace(path)), events)
+
+    def test_read_csv_unknown_op(self):
+        """
+        Tests that reading a CSV trace with an unknown op raises an error.
+        """
+        path = os.path.join(self.directory, "trace.csv")
+        with open(path, "w") as trace:
+            trace.write("op,id,size\nrealloc,1,8\n")
+        with self.assertRaises(ValueError):
+            list(read_csv(path))
+
+    def test_read_csv_negative_size(self):
+        """
+        Tests that reading a CSV trace with a negative size raises an error.
+        """
+        path = os.path.join(self.directory, "trace.csv")
+        with open(path, "w") as trace:
+            trace.write("op,id,size\nalloc,1,-8\n")
+        with self.assertRaises(ValueError):
+            list(read_csv(path))
+
+    def test_read_binary_unknown_op(self):
+        """
+        Tests that reading a binary record with an unknown op raises an error and stops at it.
+        """
+        path = os.path.join(self.directory, "trace.bin")
+        with open(path, "wb") as trace:
+            trace.write(RECORD.pack(ALLOC, 1, 8) + RECORD.pack(7, 1, 0))
+        reader = read_binary(path)
+        with self.assertRaisesRegex(ValueError, f"offset {RECORD.size}"):
+            list(reader)
+        self.assertEqual(reader.offset, RECORD.size)
+
+    def test_read_binary_truncated(self):
+        """
+        Tests that reading a binary trace with a partial record raises an error.
+        """
+        path = os.path.join(self.directory, "trace.bin")
+        with open(path, "wb") as trace:
+            trace.write(RECORD.pack(ALLOC, 1, 8) + b"\x00")
+        with self.assertRaises(ValueError):
+            list(read_binary(path))
+
+    def test_trace_reader_resume(self):
+        """
+        Tests that a new reader resumes from the offset where another one stopped.
+        """
+        events = [(ALLOC, ident, 8) for ident in range(10)]
+        path = os.path.join(self.directory, "trace.bin")
+        write_binary(path, events)
+
+        reader = TraceReader(path)
+        self.assertEqual(list(itertools.islice(reader, 4)), events[:4])
+        self.assertEqual(reader.offset, 4 * RECORD.size)
+        resumed = TraceReader(path, reader.offset)
+        self.assertEqual(list(resumed), events[4:])
+        self.assertEqual(resumed.offset, resumed.size)
+
+    def test_trace_reader_chunks(self):
+        """
+        Tests that a trace spanning several chunks is read completely and in order.
+        """
+        events = [(ALLOC, ident, ident % 64) for ident in range(10)]
+        path = os.path.join(self.directory, "trace.bin")
+        write_binary(path, events)
+
+        with patch.object(replay_module, '_CHUNK', 3):
+            self.assertEqual(list(read_binary(path)), events)
+
+    def test_trace_reader_empty(self):
+        """
+        Tests that an empty trace has no events.
+        """
+        path = os.path.join(self.directory, "trace.bin")
+        write_binary(path, [])
+        self.assertEqual(list(TraceReader(path)), [])
+
+    @parameterized.expand([("unaligned", 1), ("negative", -RECORD.size), ("past_end", 2 * RECORD.size)])
+    def test_trace_reader_invalid_offset(self, name, offset):
+        """
+        Tests that offsets that are not at a record of the trace raise an error.
+
+        Args:
+            name (str): The name of the offset.
+            offset (int): The invalid offset.
+        """
+        path = os.path.join(self.directory, "trace.bin")
+        write_binary(path, [(ALLOC, 1, 8)])
+        with self.assertRaises(ValueError):
+            TraceReader(path, offset)
+
+    def test_read_trace_csv_offset(self):
+        """
+        Tests that a CSV trace cannot be resumed from an offset.
+        """
+        path = os.path.join(self.directory, "trace.csv")
+        write_csv(path, [(ALLOC, 1, 8)])
+        with self.assertRaises(ValueError):
+            read_trace(path, RECORD.size)
+
+    def test_replay(self):
+        """
+        Tests that a replay frees what it allocates and reports the peak usage.
+        """
+        count = Pool.MAXSIZE // 8 + 1  # One more block than fits in a pool
+        events = [(ALLOC, ident, 8) for ident in range(count)] + [(FREE, ident, 0) for ident in range(count)]
+        report = replay(events, self.manager)
+
+        self.assertEqual(report['ops'], 2 * count)
+        self.assertGreater(report['ops_per_sec'], 0)
+        self.assertEqual(report['peak_arenas'], 1)
+        self.assertEqual(report['peak_pools'], 2)
+        self.assertEqual(report['peak_blocks'], count)
+        self.assertEqual(report['live_blocks'], 0)
+        self.assertEqual(report['peak_large_mapped'], 0)
+        self.assertEqual(report['invalid'], 0)
+        self.assertEqual(len(self.manager.arenas), 0)
+        self.assertEqual(self.manager.pool_count, 0)
+
+    def test_replay_live_blocks(self):
+        """
+        Tests that blocks that are never freed are reported and held by the manager.
+        """
+        report = replay([(ALLOC, 1, 8), (ALLOC, 2, 8), (FREE, 1, 0)], self.manager)
+
+        self.assertEqual(report['live_blocks'], 1)
+        self.assertEqual(report['peak_blocks'], 2)
+        self.assertEqual(len(self.manager.arenas[0].pools[0].blocks), 1)
+
+    def test_replay_large(self):
+        """
+        Tests that allocations larger than the maximum block size are served as large objects.
+        """
+        report = replay([(ALLOC, 1, Block.MAXSIZE + 1), (ALLOC, 2, 5000), (FREE, 1, 0)], self.manager)
+
+        self.assertEqual(report['invalid'], 0)
+        self.assertEqual(report['peak_blocks'], 2)
+        self.assertEqual(report['live_blocks'], 1)
+        self.assertEqual(report['peak_large_mapped'], 3 * 4096)
+        self.assertEqual(report['large']['blocks'], 1)
+        self.assertEqual(report['large']['requested'], 5000)
+        self.assertEqual(self.manager.arenas, [])  # No pool serves a large object
+
+    def test_replay_invalid(self):
+        """
+        Tests that frees of unknown ids and allocations of live ids are skipped.
+        """
+        report = replay([(FREE, 1, 0), (ALLOC, 2, 8), (ALLOC, 2, 16)], self.manager)
+
+        self.assertEqual(report['invalid'], 2)
+        self.assertEqual(report['live_blocks'], 1)
+        self.assertEqual(self.manager.arenas[0].pools[0].block_size, 8)
+
+    def test_replay_unknown_op(self):
+        """
+        Tests that replaying an event with an unknown op raises an error.
+        """
+        with self.assertRaises(ValueError):
+            replay([(ALLOC, 1, 8), (2, 1, 0)], self.manager)
+
+    def test_replay_zero_size(self):
+        """
+        Tests that zero-byte allocations are served from the smallest size class.
+        """
+        replay([(ALLOC, 1, 0)], self.manager)
+
+        self.assertEqual(self.manager.arenas[0].pools[0].block_size, Pool.ALIGNMENT)
+
+    def test_fragmentation(self):
+        """
+        Tests the internal, external and total fragmentation of the manager.
+        """
+        self.assertEqual(fragmentation(self.manager)['total'], 0.0)  # Nothing is reserved
+        replay([(ALLOC, 1, 100), (ALLOC, 2, 100)], self.manager)
+        frag = fragmentation(self.manager)
+
+        self.assertEqual(frag['reserved'], Pool.MAXSIZE)
+        self.assertEqual(frag['used'], 2 * 104)
+        self.assertEqual(frag['requested'], 200)
+        self.assertAlmostEqual(frag['internal'], 8 / Pool.MAXSIZE)
+        self.assertAlmostEqual(frag['external'], (Pool.MAXSIZE - 208) / Pool.MAXSIZE)
+        self.assertAlmostEqual(frag['total'], frag['internal'] + frag['external'])
+
+    def test_allocate_with_size(self):
+        """
+        Tests that the manager allocates a given size without measuring the object.
+        """
+        with patch.object(self.manager, '_measure') as measure:
+            block = self.manager.allocate("object", 40)
+        measure.assert_not_called()
+        self.assertEqual(block.block_size, 40)
+        self.assertIsInstance(self.manager.allocate("object", Block.MAXSIZE + 1), LargeBlock)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+NAME
+    test_runner
+
+DESCRIPTION
+    This module contains unit tests for the parallel simulation runner.
+    It uses the unittest framework and parameterized tests for the inconsistent geometries.
+
+CLASSES
+    TestRunner
+        Unit tests for the runner module.
+
+        Methods defined here:
+            setUpClass(cls)
+                Sets up an analyzer that logs no sizes for the simulations run in this process.
+
+            setUp(self)
+                Sets up the test case environment.
+
+            test_make_tasks(self)
+                Tests that a task is built for each workload, configuration and seed.
+
+            test_make_tasks_unknown_workload(self)
+                Tests that an unknown workload raises an error.
+
+            test_make_tasks_unknown_setting(self)
+                Tests that an unknown geometry setting raises an error.
+
+            test_simulate(self)
+                Tests that a simulation replays its workload with the geometry of its task.
+
+            test_simulate_invalid_geometry(self, name, config)
+                Tests that a simulation with an inconsistent geometry raises an error.
+
+            test_run_processes(self)
+                Tests that simulations run in worker processes report what they report in-process.
+
+            test_aggregate(self)
+                Tests that the results of each workload and configuration are summarized over seeds.
+"""
+
+import unittest
+from parameterized import parameterized
+
+from runner import make_tasks, simulate, run, aggregate
+from workload import uniform
+from manager import MemoryManager
+from analyzer import MemoryAnalyzer
+
+class TestRunner(unittest.TestCase):
+    """
+    Unit tests for the runner module.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Sets up an analyzer that logs no sizes for the simulations run in this process.
+        """
+        MemoryAnalyzer.reset(sample_rate=0)
+
+    def setUp(self):
+        """
+        Sets up the test case environment.
+        """
+        MemoryManager._instance = None
+
+    def test_make_tasks(self):
+        """
+        Tests that a task is built for each workload, configuration and seed.
+        """
+        tasks = make_tasks(['uniform', 'churn'], [{}, {'pool_size': 8000}], count=10, seeds=[0, 1],
+                           params={'churn': {'live': 5}})
+
+        self.assertEqual(len(tasks), 8)
+        self.assertEqual(tasks[0], {'workload': 'uniform', 'count': 10, 'seed': 0, 'params': {}, 'config': {}})
+        self.assertEqual(tasks[-1], {
+            'workload': 'churn', 'count': 10, 'seed': 1, 'params': {'live': 5}, 'config': {'pool_size': 8000},
+        })
+
+    def test_make_tasks_unknown_workload(self):
+        """
+        Tests that an unknown workload raises an error.
+        """
+        with self.assertRaises(ValueError):
+            make_tasks(['normal'])
+
+    def test_make_tasks_unknown_setting(self):
+        """
+        Tests that an unknown geometry setting raises an error.
+        """
+        with self.assertRaises(ValueError):
+            make_tasks(['uniform'], [{'page_size': 4096}])
+
+    def test_simulate(self):
+        """
+        Tests that a simulation replays its workload with the geometry of its task.
+        """
+        task = make_tasks(['uniform'], [{'max_block_size': 256}], count=2000, seeds=[1])[0]
+        report = simulate(task)['report']
+
+        self.assertEqual(report['ops'], len(uniform(2000, seed=1)))
+        self.assertGreater(report['peak_large_mapped'], 0)  # Sizes over 256 bytes are large objects
+        self.assertEqual(report['invalid'], 0)
+        self.assertEqual(report['events']['pool_new'], report['peak_pools'])
+        # The default instance is left alone
+        self.assertIsNone(MemoryManager._instance)
+
+    @parameterized.expand([
+        ("pool_exceeds_arena", {'pool_size': 8000, 'arena_size': 4000}),
+        ("block_exceeds_pool", {'max_block_size': 1024, 'pool_size': 1000}),
+        ("unaligned", {'alignment': 12}),
+        ("zero_alignment", {'alignment': 0}),
+    ])
+    def test_simulate_invalid_geometry(self, name, config):
+        """
+        Tests that a simulation with an inconsistent geometry raises an error.
+
+        Args:
+            name (str): The name of the case.
+            config (dict): The inconsistent geometry.
+        """
+        with self.assertRaises(ValueError):
+            simulate(make_tasks(['uniform'], [config], count=10)[0])
+
+    def test_run_processes(self):
+        """
+        Tests that simulations run in worker processes report what they report in-process.
+        """
+        tasks = make_tasks(['uniform', 'zipf'], [{}, {'alignment': 16}], count=1000, seeds=[0])
+        deterministic = ('ops', 'peak_arenas', 'peak_pools', 'peak_blocks', 'peak_large_mapped', 'live_blocks',
+                         'fragmentation', 'large', 'events')
+
+        local = run(tasks, workers=0)
+        remote = run(tasks, workers=2)
+
+        self.assertEqual(len(remote), len(tasks))
+        for expected, result in zip(local, remote):
+            self.assertEqual(result['config'], expected['config'])
+            for key in deterministic:
+                self.assertEqual(result['report'][key], expected['report'][key])
+        # A coarser alignment needs fewer size classes, and so fewer pools
+        self.assertLess(local[1]['report']['peak_pools'], local[0]['report']['peak_pools'])
+
+    def test_aggregate(self):
+        """
+        Tests that the results of each workload and configuration are summarized over seeds.
+        """
+        results = [
+            {'workload': 'uniform', 'seed': seed, 'config': {'pool_size': 4000},
+             'report': {'peak_pools': pools, 'fragmentation': {'total': 0.5}, 'note': 'ignored'}}
+            for seed, pools in enumerate([10, 20, 30])
+        ]
+        results.append({'workload': 'uniform', 'seed': 0, 'config': {'pool_size': 8000},
+                        'report': {'peak_pools': 5, 'fragmentation': {'total': 0.25}}})
+
+        summaries = aggregate(results)
+
+        self.assertEqual(len(summaries), 2)
+        self.assertEqual(summaries[0]['config'], {'pool_size': 4000})
+        self.assertEqual(summaries[0]['runs'], 3)
+        peak_pools = summaries[0]['metrics']['peak_pools']
+        self.assertEqual((peak_pools['mean'], peak_pools['min'], peak_pools['max']), (20.0, 10.0, 30.0))
+        self.assertAlmostEqual(peak_pools['std'], (200 / 3) ** 0.5)
+        self.assertEqual(summaries[0]['metrics']['fragmentation.total']['mean'], 0.5)
+        self.assertNotIn('note', summaries[0]['metrics'])
+        self.assertEqual(summaries[1]['runs'], 1)
+        self.assertEqual(summaries[1]['metrics']['peak_pools']['std'], 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,224 @@
+"""
+NAME
+    test_workload
+
+DESCRIPTION
+    This module contains unit tests for the synthetic workload generators.
+    It uses the unittest framework and parameterized tests for each generator.
+
+CLASSES
+    TestWorkload
+        Unit tests for the workload module.
+
+        Methods defined here:
+            setUpClass(cls)
+                Sets up an analyzer that logs no sizes for the replayed workloads.
+
+            setUp(self)
+                Sets up the test case environment.
+
+            check_events(self, events)
+                Checks that every id is allocated once, before any free of it, and freed at most once.
+
+            test_event_layout(self)
+                Tests that the event dtype has the layout of the binary trace records.
+
+            test_valid_events(self, name, generate)
+                Tests that each generator produces valid events with sizes a block can hold.
+
+            test_reproducible(self, name, generate)
+                Tests that each generator gives the same events for the same seed and others for another seed.
+
+            test_events_from(self)
+                Tests the ordering of allocations and frees built from lifetimes.
+
+            test_zipf_skew(self)
+                Tests that the smallest size class is the most common in a Zipf workload.
+
+            test_bursty_phases(self)
+                Tests that the objects of a phase are all freed during the next phase.
+
+            test_mixed_lifetimes(self)
+                Tests that about the requested fraction of objects is never freed.
+
+            test_churn_steady_state(self)
+                Tests that the number of live objects stays constant after the warm-up.
+
+            test_save_and_replay(self)
+                Tests that a saved workload replays the same as the array it came from.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from parameterized import parameterized
+
+from workload import (EVENT_DTYPE, NEVER, uniform, zipf, bursty, mixed_lifetimes, churn,
+                      events_from, iter_events, save)
+from replay import ALLOC, FREE, RECORD, read_trace, replay
+from manager import MemoryManager
+from memory import Pool, Block
+from analyzer import MemoryAnalyzer
+
+GENERATORS = [
+    ("uniform", uniform),
+    ("zipf", zipf),
+    ("bursty", bursty),
+    ("mixed_lifetimes", mixed_lifetimes),
+    ("churn", churn),
+]
+
+class TestWorkload(unittest.TestCase):
+    """
+    Unit tests for the workload module.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Sets up an analyzer that logs no sizes for the replayed workloads.
+        """
+        MemoryAnalyzer.reset(sample_rate=0)
+
+    def setUp(self):
+        """
+        Sets up the test case environment.
+        """
+        MemoryManager._instance = None
+
+    def check_events(self, events):
+        """
+        Checks that every id is allocated once, before any free of it, and freed at most once.
+
+        Args:
+            events (ndarray): The events, of EVENT_DTYPE.
+        """
+        live = set()
+        freed = set()
+        for op, ident, size in iter_events(events):
+            if op == ALLOC:
+                self.assertNotIn(ident, live)
+                self.assertNotIn(ident, freed)
+                self.assertTrue(1 <= size <= Block.MAXSIZE)
+                live.add(ident)
+            else:
+                self.assertEqual(op, FREE)
+                live.remove(ident)
+                freed.add(ident)
+
+    def test_event_layout(self):
+        """
+        Tests that the event dtype has the layout of the binary trace records.
+        """
+        events = np.array([(ALLOC, 2**40, 24)], dtype=EVENT_DTYPE)
+        self.assertEqual(events.tobytes(), RECORD.pack(ALLOC, 2**40, 24))
+
+    @parameterized.expand(GENERATORS)
+    def test_valid_events(self, name, generate):
+        """
+        Tests that each generator produces valid events with sizes a block can hold.
+
+        Args:
+            name (str): The name of the generator.
+            generate (callable): The generator.
+        """
+        events = generate(5000, seed=1)
+        self.assertEqual(events.dtype, EVENT_DTYPE)
+        self.assertEqual(np.count_nonzero(events['op'] == ALLOC), 5000)
+        self.check_events(events)
+
+    @parameterized.expand(GENERATORS)
+    def test_reproducible(self, name, generate):
+        """
+        Tests that each generator gives the same events for the same seed and others for another seed.
+
+        Args:
+            name (str): The name of the generator.
+            generate (callable): The generator.
+        """
+        np.testing.assert_array_equal(generate(1000, seed=7), generate(1000, seed=7))
+        self.assertFalse(np.array_equal(generate(1000, seed=7), generate(1000, seed=8)))
+
+    def test_events_from(self):
+        """
+        Tests the ordering of allocations and frees built from lifetimes.
+        """
+        events = events_from(np.array([8, 16, 24]), np.array([2, 1, NEVER]))
+
+        self.assertEqual(list(iter_events(events)), [
+            (ALLOC, 0, 8),
+            (ALLOC, 1, 16),
+            (FREE, 0, 0),  # Freed at step 2, before the allocation of step 2
+            (FREE, 1, 0),
+            (ALLOC, 2, 24),
+        ])
+
+    def test_zipf_skew(self):
+        """
+        Tests that the smallest size class is the most common in a Zipf workload.
+        """
+        events = zipf(10000, seed=1, mean_lifetime=None)
+        classes = -(-events['size'].astype(np.int64) // Pool.ALIGNMENT)
+        counts = np.bincount(classes)
+
+        self.assertEqual(np.argmax(counts), 1)
+        self.assertGreater(counts[1], len(events) / 4)
+
+    def test_bursty_phases(self):
+        """
+        Tests that the objects of a phase are all freed during the next phase.
+        """
+        phase_length = 100
+        events = bursty(1000, seed=1, phase_length=phase_length)
+        step = np.cumsum(events['op'] == ALLOC) - 1  # Frees belong to the step of the next allocation
+        frees = events['op'] == FREE
+
+        freed_phase = (step[frees] + 1) // phase_length
+        allocated_phase = events['id'][frees].astype(np.int64) // phase_length
+        np.testing.assert_array_equal(freed_phase, allocated_phase + 1)
+
+    def test_mixed_lifetimes(self):
+        """
+        Tests that about the requested fraction of objects is never freed.
+        """
+        events = mixed_lifetimes(10000, seed=1, long_fraction=0.2)
+        frees = np.count_nonzero(events['op'] == FREE)
+
+        self.assertAlmostEqual(1 - frees / 10000, 0.2, delta=0.02)
+
+    def test_churn_steady_state(self):
+        """
+        Tests that the number of live objects stays constant after the warm-up.
+        """
+        live = 50
+        events = churn(1000, seed=1, live=live)
+        counts = np.cumsum(np.where(events['op'] == ALLOC, 1, -1))
+        warm = np.argmax(counts == live)
+
+        self.assertTrue(np.all(counts[warm:] >= live - 1))
+        self.assertTrue(np.all(counts[warm:] <= live))
+        self.assertEqual(counts[-1], live)
+
+    def test_save_and_replay(self):
+        """
+        Tests that a saved workload replays the same as the array it came from.
+        """
+        events = churn(2000, seed=1, live=100)
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "trace.bin")
+            save(path, events)
+            self.assertEqual(list(read_trace(path)), list(iter_events(events)))
+        finally:
+            shutil.rmtree(directory)
+
+        report = replay(iter_events(events), MemoryManager())
+        self.assertEqual(report['ops'], len(events))
+        self.assertEqual(report['invalid'], 0)
+        self.assertEqual(report['peak_blocks'], 100)
+        self.assertEqual(report['live_blocks'], 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,292 @@
+"""
+NAME
+    workload
+
+DESCRIPTION
+    This module generates synthetic allocation workloads for the replay engine.
+    Every generator is vectorized with NumPy and seeded, so millions of events are created in
+    seconds and the same seed always gives the same workload.
+    Workloads are structured arrays of EVENT_DTYPE, which has the layout of the binary trace
+    records in replay, so they can be saved as traces or replayed directly through iter_events.
+    Object i is allocated at step i and freed after its lifetime in steps, frees coming before
+    the allocation of the same step. A lifetime of NEVER keeps the object live to the end.
+
+FUNCTIONS
+    uniform_sizes(rng, count, low=1, high=Block.MAXSIZE) -> ndarray
+        Draws sizes uniformly between low and high.
+
+    zipf_sizes(rng, count, a=1.5) -> ndarray
+        Draws sizes whose size classes follow a Zipf distribution, small classes being the most common.
+
+    geometric_lifetimes(rng, count, mean) -> ndarray
+        Draws memoryless lifetimes with the given mean, or NEVER for all if the mean is None.
+
+    events_from(sizes, lifetimes) -> ndarray
+        Turns the sizes and lifetimes of allocations into an ordered array of events.
+
+    uniform(count, seed=None, low=1, high=Block.MAXSIZE, mean_lifetime=100) -> ndarray
+        Generates a workload of uniformly distributed sizes.
+
+    zipf(count, seed=None, a=1.5, mean_lifetime=100) -> ndarray
+        Generates a workload whose size classes follow a Zipf distribution.
+
+    bursty(count, seed=None, phase_length=1000, spread=16) -> ndarray
+        Generates phases of allocations around one size, each freed during the next phase.
+
+    mixed_lifetimes(count, seed=None, long_fraction=0.1, short_mean=10, low=1, high=Block.MAXSIZE) -> ndarray
+        Generates a mix of short-lived objects and long-lived objects that are never freed.
+
+    churn(count, seed=None, live=1000, low=1, high=Block.MAXSIZE) -> ndarray
+        Generates a steady state where every allocation after the warm-up frees one live object.
+
+    iter_events(events, chunk=65536) -> iterator
+        Yields the events of an array as tuples of Python ints, one chunk at a time.
+
+    save(path, events)
+        Writes the events of an array as a binary trace.
+
+    main(argv=None)
+        Generates the workload given on the command line and saves it as a binary trace.
+"""
+
+import argparse
+import numpy as np
+from memory import Pool, Block
+from replay import ALLOC, FREE
+
+# Packed like replay.RECORD, so an array of events is a binary trace as is
+EVENT_DTYPE = np.dtype([('op', 'u1'), ('id', '<u8'), ('size', '<u4')])
+
+NEVER = 0
+
+def uniform_sizes(rng, count, low=1, high=Block.MAXSIZE):
+    """
+    Draws sizes uniformly between low and high.
+
+    Args:
+        rng (Generator): The random generator.
+        count (int): The number of sizes.
+        low (int): The smallest size, included. Default is 1.
+        high (int): The largest size, included. Default is Block.MAXSIZE.
+
+    Returns:
+        ndarray: The sizes.
+    """
+    return rng.integers(low, high, size=count, endpoint=True)
+
+def zipf_sizes(rng, count, a=1.5):
+    """
+    Draws sizes whose size classes follow a Zipf distribution, small classes being the most common.
+    Ranks beyond the largest class are folded back into the range of classes.
+
+    Args:
+        rng (Generator): The random generator.
+        count (int): The number of sizes.
+        a (float): The exponent of the distribution, larger values are more skewed. Default is 1.5.
+
+    Returns:
+        ndarray: The sizes, each anywhere inside its size class.
+    """
+    classes = Block.MAXSIZE // Pool.ALIGNMENT
+    rank = (rng.zipf(a, size=count) - 1) % classes + 1
+    return rank * Pool.ALIGNMENT - rng.integers(0, Pool.ALIGNMENT, size=count)
+
+def geometric_lifetimes(rng, count, mean):
+    """
+    Draws memoryless lifetimes with the given mean, or NEVER for all if the mean is None.
+
+    Args:
+        rng (Generator): The random generator.
+        count (int): The number of lifetimes.
+        mean (float): The mean lifetime in steps, at least 1.
+
+    Returns:
+        ndarray: The lifetimes, each at least 1 step.
+    """
+    if mean is None:
+        return np.full(count, NEVER, dtype=np.int64)
+    return rng.geometric(1 / mean, size=count)
+
+def events_from(sizes, lifetimes):
+    """
+    Turns the sizes and lifetimes of allocations into an ordered array of events.
+    Object i is allocated at step i with id i and freed at step i + lifetime, before that
+    step's allocation.
+
+    Args:
+        sizes (ndarray): The size of each allocation.
+        lifetimes (ndarray): The lifetime of each allocation in steps, or NEVER.
+
+    Returns:
+        ndarray: The events, of EVENT_DTYPE.
+    """
+    count = len(sizes)
+    ids = np.arange(count, dtype=np.int64)
+    freed = np.flatnonzero(lifetimes != NEVER)
+
+    # Allocations are at odd times and frees at even times, so a free comes first within a step
+    times = np.concatenate((2 * ids + 1, 2 * (freed + lifetimes[freed])))
+    order = np.argsort(times, kind='stable')
+
+    events = np.empty(count + len(freed), dtype=EVENT_DTYPE)
+    events['op'] = np.concatenate((np.full(count, ALLOC), np.full(len(freed), FREE)))[order]
+    events['id'] = np.concatenate((ids, freed))[order]
+    events['size'] = np.concatenate((sizes, np.zeros(len(freed), dtype=sizes.dtype)))[order]
+    return events
+
+def uniform(count, seed=None, low=1, high=Block.MAXSIZE, mean_lifetime=100):
+    """
+    Generates a workload of uniformly distributed sizes.
+
+    Args:
+        count (int): The number of allocations.
+        seed (int): The seed of the random generator. Default is None, which is not reproducible.
+        low (int): The smallest size, included. Default is 1.
+        high (int): The largest size, included. Default is Block.MAXSIZE.
+        mean_lifetime (float): The mean lifetime in steps. Default is 100, None never frees.
+
+    Returns:
+        ndarray: The events, of EVENT_DTYPE.
+    """
+    rng = np.random.default_rng(seed)
+    return events_from(uniform_sizes(rng, count, low, high), geometric_lifetimes(rng, count, mean_lifetime))
+
+def zipf(count, seed=None, a=1.5, mean_lifetime=100):
+    """
+    Generates a workload whose size classes follow a Zipf distribution.
+
+    Args:
+        count (int): The number of allocations.
+        seed (int): The seed of the random generator. Default is None, which is not reproducible.
+        a (float): The exponent of the distribution, larger values are more skewed. Default is 1.5.
+        mean_lifetime (float): The mean lifetime in steps. Default is 100, None never frees.
+
+    Returns:
+        ndarray: The events, of EVENT_DTYPE.
+    """
+    rng = np.random.default_rng(seed)
+    return events_from(zipf_sizes(rng, count, a), geometric_lifetimes(rng, count, mean_lifetime))
+
+def bursty(count, seed=None, phase_length=1000, spread=16):
+    """
+    Generates phases of allocations around one size, each freed during the next phase.
+    Each phase draws its own base size, so the busy size classes move from phase to phase.
+
+    Args:
+        count (int): The number of allocations.
+        seed (int): The seed of the random generator. Default is None, which is not reproducible.
+        phase_length (int): The number of allocations in a phase. Default is 1000.
+        spread (float): The standard deviation of the sizes around the base size. Default is 16.
+
+    Returns:
+        ndarray: The events, of EVENT_DTYPE.
+    """
+    rng = np.random.default_rng(seed)
+    phase = np.arange(count) // phase_length
+    base = uniform_sizes(rng, phase[-1] + 1 if count else 0)
+    sizes = np.clip(np.rint(rng.normal(base[phase], spread)), 1, Block.MAXSIZE).astype(np.int64)
+    # Free each object at a random step of the next phase
+    frees = (phase + 1) * phase_length + rng.integers(0, phase_length, size=count)
+    return events_from(sizes, frees - np.arange(count))
+
+def mixed_lifetimes(count, seed=None, long_fraction=0.1, short_mean=10, low=1, high=Block.MAXSIZE):
+    """
+    Generates a mix of short-lived objects and long-lived objects that are never freed.
+
+    Args:
+        count (int): The number of allocations.
+        seed (int): The seed of the random generator. Default is None, which is not reproducible.
+        long_fraction (float): The fraction of objects that are never freed. Default is 0.1.
+        short_mean (float): The mean lifetime of short-lived objects in steps. Default is 10.
+        low (int): The smallest size, included. Default is 1.
+        high (int): The largest size, included. Default is Block.MAXSIZE.
+
+    Returns:
+        ndarray: The events, of EVENT_DTYPE.
+    """
+    rng = np.random.default_rng(seed)
+    sizes = uniform_sizes(rng, count, low, high)
+    lifetimes = geometric_lifetimes(rng, count, short_mean)
+    lifetimes[rng.random(count) < long_fraction] = NEVER
+    return events_from(sizes, lifetimes)
+
+def churn(count, seed=None, live=1000, low=1, high=Block.MAXSIZE):
+    """
+    Generates a steady state where every allocation after the warm-up frees one live object.
+    The objects allocated in each window of live steps are freed in a random order during the
+    next window, so exactly live objects are held once the first window is allocated.
+
+    Args:
+        count (int): The number of allocations.
+        seed (int): The seed of the random generator. Default is None, which is not reproducible.
+        live (int): The number of live objects in the steady state. Default is 1000.
+        low (int): The smallest size, included. Default is 1.
+        high (int): The largest size, included. Default is Block.MAXSIZE.
+
+    Returns:
+        ndarray: The events, of EVENT_DTYPE.
+    """
+    rng = np.random.default_rng(seed)
+    sizes = uniform_sizes(rng, count, low, high)
+    windows = -(-count // live)
+    slots = rng.permuted(np.tile(np.arange(live), (windows, 1)), axis=1).ravel()[:count]
+    frees = (np.arange(count) // live + 1) * live + slots
+    lifetimes = frees - np.arange(count)
+    # The last window is still live at the end, it is the steady state
+    lifetimes[frees >= count] = NEVER
+    return events_from(sizes, lifetimes)
+
+def iter_events(events, chunk=65536):
+    """
+    Yields the events of an array as tuples of Python ints, one chunk at a time.
+    This is the form replay expects, since the manager does not accept NumPy integers as sizes.
+
+    Args:
+        events (ndarray): The events, of EVENT_DTYPE.
+        chunk (int): The number of events converted at once. Default is 65536.
+
+    Yields:
+        tuple: The op, id and size of each event.
+    """
+    for start in range(0, len(events), chunk):
+        yield from events[start:start + chunk].tolist()
+
+def save(path, events):
+    """
+    Writes the events of an array as a binary trace.
+
+    Args:
+        path (str): The path of the trace.
+        events (ndarray): The events, of EVENT_DTYPE.
+    """
+    events.astype(EVENT_DTYPE, copy=False).tofile(path)
+
+# Maps the name of each workload to its generator
+WORKLOADS = {
+    'uniform': uniform,
+    'zipf': zipf,
+    'bursty': bursty,
+    'mixed': mixed_lifetimes,
+    'churn': churn,
+}
+
+def main(argv=None):
+    """
+    Generates the workload given on the command line and saves it as a binary trace.
+
+    Args:
+        argv (list): The command line arguments. Default is None, in which case sys.argv is used.
+    """
+    parser = argparse.ArgumentParser(description="Generate a synthetic allocation trace.")
+    parser.add_argument('workload', choices=sorted(WORKLOADS))
+    parser.add_argument('count', type=int, help="number of allocations")
+    parser.add_argument('output', help="path of the binary trace")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    events = WORKLOADS[args.workload](args.count, seed=args.seed)
+    save(args.output, events)
+    print(f"{len(events)} events written to {args.output}")
+
+if __name__ == "__main__":
+    main()